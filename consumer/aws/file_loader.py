@@ -2,11 +2,19 @@
 import boto3
 import tempfile
 import asyncio
+import multiprocessing
 import os
-from pypdf import PdfReader
+import resource
+import time
+from collections import deque
+from typing import AsyncIterator
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
 from botocore.config import Config
 from botocore.exceptions import ClientError
 from consumer.consumer_env import env
+from consumer.limits import download_slots, parse_slots
+from consumer.aws.pdf_extract import count_pages, extract_all_pages, extract_page_range, page_ranges
 
 
 class Document:
@@ -25,6 +33,8 @@ s3 = boto3.client(
     config=Config(signature_version="s3v4"),
 )
 BUCKET = env.AWS_S3_BUCKET
+# Read size for streaming an object body into memory
+STREAM_READ_BYTES = 1024 * 1024
 
 print("=" * 60)
 print("🔧 AWS S3 Consumer Configuration Loaded:")
@@ -34,9 +44,9 @@ print(f"   Endpoint: https://s3.{env.AWS_REGION}.amazonaws.com")
 print(f"   Access Key ID: {env.AWS_ACCESS_KEY_ID[:10]}..." if env.AWS_ACCESS_KEY_ID else "   Access Key ID: NOT SET")
 print("=" * 60)
 
-def _load_pdf_from_s3_sync(key: str) -> tuple[list[Document], str]:
-    """Synchronous helper for loading PDF from S3
-    Returns: (documents, temp_file_path)
+def _head_pdf_sync(key: str) -> int:
+    """Synchronous helper for checking a PDF exists in S3
+    Returns: object size in bytes
     """
     print(f"\n{'='*60}")
     print(f"🔍 S3 Download Request:")
@@ -49,8 +59,9 @@ def _load_pdf_from_s3_sync(key: str) -> tuple[list[Document], str]:
     try:
         print("🔎 Checking if file exists...")
         # Try to head_object to check if file exists
-        s3.head_object(Bucket=BUCKET, Key=key)
+        head = s3.head_object(Bucket=BUCKET, Key=key)
         print(f"✅ File exists in S3!")
+        return head["ContentLength"]
         
     except ClientError as e:
         error_code = e.response.get('Error', {}).get('Code', '')
@@ -91,47 +102,301 @@ def _load_pdf_from_s3_sync(key: str) -> tuple[list[Document], str]:
             print(f"❌ Error listing bucket: {list_err}")
         
         raise e
-    
+
+
+def _log_transfer(mode: str, size: int, seconds: float):
+    """Print download throughput and the process' peak RSS so far"""
+    mb = size / (1024 * 1024)
+    rate = mb / seconds if seconds > 0 else float("inf")
+    # ru_maxrss is in KB on Linux
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"📊 [{mode}] {mb:.1f} MB in {seconds:.2f}s ({rate:.1f} MB/s), peak RSS {peak_rss_mb:.0f} MB")
+
+
+def _download_pdf_sync(key: str) -> str:
+    """Synchronous helper for downloading a PDF from S3 to a temp file
+    Returns: temp_file_path
+    """
+    size = _head_pdf_sync(key)
+
     with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
         tmp_path = tmp.name
         
+    try:
+        print(f"⬇️  Downloading to: {tmp_path}")
+        started = time.perf_counter()
+        s3.download_file(BUCKET, key, tmp_path)
+        print(f"✅ Successfully downloaded!")
+        _log_transfer("tempfile", size, time.perf_counter() - started)
+        return tmp_path
+    except Exception as e:
+        # Clean up temp file on error
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        print(f"❌ Download failed: {e}")
+        raise e
+
+
+def _fetch_range_sync(key: str, start: int, end: int, target: memoryview):
+    """Stream bytes [start, end) of an S3 object into target[start:end]"""
+    params = {"Bucket": BUCKET, "Key": key}
+    if end - start < len(target):
+        params["Range"] = f"bytes={start}-{end - 1}"
+    body = s3.get_object(**params)["Body"]
+    pos = start
+    try:
+        while pos < end:
+            data = body.read(min(STREAM_READ_BYTES, end - pos))
+            if not data:
+                break
+            target[pos:pos + len(data)] = data
+            pos += len(data)
+    finally:
+        body.close()
+    if pos != end:
+        raise IOError(f"Short read from S3 for {key}: got {pos - start} of {end - start} bytes")
+
+
+def _download_pdf_to_memory_sync(key: str, size: int, target: memoryview):
+    """Synchronous helper for streaming a PDF from S3 into a memory buffer.
+    Objects larger than S3_RANGE_CHUNK_BYTES are fetched with parallel ranged GETs.
+    """
+    chunk = max(1, env.S3_RANGE_CHUNK_BYTES)
+    ranges = [(start, min(start + chunk, size)) for start in range(0, size, chunk)]
+    print(f"⬇️  Streaming {size} bytes into memory ({len(ranges)} range requests)")
+
+    started = time.perf_counter()
+    if len(ranges) <= 1:
+        _fetch_range_sync(key, 0, size, target)
+    else:
+        with ThreadPoolExecutor(max_workers=max(1, env.S3_RANGE_CONCURRENCY)) as executor:
+            futures = [executor.submit(_fetch_range_sync, key, start, end, target) for start, end in ranges]
+            for future in futures:
+                future.result()
+    print(f"✅ Successfully downloaded!")
+    _log_transfer("memory", size, time.perf_counter() - started)
+
+
+def _parse_pdf_sync(source, key: str) -> list[Document]:
+    """Synchronous helper for extracting page text from a downloaded PDF
+    (temp file path or in-memory buffer)"""
+    print(f"📖 Loading PDF...")
+    texts = extract_all_pages(source)
+    
+    # Create Document objects for each page
+    docs = []
+    for page_num, text in enumerate(texts):
+        doc = Document(
+            page_content=text,
+            metadata={
+                "page": page_num + 1,  # 1-indexed page numbers
+                "source": key,
+                "total_pages": len(texts)
+            }
+        )
+        docs.append(doc)
+    
+    # Count pages with content
+    pages_with_content = sum(1 for doc in docs if doc.page_content and doc.page_content.strip())
+    print(f"✅ PDF loaded: {len(docs)} pages ({pages_with_content} have text content)")
+    return docs
+
+
+_pdf_pool: ProcessPoolExecutor | None = None
+
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    """Lazily start the PDF extraction process pool"""
+    global _pdf_pool
+    if _pdf_pool is None:
+        print(f"🧵 Starting PDF extraction pool ({env.PDF_EXTRACT_PROCESSES} processes)")
+        # spawn: never fork a process that already runs boto/asyncio threads
+        _pdf_pool = ProcessPoolExecutor(
+            max_workers=env.PDF_EXTRACT_PROCESSES,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pdf_pool
+
+
+def shutdown_pdf_pool():
+    """Stop the PDF extraction process pool (if it was started)"""
+    global _pdf_pool
+    if _pdf_pool is not None:
+        _pdf_pool.shutdown(cancel_futures=True)
+        _pdf_pool = None
+
+
+async def _parse_pdf_in_pool(source, key: str) -> list[Document]:
+    """
+    Extract page text in worker processes, keeping the GIL of the
+    event loop free. Page ranges fan out across the pool and are
+    reassembled in page order.
+    """
+    loop = asyncio.get_running_loop()
+    pool = _get_pdf_pool()
+
+    print(f"📖 Loading PDF in process pool...")
+    total_pages = await loop.run_in_executor(pool, count_pages, source)
+    ranges = page_ranges(total_pages, env.PDF_PAGES_PER_TASK)
+    results = await asyncio.gather(*(
+        loop.run_in_executor(pool, extract_page_range, source, start, end)
+        for start, end in ranges
+    ))
+
+    docs = []
+    for (start, _), texts in zip(ranges, results):
+        for offset, text in enumerate(texts):
+            docs.append(Document(
+                page_content=text,
+                metadata={
+                    "page": start + offset + 1,  # 1-indexed page numbers
+                    "source": key,
+                    "total_pages": total_pages
+                }
+            ))
+
+    pages_with_content = sum(1 for doc in docs if doc.page_content and doc.page_content.strip())
+    print(f"✅ PDF loaded: {len(docs)} pages ({pages_with_content} have text content, {len(ranges)} tasks)")
+    return docs
+
+
+async def _fetch_pdf_to_memory(key: str):
+    """
+    Stream the PDF straight into memory, skipping the temp file. When the
+    process pool is enabled the buffer is a SharedMemory block so workers
+    read it without a copy per task.
+    Returns: (source, release) where release() frees the buffer
+    """
+    use_pool = env.PDF_EXTRACT_PROCESSES > 0
+    shm = None
+
+    async with download_slots:
+        size = await asyncio.to_thread(_head_pdf_sync, key)
+        if use_pool:
+            shm = shared_memory.SharedMemory(create=True, size=max(1, size))
+            target = shm.buf
+        else:
+            target = memoryview(bytearray(size))
+
+        def release():
+            if shm is not None:
+                shm.unlink()
+                shm.close()
+            else:
+                target.release()
+
         try:
-            print(f"⬇️  Downloading to: {tmp_path}")
-            s3.download_file(BUCKET, key, tmp_path)
-            print(f"✅ Successfully downloaded!")
-            
-            print(f"📖 Loading PDF...")
-            reader = PdfReader(tmp_path)
-            
-            # Extract text from each page and create Document objects
-            docs = []
-            for page_num, page in enumerate(reader.pages):
-                text = page.extract_text()
-                doc = Document(
-                    page_content=text,
-                    metadata={
-                        "page": page_num + 1,  # 1-indexed page numbers
-                        "source": key,
-                        "total_pages": len(reader.pages)
-                    }
-                )
-                docs.append(doc)
-            
-            # Count pages with content
-            pages_with_content = sum(1 for doc in docs if doc.page_content and doc.page_content.strip())
-            print(f"✅ PDF loaded: {len(docs)} pages ({pages_with_content} have text content)")
-            
-            # Return docs AND temp file path so it can be cleaned up later
-            return docs, tmp_path
+            await asyncio.to_thread(_download_pdf_to_memory_sync, key, size, target)
         except Exception as e:
-            # Clean up temp file on error
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
             print(f"❌ Download failed: {e}")
-            raise e
+            release()
+            raise
+
+    source = ("shm", shm.name, size) if use_pool else target
+    return source, release
+
+
+async def _load_pdf_in_memory(key: str) -> list[Document]:
+    """Download into memory and parse the whole PDF from there"""
+    source, release = await _fetch_pdf_to_memory(key)
+    try:
+        async with parse_slots:
+            if env.PDF_EXTRACT_PROCESSES > 0:
+                return await _parse_pdf_in_pool(source, key)
+            return await asyncio.to_thread(_parse_pdf_sync, source, key)
+    finally:
+        release()
 
-async def load_pdf_from_s3(key: str) -> tuple[list[Document], str]:
+
+async def load_pdf_from_s3(key: str) -> tuple[list[Document], str | None]:
     """Async wrapper for loading PDF from S3 using thread pool
-    Returns: (documents, temp_file_path)
+    Download and parse each take a slot from their own stage limit,
+    so concurrent documents overlap network and CPU work.
+    Returns: (documents, temp_file_path); temp_file_path is None
+    when S3_LOADER_MODE is "memory"
     """
-    return await asyncio.to_thread(_load_pdf_from_s3_sync, key)
+    if env.S3_LOADER_MODE == "memory":
+        return await _load_pdf_in_memory(key), None
+
+    async with download_slots:
+        tmp_path = await asyncio.to_thread(_download_pdf_sync, key)
+
+    try:
+        async with parse_slots:
+            if env.PDF_EXTRACT_PROCESSES > 0:
+                docs = await _parse_pdf_in_pool(tmp_path, key)
+            else:
+                docs = await asyncio.to_thread(_parse_pdf_sync, tmp_path, key)
+    except Exception:
+        # Clean up temp file on error
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+    # Return docs AND temp file path so it can be cleaned up later
+    return docs, tmp_path
+
+
+async def iter_pdf_pages(key: str) -> AsyncIterator[Document]:
+    """
+    Download a PDF and yield its pages in order as soon as each page range
+    is extracted, so later stages can start before the last page is parsed.
+    The temp file / memory buffer is released when the iterator finishes.
+    """
+    if env.S3_LOADER_MODE == "memory":
+        source, release = await _fetch_pdf_to_memory(key)
+    else:
+        async with download_slots:
+            source = await asyncio.to_thread(_download_pdf_sync, key)
+
+        def release():
+            if os.path.exists(source):
+                os.unlink(source)
+                print(f"🗑️  Cleaned up temp file: {source}")
+
+    loop = asyncio.get_running_loop()
+    use_pool = env.PDF_EXTRACT_PROCESSES > 0
+
+    def run(fn, *args):
+        if use_pool:
+            return loop.run_in_executor(_get_pdf_pool(), fn, *args)
+        return asyncio.to_thread(fn, *args)
+
+    async def extract(start: int, end: int) -> list[str]:
+        async with parse_slots:
+            return await run(extract_page_range, source, start, end)
+
+    pending: deque[tuple[int, asyncio.Future]] = deque()
+    try:
+        total_pages = await run(count_pages, source)
+        ranges = page_ranges(total_pages, env.PDF_PAGES_PER_TASK)
+        print(f"📖 Streaming {total_pages} pages in {len(ranges)} ranges...")
+
+        # Keep a few ranges extracting ahead of the consumer of this iterator
+        lookahead = max(1, env.PDF_EXTRACT_PROCESSES)
+        next_range = 0
+        while next_range < len(ranges) or pending:
+            while next_range < len(ranges) and len(pending) < lookahead:
+                start, end = ranges[next_range]
+                pending.append((start, asyncio.ensure_future(extract(start, end))))
+                next_range += 1
+
+            start, task = pending.popleft()
+            texts = await task
+            for offset, text in enumerate(texts):
+                yield Document(
+                    page_content=text,
+                    metadata={
+                        "page": start + offset + 1,  # 1-indexed page numbers
+                        "source": key,
+                        "total_pages": total_pages
+                    }
+                )
+    finally:
+        for _, task in pending:
+            task.cancel()
+        try:
+            release()
+        except BufferError:
+            # An abandoned extraction thread still reads the buffer; GC frees it
+            print("⚠️  PDF buffer still in use by an extraction thread; leaving it to GC")
@@ -0,0 +1,116 @@
+"""
+PDF text extraction helpers that run inside worker processes.
+
+Keep this module free of env/S3/Qdrant imports: it is imported by every
+process in the extraction pool, and those should start fast and stay small.
+
+A PDF "source" is either a file path (str), an in-memory buffer
+(bytes/bytearray/memoryview), or a ("shm", name, size) tuple pointing at a
+SharedMemory block filled by the parent process.
+"""
+
+import io
+from multiprocessing import shared_memory
+from pypdf import PdfReader
+
+
+class MemoryViewStream(io.RawIOBase):
+    """Read-only, seekable stream over a buffer without copying it"""
+
+    def __init__(self, buffer):
+        self._view = memoryview(buffer).cast("B")
+        self._pos = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            self._pos = offset
+        elif whence == io.SEEK_CUR:
+            self._pos += offset
+        else:
+            self._pos = len(self._view) + offset
+        self._pos = max(0, self._pos)
+        return self._pos
+
+    def readinto(self, b) -> int:
+        chunk = self._view[self._pos:self._pos + len(b)]
+        n = len(chunk)
+        b[:n] = chunk
+        self._pos += n
+        return n
+
+    def close(self):
+        self._view.release()
+        super().close()
+
+
+def _attach_shared(name: str) -> shared_memory.SharedMemory:
+    """Attach to a block owned by the parent without letting this process unlink it"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        from multiprocessing import resource_tracker
+        # Before 3.13 attaching registers the block with the resource tracker.
+        # Spawned workers share the parent's tracker, where unregistering would
+        # remove the parent's entry (its unlink() then logs a KeyError). Only a
+        # tracker started by this process would unlink the block at exit.
+        own_tracker = getattr(resource_tracker._resource_tracker, "_fd", None) is None
+        shm = shared_memory.SharedMemory(name=name)
+        if own_tracker:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+def _with_reader(source, fn):
+    """Open source as a PdfReader, call fn(reader) and release every buffer"""
+    if isinstance(source, str):
+        return fn(PdfReader(source))
+
+    shm = None
+    if isinstance(source, tuple) and source[0] == "shm":
+        _, name, size = source
+        shm = _attach_shared(name)
+        buffer = shm.buf[:size]
+    else:
+        buffer = source
+
+    stream = MemoryViewStream(buffer)
+    try:
+        return fn(PdfReader(io.BufferedReader(stream)))
+    finally:
+        stream.close()
+        if shm is not None:
+            buffer.release()
+            shm.close()
+
+
+def count_pages(source) -> int:
+    """Return the number of pages in the PDF"""
+    return _with_reader(source, lambda reader: len(reader.pages))
+
+
+def extract_page_range(source, start: int, end: int) -> list[str]:
+    """Extract text for pages [start, end) of the PDF, in order"""
+    return _with_reader(
+        source,
+        lambda reader: [reader.pages[i].extract_text() for i in range(start, end)],
+    )
+
+
+def extract_all_pages(source) -> list[str]:
+    """Extract text for every page of the PDF, in order"""
+    return _with_reader(source, lambda reader: [page.extract_text() for page in reader.pages])
+
+
+def page_ranges(total_pages: int, pages_per_task: int) -> list[tuple[int, int]]:
+    """Split total_pages into consecutive [start, end) ranges"""
+    step = max(1, pages_per_task)
+    return [(start, min(start + step, total_pages)) for start in range(0, total_pages, step)]
@@ -2,15 +2,57 @@ import json
 import asyncio
 import aio_pika
 import os
+from contextlib import aclosing
 from botocore.exceptions import ClientError
 
-from consumer.aws.file_loader import load_pdf_from_s3
-from consumer.vector.insert import embed_and_store
+from consumer.aws.file_loader import iter_pdf_pages, load_pdf_from_s3, shutdown_pdf_pool
+from consumer.vector.insert import chunk_store, embed_and_store, embedding_cache, openai_client, stream_and_store
 from consumer.consumer_db import prisma
 from consumer.consumer_env import env
 
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # only needed to notify API workers of new documents
+    aioredis = None
+
 RABBIT_MQ_URL = env.RABBIT_MQ_URL
 QUEUE = "document_process_queue"
+# Number of messages handled concurrently (prefetch bounds the worker pool)
+CONCURRENCY = max(1, env.CONSUMER_CONCURRENCY)
+
+# The channel src/services/config_cache.py listens on
+CONFIG_INVALIDATION_CHANNEL = "filemind:config-invalidate"
+
+# Strong references to in-flight message tasks
+_inflight: set[asyncio.Task] = set()
+_redis = None
+
+
+async def _publish_bot_invalidation(bot_id: str):
+    """Make API workers drop their cached bot row (no-op without Redis)"""
+    global _redis
+    if not env.CACHE_INVALIDATION_REDIS_URL:
+        return
+    if aioredis is None:
+        print("⚠️ CACHE_INVALIDATION_REDIS_URL is set but redis is not installed")
+        return
+    if _redis is None:
+        _redis = aioredis.from_url(env.CACHE_INVALIDATION_REDIS_URL)
+    try:
+        await _redis.publish(CONFIG_INVALIDATION_CHANNEL, json.dumps({"kind": "bot", "key": bot_id}))
+    except Exception as e:
+        # The API still picks up the new version once its cached row expires
+        print(f"⚠️ Publishing cache invalidation failed: {e}")
+
+
+async def _bump_knowledge_version(bot_id: str):
+    """Tell the API's answer caches that this bot's documents changed"""
+    await prisma.bot.update(
+        where={"id": bot_id},
+        data={"knowledgeVersion": {"increment": 1}},
+    )
+    # The answer-cache fingerprint is built from the API's cached bot row
+    await _publish_bot_invalidation(bot_id)
 
 
 async def process_document(payload: dict):
@@ -24,7 +66,8 @@ async def process_document(payload: dict):
     user_id = payload.get("user_id")
     print(f"botIdishere{bot_id}")
     document = await prisma.document.find_first(
-        where={"id": document_id}
+        where={"id": document_id},
+        include={"bot": True},
     )
     
     print(f"documentishere { document }")
@@ -33,9 +76,30 @@ async def process_document(payload: dict):
         raise Exception(f"Document not found: {document_id}")
 
     document_path = document.storageUrl
+    chunking_strategy = (document.bot.chunkingStrategy if document.bot else None) or env.CHUNKING_STRATEGY
+    # Only used when the bot's collection is created (null = VECTOR_PROFILE)
+    vector_profile = document.bot.vectorProfile if document.bot else None
     print(f"📄 Loading document from S3: {document_path}")
     print(f"botIdishere{bot_id}")
-    # Async loading from S3 - returns (docs, temp_file_path)
+
+    if env.INGEST_STREAMING:
+        # Pages flow through chunk/embed/upsert while later pages are still
+        # being extracted; aclosing releases the download on any exit path
+        async with aclosing(iter_pdf_pages(document_path)) as pages:
+            await stream_and_store(
+                pages=pages,
+                bot_id=bot_id,
+                doc_id=document_id,
+                file_name=document.fileName,
+                user_id=user_id,
+                chunking_strategy=chunking_strategy,
+                vector_profile=vector_profile,
+            )
+        await _bump_knowledge_version(bot_id)
+        print("✅ Done:", payload)
+        return
+
+    # Async loading from S3 - returns (docs, temp_file_path or None)
     document_data, temp_file_path = await load_pdf_from_s3(document_path)
     print(f"botIdishere{bot_id}")
 
@@ -47,12 +111,15 @@ async def process_document(payload: dict):
             doc_id=document_id,
             file_name=document.fileName,
             user_id=user_id,
+            chunking_strategy=chunking_strategy,
+            vector_profile=vector_profile,
         )
+        await _bump_knowledge_version(bot_id)
 
         print("✅ Done:", payload)
     finally:
         # Clean up temporary file after processing is complete
-        if os.path.exists(temp_file_path):
+        if temp_file_path and os.path.exists(temp_file_path):
             os.unlink(temp_file_path)
             print(f"🗑️  Cleaned up temp file: {temp_file_path}")
 
@@ -108,6 +175,30 @@ async def on_message(message: aio_pika.IncomingMessage):
             await message.reject(requeue=True)
 
 
+async def dispatch_message(message: aio_pika.IncomingMessage):
+    """
+    Run on_message in its own task so up to CONCURRENCY deliveries
+    are processed at the same time.
+    """
+    task = asyncio.create_task(on_message(message))
+    _inflight.add(task)
+    task.add_done_callback(_inflight.discard)
+
+
+async def _drain_inflight(timeout: float):
+    """Wait for in-flight documents, cancelling whatever is still running after timeout"""
+    if not _inflight:
+        return
+    print(f"⏳ Waiting up to {timeout:.0f}s for {len(_inflight)} in-flight documents...")
+    _, pending = await asyncio.wait(set(_inflight), timeout=timeout)
+    for task in pending:
+        task.cancel()
+    # Cancelled deliveries are neither acked nor rejected; the broker redelivers them
+    await asyncio.gather(*pending, return_exceptions=True)
+    if pending:
+        print(f"⚠️ Cancelled {len(pending)} documents still processing at shutdown")
+
+
 async def start_consumer():
     # Connect to Prisma before starting consumer
     print("🔌 Connecting to Prisma...")
@@ -120,19 +211,37 @@ async def start_consumer():
         async with connection:
             channel = await connection.channel()
 
-            # Process ONE message at a time (important)
-            await channel.set_qos(prefetch_count=1)
+            # Take up to CONCURRENCY messages at once; each one is
+            # acked/rejected independently by on_message
+            await channel.set_qos(prefetch_count=CONCURRENCY)
 
             queue = await channel.declare_queue(
                 QUEUE,
                 durable=True
             )
 
-            await queue.consume(on_message)
-
-            print("👂 Async consumer started. Waiting for messages...")
-            await asyncio.Future()  # run forever
+            consumer_tag = await queue.consume(dispatch_message)
+
+            print(f"👂 Async consumer started ({CONCURRENCY} concurrent jobs). Waiting for messages...")
+            try:
+                await asyncio.Future()  # run forever
+            finally:
+                # Stop taking deliveries, then let in-flight documents finish while
+                # the channel (for their acks) and the clients below are still open
+                try:
+                    await queue.cancel(consumer_tag)
+                except Exception as e:
+                    print(f"⚠️ Could not cancel the queue consumer: {e}")
+                await _drain_inflight(env.CONSUMER_SHUTDOWN_TIMEOUT_SECONDS)
     finally:
+        shutdown_pdf_pool()
+        if embedding_cache is not None:
+            embedding_cache.close()
+        if chunk_store is not None:
+            chunk_store.close()
+        await openai_client.close()
+        if _redis is not None:
+            await _redis.aclose()
         # Disconnect Prisma when shutting down
         print("🔌 Disconnecting Prisma...")
         await prisma.disconnect()
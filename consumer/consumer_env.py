@@ -15,6 +15,85 @@ class Env(BaseSettings):
     OPENAI_API_KEY: str
     QDRANT_DB_CLUSTER_URL: str
     QDRANT_DB_API_KEY: str
+
+    # Worker pool: how many queue messages one consumer processes at once
+    CONSUMER_CONCURRENCY: int = 1
+    # On shutdown, how long in-flight documents may run before they are cancelled
+    CONSUMER_SHUTDOWN_TIMEOUT_SECONDS: float = 30.0
+    # Per-stage limits shared by every in-flight document
+    DOWNLOAD_CONCURRENCY: int = 4
+    PARSE_CONCURRENCY: int = 2
+    EMBED_CONCURRENCY: int = 4
+    UPSERT_CONCURRENCY: int = 4
+
+    # PDF text extraction in a process pool (0 = extract in a thread)
+    PDF_EXTRACT_PROCESSES: int = 0
+    PDF_PAGES_PER_TASK: int = 50
+
+    # "tempfile" downloads to disk; "memory" streams the object into RAM
+    S3_LOADER_MODE: str = "tempfile"
+    S3_RANGE_CHUNK_BYTES: int = 8 * 1024 * 1024
+    S3_RANGE_CONCURRENCY: int = 4
+
+    # Page-streaming pipeline (extract -> chunk -> embed -> upsert)
+    INGEST_STREAMING: bool = False
+    PIPELINE_CHUNK_QUEUE_SIZE: int = 512
+    PIPELINE_POINT_QUEUE_SIZE: int = 4
+    PIPELINE_EMBED_BATCH_SIZE: int = 256
+
+    # Qdrant upsert engine
+    UPSERT_MAX_IN_FLIGHT: int = 4
+    UPSERT_MAX_BATCH_POINTS: int = 100
+    UPSERT_MAX_BATCH_BYTES: int = 4 * 1024 * 1024
+    UPSERT_WAIT: bool = True
+    UPSERT_MAX_RETRIES: int = 3
+
+    # Embeddings (OPENAI_BASE_URL points at a proxy or a local fake server)
+    OPENAI_BASE_URL: str | None = None
+    EMBEDDING_MODEL: str = "text-embedding-3-small"
+    EMBEDDING_MAX_TOKENS_PER_REQUEST: int = 250_000
+    EMBEDDING_RPM: int = 0  # 0 = unlimited
+    EMBEDDING_TPM: int = 0  # 0 = unlimited
+    EMBEDDING_MAX_RETRIES: int = 5
+
+    # Shared OpenAI HTTP client (pooled keep-alive connections, HTTP/2 when h2 is installed)
+    OPENAI_HTTP2: bool = True
+    OPENAI_MAX_CONNECTIONS: int = 100
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    OPENAI_KEEPALIVE_EXPIRY: float = 60.0
+    OPENAI_TIMEOUT: float = 60.0
+    OPENAI_CONNECT_TIMEOUT: float = 5.0
+
+    # Embedding cache keyed by (model, normalized chunk hash)
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_PATH: str | None = ".cache/embeddings.sqlite3"
+    EMBEDDING_CACHE_MEMORY_ITEMS: int = 20_000
+
+    # Default chunking strategy when a bot has none set
+    # (recursive | tokens | sentences | sections)
+    CHUNKING_STRATEGY: str = "recursive"
+
+    # Store BM25 sparse vectors next to the dense ones for hybrid retrieval
+    HYBRID_SPARSE_ENABLED: bool = True
+
+    # Collection profile for new collections when the bot has none set
+    # (default | scalar | binary | compact, see src/vector/profiles.py)
+    VECTOR_PROFILE: str = "default"
+
+    # false = chunk text goes to the local chunk store (src/vector/chunk_store.py)
+    # instead of the Qdrant payload; the API must read the same file
+    CHUNK_TEXT_IN_QDRANT: bool = True
+    CHUNK_STORE_PATH: str = ".cache/chunks.sqlite3"
+
+    # Qdrant tenancy: "collection" (one per bot) or "shared" (bots partitioned
+    # by an is_tenant payload index across QDRANT_SHARED_COLLECTIONS collections)
+    QDRANT_TENANCY: str = "collection"
+    QDRANT_SHARED_COLLECTION_PREFIX: str = "filemind_shared"
+    QDRANT_SHARED_COLLECTIONS: int = 1
+
+    # Same Redis as the API's CACHE_INVALIDATION_REDIS_URL: ingesting a
+    # document invalidates the bot row cached by every API worker
+    CACHE_INVALIDATION_REDIS_URL: str | None = None
     class Config:
         env_file = ".env"
         case_sensitive = True
@@ -0,0 +1,16 @@
+"""
+Per-stage concurrency limits for the ingestion consumer.
+
+With CONSUMER_CONCURRENCY > 1 several documents are processed at once.
+Each pipeline stage takes a slot from its own semaphore so that, e.g.,
+ten concurrent documents never run ten CPU-bound PDF parses at the same time.
+Embedding requests are limited by the shared EmbeddingScheduler
+(EMBED_CONCURRENCY) in consumer/vector/insert.py.
+"""
+
+import asyncio
+from consumer.consumer_env import env
+
+download_slots = asyncio.Semaphore(max(1, env.DOWNLOAD_CONCURRENCY))
+parse_slots = asyncio.Semaphore(max(1, env.PARSE_CONCURRENCY))
+upsert_slots = asyncio.Semaphore(max(1, env.UPSERT_CONCURRENCY))
@@ -0,0 +1,62 @@
+"""
+Compare the chunking strategies on a fixed synthetic corpus.
+
+split_text itself is covered by tests/test_splitter.py (output compatibility,
+linear time and pytest-benchmark timings at 1, 10 and 100 MB).
+
+Usage:
+    python -m consumer.utils.bench_splitter
+"""
+
+import random
+import statistics
+import time
+from types import SimpleNamespace
+
+from consumer.vector.strategies import SPLITTERS
+from src.llm.embeddings import count_tokens
+
+WORDS = [
+    "the", "policy", "employee", "shall", "section", "manual", "device", "error",
+    "configuration", "warranty", "customer", "must", "within", "days", "of", "a",
+]
+
+
+def synthetic_pages(pages: int = 200, seed: int = 7) -> list:
+    """Fixed corpus of manual-like pages with numbered and upper-case headings"""
+    rng = random.Random(seed)
+    docs = []
+    section = 0
+    for page in range(1, pages + 1):
+        lines = []
+        for _ in range(rng.randint(3, 6)):
+            if rng.random() < 0.4:
+                section += 1
+                heading = f"{section}. {rng.choice(WORDS).title()} {rng.choice(WORDS).title()}"
+                lines.append(heading.upper() if rng.random() < 0.3 else heading)
+            for _ in range(rng.randint(2, 8)):
+                lines.append(" ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 25))) + ".")
+        docs.append(SimpleNamespace(page_content="\n".join(lines), metadata={"page": page, "total_pages": pages}))
+    return docs
+
+
+def bench_strategies():
+    pages = synthetic_pages()
+    print(f"{'strategy':<10} | {'chunks':>7} | {'chunks/s':>10} | {'tokens/chunk':>12} | {'stdev':>7} | {'min':>5} | {'max':>5}")
+    for name, splitter_cls in SPLITTERS.items():
+        splitter = splitter_cls()
+        started = time.perf_counter()
+        chunks = [chunk for doc in pages for chunk in splitter.split_page(doc)]
+        elapsed = time.perf_counter() - started
+        tokens = [count_tokens(chunk["text"]) for chunk in chunks]
+        print(
+            f"{name:<10} | {len(chunks):>7} | {len(chunks) / elapsed:>10.0f} | "
+            f"{statistics.mean(tokens):>12.1f} | {statistics.pstdev(tokens):>7.1f} | {min(tokens):>5} | {max(tokens):>5}"
+        )
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("✂️  Chunking strategy comparison (200 synthetic pages)")
+    print("=" * 60)
+    bench_strategies()
@@ -5,12 +5,18 @@ Usage:
     python -m consumer.utils.clear_qdrant
 """
 
+from qdrant_client.models import FieldCondition, Filter, FilterSelector, MatchValue
+from consumer.consumer_env import env
 from consumer.vector.qdrantdb import qdrant_client
-from consumer.vector.vector import ensure_collection
+from consumer.vector.vector import SCROLL_PAGE_SIZE, ensure_collection
+from src.vector.chunk_store import ChunkStore
+from src.vector.tenancy import locate_bot, tenant_filter
 import asyncio
 
 QDRANT_COLLECTION = "fileMind"
 
+chunk_store = None if env.CHUNK_TEXT_IN_QDRANT else ChunkStore(env.CHUNK_STORE_PATH)
+
 
 def clear_collection():
     """Delete all points from the Qdrant collection"""
@@ -67,66 +73,81 @@ def clear_collection():
         traceback.print_exc()
 
 
+def _bot_location(bot_id: str):
+    return locate_bot(bot_id, env.QDRANT_TENANCY, env.QDRANT_SHARED_COLLECTION_PREFIX, env.QDRANT_SHARED_COLLECTIONS)
+
+
+def _point_ids(collection_name: str, scroll_filter: Filter | None) -> list[str]:
+    ids = []
+    offset = None
+    while True:
+        points, offset = qdrant_client.scroll(
+            collection_name=collection_name,
+            scroll_filter=scroll_filter,
+            limit=SCROLL_PAGE_SIZE,
+            offset=offset,
+            with_payload=False,
+            with_vectors=False,
+        )
+        ids.extend(str(point.id) for point in points)
+        if offset is None:
+            return ids
+
+
 def delete_by_bot_id(bot_id: str):
     """Delete all points for a specific bot_id"""
     try:
         print("=" * 60)
         print(f"🗑️  Deleting records for bot_id: {bot_id}")
         print("=" * 60)
-        
-        # Delete points with matching bot_id
-        qdrant_client.delete(
-            collection_name=QDRANT_COLLECTION,
-            points_selector={
-                "filter": {
-                    "must": [
-                        {
-                            "key": "bot_id",
-                            "match": {
-                                "value": bot_id
-                            }
-                        }
-                    ]
-                }
-            }
-        )
-        
+
+        location = _bot_location(bot_id)
+        if chunk_store is not None:
+            asyncio.run(chunk_store.delete_many(_point_ids(location.collection_name, location.query_filter)))
+
+        if location.tenant is not None:
+            # Uses the bot_id tenant index instead of scanning every payload
+            qdrant_client.delete(
+                collection_name=location.collection_name,
+                points_selector=FilterSelector(filter=location.query_filter),
+            )
+        else:
+            qdrant_client.delete_collection(collection_name=location.collection_name)
+
         print(f"✅ Deleted all records for bot_id: {bot_id}")
         print("=" * 60)
-        
+
     except Exception as e:
         print(f"❌ Error deleting records: {e}")
         import traceback
         traceback.print_exc()
 
 
-def delete_by_document_id(doc_id: str):
+def delete_by_document_id(bot_id: str, doc_id: str):
     """Delete all points for a specific document_id"""
     try:
         print("=" * 60)
         print(f"🗑️  Deleting records for document_id: {doc_id}")
         print("=" * 60)
-        
-        # Delete points with matching doc_id
+
+        # doc_id (and bot_id in shared collections) are indexed payload keys
+        location = _bot_location(bot_id)
+        doc_condition = FieldCondition(key="doc_id", match=MatchValue(value=doc_id))
+        doc_filter = (
+            tenant_filter(bot_id, doc_condition)
+            if location.tenant is not None
+            else Filter(must=[doc_condition])
+        )
         qdrant_client.delete(
-            collection_name=QDRANT_COLLECTION,
-            points_selector={
-                "filter": {
-                    "must": [
-                        {
-                            "key": "doc_id",
-                            "match": {
-                                "value": doc_id
-                            }
-                        }
-                    ]
-                }
-            }
+            collection_name=location.collection_name,
+            points_selector=FilterSelector(filter=doc_filter),
         )
-        
+        if chunk_store is not None:
+            asyncio.run(chunk_store.delete_document(doc_id))
+
         print(f"✅ Deleted all records for document_id: {doc_id}")
         print("=" * 60)
-        
+
     except Exception as e:
         print(f"❌ Error deleting records: {e}")
         import traceback
@@ -167,15 +188,15 @@ if __name__ == "__main__":
         elif command == "delete-bot" and len(sys.argv) > 2:
             bot_id = sys.argv[2]
             delete_by_bot_id(bot_id)
-        elif command == "delete-doc" and len(sys.argv) > 2:
-            doc_id = sys.argv[2]
-            delete_by_document_id(doc_id)
+        elif command == "delete-doc" and len(sys.argv) > 3:
+            bot_id, doc_id = sys.argv[2], sys.argv[3]
+            delete_by_document_id(bot_id, doc_id)
         else:
             print("Usage:")
             print("  python -m consumer.utils.clear_qdrant clear          # Clear all records")
             print("  python -m consumer.utils.clear_qdrant stats          # Show collection stats")
             print("  python -m consumer.utils.clear_qdrant delete-bot <bot_id>")
-            print("  python -m consumer.utils.clear_qdrant delete-doc <doc_id>")
+            print("  python -m consumer.utils.clear_qdrant delete-doc <bot_id> <doc_id>")
     else:
         # Default: run clear_collection with confirmation
         clear_collection()
@@ -1,215 +1,378 @@
-# ingestion/chunk_embed.py
-
 import uuid
 import asyncio
-from openai import AsyncOpenAI
+import hashlib
+import time
+from collections import Counter
+from typing import AsyncIterator
 from qdrant_client.models import PointStruct
-from consumer.vector.qdrantdb import qdrant_client
 from consumer.consumer_env import env
-from consumer.vector.vector import ensure_collection
+from consumer.vector.vector import VectorTarget, delete_points, ensure_collection, fetch_doc_point_ids
+from consumer.vector.upsert import UpsertEngine
+from consumer.vector.splitter import split_text
+from consumer.vector.strategies import CHUNK_OVERLAP, CHUNK_SIZE, Splitter, get_splitter
+from src.llm.embeddings import EmbeddingScheduler
+from src.llm.embedding_cache import EmbeddingCache, embed_with_cache
+from src.llm.openai_client import create_openai_client
+from src.llm.sparse import SPARSE_VECTOR_NAME, document_sparse_vector
+from src.vector.chunk_store import ChunkStore
+from src.vector.profiles import embedding_dimensions
+from src.vector.tenancy import TENANT_KEY
+
+# Long-lived pooled OpenAI client (retries are handled by the scheduler)
+openai_client = create_openai_client(
+    api_key=env.OPENAI_API_KEY,
+    base_url=env.OPENAI_BASE_URL,
+    http2=env.OPENAI_HTTP2,
+    max_connections=env.OPENAI_MAX_CONNECTIONS,
+    max_keepalive_connections=env.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry=env.OPENAI_KEEPALIVE_EXPIRY,
+    timeout=env.OPENAI_TIMEOUT,
+    connect_timeout=env.OPENAI_CONNECT_TIMEOUT,
+    max_retries=0,
+)
+
+# Shared by every in-flight document, so its limits are worker-wide
+embedding_scheduler = EmbeddingScheduler(
+    openai_client,
+    model=env.EMBEDDING_MODEL,
+    max_tokens_per_request=env.EMBEDDING_MAX_TOKENS_PER_REQUEST,
+    max_in_flight=env.EMBED_CONCURRENCY,
+    rpm=env.EMBEDDING_RPM,
+    tpm=env.EMBEDDING_TPM,
+    max_retries=env.EMBEDDING_MAX_RETRIES,
+)
 
-# Initialize Async OpenAI client
-openai_client = AsyncOpenAI(api_key=env.OPENAI_API_KEY)
+# Content-addressed vector cache shared across documents and bots
+embedding_cache = EmbeddingCache(
+    env.EMBEDDING_CACHE_PATH,
+    memory_items=env.EMBEDDING_CACHE_MEMORY_ITEMS,
+) if env.EMBEDDING_CACHE_ENABLED else None
 
-# Text splitter configuration
-CHUNK_SIZE = 1000
-CHUNK_OVERLAP = 200
+# Chunk texts outside Qdrant (points then carry no "text" payload)
+chunk_store = None if env.CHUNK_TEXT_IN_QDRANT else ChunkStore(env.CHUNK_STORE_PATH)
+
+# Namespace for deterministic chunk point IDs (never change it: existing
+# points would no longer match and every document would be re-embedded)
+POINT_ID_NAMESPACE = uuid.UUID("6f1c2e0a-5b7d-4c1e-9a38-2d4f8b1e7c55")
 
 
 def split_text_recursive(text: str, chunk_size: int = CHUNK_SIZE, chunk_overlap: int = CHUNK_OVERLAP, separators: list[str] = None) -> list[str]:
     """
     Simple recursive text splitter - splits text into chunks with overlap.
     Alternative to LangChain's RecursiveCharacterTextSplitter.
+    Runs in linear time on index spans (see consumer/vector/splitter.py).
     """
-    if separators is None:
-        separators = ["\n\n", "\n", ". ", " ", ""]
-    
-    chunks = []
-    
-    def _split(text: str, separators: list[str]) -> list[str]:
-        if not text:
-            return []
-        
-        # Try each separator
-        for i, separator in enumerate(separators):
-            if separator == "":
-                # Last separator - split by character
-                return [text[i:i + chunk_size] for i in range(0, len(text), chunk_size - chunk_overlap)]
-            
-            if separator in text:
-                splits = text.split(separator)
-                result = []
-                current_chunk = ""
-                
-                for split in splits:
-                    # Re-add separator except for empty splits
-                    split_with_sep = split + separator if split else ""
-                    
-                    if len(current_chunk) + len(split_with_sep) <= chunk_size:
-                        current_chunk += split_with_sep
-                    else:
-                        if current_chunk:
-                            result.append(current_chunk)
-                        # If single split is larger than chunk_size, recursively split it
-                        if len(split_with_sep) > chunk_size:
-                            result.extend(_split(split_with_sep, separators[i + 1:]))
-                            current_chunk = ""
-                        else:
-                            current_chunk = split_with_sep
-                
-                if current_chunk:
-                    result.append(current_chunk)
-                
-                return result
-        
-        return [text]
-    
-    chunks = _split(text, separators)
-    
-    # Add overlap between chunks
-    if chunk_overlap > 0 and len(chunks) > 1:
-        overlapped_chunks = []
-        for i, chunk in enumerate(chunks):
-            if i == 0:
-                overlapped_chunks.append(chunk)
-            else:
-                # Take overlap from previous chunk
-                overlap = chunks[i - 1][-chunk_overlap:] if len(chunks[i - 1]) >= chunk_overlap else chunks[i - 1]
-                overlapped_chunks.append(overlap + chunk)
-        return overlapped_chunks
-    
-    return chunks
+    return split_text(text, chunk_size, chunk_overlap, separators)
 
 
-async def embed_texts_async(texts: list[str], batch_size: int = 1000) -> list[list[float]]:
+async def embed_texts_async(texts: list[str], dimensions: int | None = None) -> list[list[float]]:
     """
-    Async function to embed multiple texts using OpenAI API with batching.
-    Returns a list of embedding vectors.
+    Async function to embed multiple texts using OpenAI API.
+    Returns a list of embedding vectors, in input order.
     
-    Batches requests to respect OpenAI's 300K token limit per request.
-    Each chunk is ~250 tokens (1000 chars / 4), so 1000 chunks = ~250K tokens (safe margin).
+    Chunks already in the embedding cache are not sent to the API; the
+    rest are packed by real token count under the per-request ceiling
+    and run concurrently within the configured RPM/TPM budget.
+    dimensions requests reduced-size vectors (see src/vector/profiles.py).
     """
-    all_embeddings = []
-    
-    # Process in batches to avoid token limit
-    for i in range(0, len(texts), batch_size):
-        batch = texts[i:i + batch_size]
-        batch_num = (i // batch_size) + 1
-        total_batches = (len(texts) + batch_size - 1) // batch_size
-        
-        print(f"      Embedding batch {batch_num}/{total_batches} ({len(batch)} chunks)...")
-        
-        response = await openai_client.embeddings.create(
-            model="text-embedding-3-small",
-            input=batch
-        )
-        batch_embeddings = [item.embedding for item in response.data]
-        all_embeddings.extend(batch_embeddings)
-    
-    return all_embeddings
+    return await embed_with_cache(embedding_cache, embedding_scheduler, texts, dimensions)
+
+
+def _target_dimensions(target: VectorTarget) -> int | None:
+    return embedding_dimensions(embedding_scheduler.model, target.vector_size)
+
+
+async def _store_texts(doc_id: str, chunks: list[dict]):
+    """Write chunk texts to the chunk store before their points become searchable"""
+    if chunk_store is not None:
+        await chunk_store.put_many(doc_id, [(chunk["id"], chunk["text"]) for chunk in chunks])
+
+
+async def _delete_points_and_texts(collection_name: str, point_ids: list[str]):
+    await delete_points(collection_name, point_ids)
+    if chunk_store is not None:
+        await chunk_store.delete_many(point_ids)
+
+
+def _print_cache_stats():
+    if embedding_cache is not None:
+        print(f"   🧠 Embedding cache: {embedding_cache.stats()}")
+
+
+class ChunkIdAssigner:
+    """
+    Gives every chunk of a document a deterministic point ID derived from
+    (doc_id, page, chunk content hash, occurrence), plus its running index.
+    Re-ingesting an unchanged chunk therefore yields the same point ID.
+    """
+
+    def __init__(self, doc_id: str):
+        self.doc_id = doc_id
+        self.next_index = 0
+        self._occurrences: Counter = Counter()
+
+    def assign(self, chunk: dict) -> dict:
+        digest = hashlib.sha256(chunk["text"].encode("utf-8")).hexdigest()
+        # Identical text repeated on one page still needs distinct IDs
+        occurrence = self._occurrences[(chunk.get("page"), digest)]
+        self._occurrences[(chunk.get("page"), digest)] += 1
+        chunk["id"] = str(uuid.uuid5(POINT_ID_NAMESPACE, f"{self.doc_id}:{chunk.get('page')}:{digest}:{occurrence}"))
+        chunk["index"] = self.next_index
+        self.next_index += 1
+        return chunk
+
+
+def _build_point(
+    chunk: dict,
+    vector: list[float],
+    doc_id: str,
+    file_name: str,
+    user_id: str,
+    sparse: bool = False,
+    tenant: str | None = None,
+) -> PointStruct:
+    """Build the Qdrant point for one chunk (ID/index set by ChunkIdAssigner)"""
+    payload = {
+        "doc_id": doc_id,
+        "file_name": file_name,
+        "user_id": user_id,
+        "page": chunk.get("page"),
+        "chunk_index": chunk["index"],
+    }
+    if chunk_store is None:
+        payload["text"] = chunk["text"]
+    if chunk.get("section"):
+        payload["section"] = chunk["section"]
+    if tenant is not None:
+        payload[TENANT_KEY] = tenant
+    if sparse:
+        sparse_vector = document_sparse_vector(chunk["text"])
+        if sparse_vector.indices:
+            # Dense vector stays the unnamed default, so older code and collections still match
+            vector = {"": vector, SPARSE_VECTOR_NAME: sparse_vector}
+    return PointStruct(id=chunk["id"], vector=vector, payload=payload)
+
+
+def _chunk_page(doc, splitter: Splitter) -> list[dict]:
+    """Split one page into chunk dicts carrying its metadata"""
+    return [
+        {
+            **chunk,
+            "page": doc.metadata.get("page"),
+            "metadata": doc.metadata
+        }
+        for chunk in splitter.split_page(doc)
+    ]
+
+
+def _has_content(doc) -> bool:
+    return bool(doc.page_content and doc.page_content.strip())
+
+
+def _no_text_error(file_name: str) -> ValueError:
+    error_msg = (
+        f"PDF '{file_name}' has no extractable text content. "
+        f"This is likely a scanned/image-based PDF. "
+        f"Please use OCR or upload a text-based PDF."
+    )
+    print(f"❌ {error_msg}")
+    return ValueError(error_msg)
+
 
 async def _embed_and_store_async(
     docs,
     bot_id: str,
     doc_id: str,
     file_name: str,
-    user_id: str
+    user_id: str,
+    splitter: Splitter,
+    target: VectorTarget
 ):
     """Async helper for embedding and storing"""
     # Get collection name based on bot_id
-    collection_name = bot_id
+    collection_name = target.collection_name
     
     # Don't print the entire document list - it's too long
     print(f"📚 Processing {len(docs)} pages from '{file_name}' for bot '{bot_id}'")
     print(f"   Target collection: '{collection_name}'")
     
     # Check if documents have any content
-    pages_with_content = sum(1 for doc in docs if doc.page_content and doc.page_content.strip())
+    pages_with_content = sum(1 for doc in docs if _has_content(doc))
     print(f"   Pages with content: {pages_with_content}/{len(docs)}")
     
     if pages_with_content == 0:
-        error_msg = (
-            f"PDF '{file_name}' has no extractable text content. "
-            f"This is likely a scanned/image-based PDF. "
-            f"Please use OCR or upload a text-based PDF."
-        )
-        print(f"❌ {error_msg}")
-        raise ValueError(error_msg)
+        raise _no_text_error(file_name)
     
     # Filter out empty pages before splitting
-    docs_with_content = [doc for doc in docs if doc.page_content and doc.page_content.strip()]
-    print(f"   Splitting {len(docs_with_content)} non-empty pages into chunks...")
+    docs_with_content = [doc for doc in docs if _has_content(doc)]
+    print(f"   Splitting {len(docs_with_content)} non-empty pages into chunks ({splitter.name})...")
     
-    # Split each document into chunks
+    # Split each document into chunks, keeping track of metadata for each chunk
     all_chunks = []
     for doc in docs_with_content:
-        text = doc.page_content
-        text_chunks = split_text_recursive(text, CHUNK_SIZE, CHUNK_OVERLAP)
-        
-        # Keep track of metadata for each chunk
-        for chunk_text in text_chunks:
-            all_chunks.append({
-                "text": chunk_text,
-                "page": doc.metadata.get("page"),
-                "metadata": doc.metadata
-            })
+        all_chunks.extend(_chunk_page(doc, splitter))
     
     print(f"   ✅ Created {len(all_chunks)} chunks")
     
     if not all_chunks:
         raise ValueError(f"No chunks created from document '{file_name}'. Document may be empty.")
+
+    # Diff against what Qdrant already holds for this document
+    assigner = ChunkIdAssigner(doc_id)
+    for chunk in all_chunks:
+        assigner.assign(chunk)
+    existing_ids = await fetch_doc_point_ids(collection_name, doc_id, target.tenant)
+    new_chunks = [chunk for chunk in all_chunks if chunk["id"] not in existing_ids]
+    vanished_ids = list(existing_ids - {chunk["id"] for chunk in all_chunks})
+    print(f"   🔍 Diff: {len(new_chunks)} new, {len(all_chunks) - len(new_chunks)} unchanged, {len(vanished_ids)} removed")
     
-    print(f"   🔄 Generating embeddings for {len(all_chunks)} chunks...")
-    texts = [chunk["text"] for chunk in all_chunks]
-    vectors = await embed_texts_async(texts)
+    print(f"   🔄 Generating embeddings for {len(new_chunks)} chunks...")
+    texts = [chunk["text"] for chunk in new_chunks]
+    vectors = await embed_texts_async(texts, _target_dimensions(target))
     print(f"   ✅ Embeddings generated")
 
-    print(f"   📦 Preparing {len(all_chunks)} points for Qdrant...")
-    points = []
-    for i, (chunk, vector) in enumerate(zip(all_chunks, vectors)):
-        points.append(
-            PointStruct(
-                id=str(uuid.uuid4()),
-                vector=vector,
-                payload={
-                    "doc_id": doc_id,
-                    "file_name": file_name,
-                    "user_id": user_id,
-                    "page": chunk.get("page"),
-                    "chunk_index": i,
-                    "text": chunk["text"]
-                }
-            )
-        )
-
-    # Batch upsert for better performance and to avoid timeouts
+    print(f"   📦 Preparing {len(new_chunks)} points for Qdrant...")
+    points = [
+        _build_point(chunk, vector, doc_id, file_name, user_id, target.sparse, target.tenant)
+        for chunk, vector in zip(new_chunks, vectors)
+    ]
+
+    await _store_texts(doc_id, new_chunks)
+
+    # Batched, concurrent upsert for better performance and to avoid timeouts
     print(f"   💾 Upserting {len(points)} points to '{collection_name}' in batches...")
-    batch_size = 100
-    total_batches = (len(points) + batch_size - 1) // batch_size
-    # think of way we can do this in parallel 
-    for i in range(0, len(points), batch_size):
-        batch = points[i:i + batch_size]
-        batch_num = (i // batch_size) + 1
-        print(f"      Batch {batch_num}/{total_batches}: Upserting {len(batch)} points...")
-        # Use asyncio.to_thread for synchronous Qdrant client
-        await asyncio.to_thread(
-            qdrant_client.upsert,
-            collection_name=collection_name,
-            points=batch
-        )
+    engine = UpsertEngine(collection_name)
+    try:
+        await engine.submit(points)
+        await engine.close()
+    except BaseException:
+        await engine.abort()
+        raise
+
+    # Only drop vanished chunks once the new ones are stored
+    await _delete_points_and_texts(collection_name, vanished_ids)
     
-    print(f"✅ Successfully stored {len(points)} chunks in collection '{collection_name}'")
+    _print_cache_stats()
+    print(f"✅ Successfully stored {len(points)} chunks in collection '{collection_name}' ({len(vanished_ids)} removed)")
+
+
+async def _stream_and_store_async(
+    pages: AsyncIterator,
+    bot_id: str,
+    doc_id: str,
+    file_name: str,
+    user_id: str,
+    splitter: Splitter,
+    target: VectorTarget
+):
+    """
+    Page-streaming pipeline: pages -> chunks -> embedding batches -> upserts.
+
+    Each stage is a task connected to the next by a bounded queue, so
+    embedding batch k overlaps the upsert of batch k-1 and the extraction
+    of later pages, and memory is bounded by the queue sizes rather than
+    by the document size.
+    """
+    collection_name = target.collection_name
+    print(f"📚 Streaming '{file_name}' for bot '{bot_id}' into '{collection_name}' ({splitter.name} chunking)")
+
+    chunk_queue: asyncio.Queue = asyncio.Queue(maxsize=env.PIPELINE_CHUNK_QUEUE_SIZE)
+    point_queue: asyncio.Queue = asyncio.Queue(maxsize=env.PIPELINE_POINT_QUEUE_SIZE)
+    stats = {"pages": 0, "pages_with_content": 0, "chunks": 0, "points": 0}
+    engine = UpsertEngine(collection_name)
+    started = time.perf_counter()
+
+    # Chunks whose deterministic ID is already stored are skipped entirely
+    assigner = ChunkIdAssigner(doc_id)
+    existing_ids = await fetch_doc_point_ids(collection_name, doc_id, target.tenant)
+    current_ids: set[str] = set()
+
+    async def chunk_stage():
+        async for doc in pages:
+            stats["pages"] += 1
+            if not _has_content(doc):
+                continue
+            stats["pages_with_content"] += 1
+            for chunk in _chunk_page(doc, splitter):
+                stats["chunks"] += 1
+                assigner.assign(chunk)
+                current_ids.add(chunk["id"])
+                if chunk["id"] not in existing_ids:
+                    await chunk_queue.put(chunk)
+        await chunk_queue.put(None)
+
+    async def embed_stage():
+        batch = []
+        done = False
+        while not done:
+            chunk = await chunk_queue.get()
+            if chunk is None:
+                done = True
+            else:
+                batch.append(chunk)
+            if batch and (done or len(batch) >= env.PIPELINE_EMBED_BATCH_SIZE):
+                vectors = await embed_texts_async([c["text"] for c in batch], _target_dimensions(target))
+                await _store_texts(doc_id, batch)
+                points = [
+                    _build_point(chunk, vector, doc_id, file_name, user_id, target.sparse, target.tenant)
+                    for chunk, vector in zip(batch, vectors)
+                ]
+                await point_queue.put(points)
+                batch = []
+        await point_queue.put(None)
+
+    async def upsert_stage():
+        while True:
+            points = await point_queue.get()
+            if points is None:
+                return
+            await engine.submit(points)
+            stats["points"] += len(points)
+
+    tasks = [
+        asyncio.create_task(chunk_stage()),
+        asyncio.create_task(embed_stage()),
+        asyncio.create_task(upsert_stage()),
+    ]
+    try:
+        await asyncio.gather(*tasks)
+        await engine.close()
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await engine.abort()
+        raise
+
+    if engine.first_stored_at is not None:
+        print(f"   ⏱️  First chunks stored after {engine.first_stored_at - started:.2f}s")
+
+    print(f"   Pages with content: {stats['pages_with_content']}/{stats['pages']}")
+    if stats["pages_with_content"] == 0:
+        raise _no_text_error(file_name)
+    if stats["chunks"] == 0:
+        raise ValueError(f"No chunks created from document '{file_name}'. Document may be empty.")
+
+    vanished_ids = list(existing_ids - current_ids)
+    await _delete_points_and_texts(collection_name, vanished_ids)
+    print(f"   🔍 Diff: {stats['points']} new, {stats['chunks'] - stats['points']} unchanged, {len(vanished_ids)} removed")
+
+    _print_cache_stats()
+    print(f"✅ Successfully stored {stats['points']} chunks in collection '{collection_name}' in {time.perf_counter() - started:.2f}s")
+
 
 async def embed_and_store(
     docs,
     bot_id: str,
     doc_id: str,
     file_name: str,
-    user_id: str
+    user_id: str,
+    chunking_strategy: str | None = None,
+    vector_profile: str | None = None
 ):
     """Async function for embedding and storing"""
     # Ensure collection exists for this bot_id before storing
-    await ensure_collection(bot_id)
+    target = await ensure_collection(bot_id, vector_profile)
     
     # Directly call the async function
     await _embed_and_store_async(
@@ -217,5 +380,31 @@ async def embed_and_store(
         bot_id,
         doc_id,
         file_name,
-        user_id
+        user_id,
+        get_splitter(chunking_strategy),
+        target
+    )
+
+
+async def stream_and_store(
+    pages: AsyncIterator,
+    bot_id: str,
+    doc_id: str,
+    file_name: str,
+    user_id: str,
+    chunking_strategy: str | None = None,
+    vector_profile: str | None = None
+):
+    """Async function for embedding and storing pages as they are extracted"""
+    # Ensure collection exists for this bot_id before storing
+    target = await ensure_collection(bot_id, vector_profile)
+
+    await _stream_and_store_async(
+        pages,
+        bot_id,
+        doc_id,
+        file_name,
+        user_id,
+        get_splitter(chunking_strategy),
+        target
     )
@@ -0,0 +1,119 @@
+"""
+Copy per-bot collections into the shared multi-tenant collections.
+
+Every point keeps its ID, vectors and payload and gains a bot_id payload
+key, so re-running the tool is idempotent. Only collections named after an
+existing bot are migrated.
+
+Suggested rollout:
+    1. python -m consumer.vector.migrate_tenancy              # copy while still in "collection" mode
+    2. set QDRANT_TENANCY=shared for the API and the consumer, restart
+    3. python -m consumer.vector.migrate_tenancy              # pick up documents ingested in between
+    4. python -m consumer.vector.migrate_tenancy --delete-source
+
+Usage:
+    python -m consumer.vector.migrate_tenancy [--bot <bot_id> ...] [--dry-run] [--delete-source]
+"""
+
+import argparse
+import asyncio
+
+from qdrant_client.models import PointStruct
+
+from consumer.consumer_db import prisma
+from consumer.consumer_env import env
+from consumer.vector.qdrantdb import qdrant_client
+from consumer.vector.vector import SCROLL_PAGE_SIZE, target_from_info, ensure_shared_collection_sync
+from src.llm.sparse import SPARSE_VECTOR_NAME
+from src.vector.tenancy import TENANT_KEY, is_shared_collection, shared_collection_name, tenant_filter
+
+
+def _vectors(vector, sparse: bool):
+    """Vectors of a scrolled point in the shape the shared collection accepts"""
+    if not isinstance(vector, dict):
+        return vector
+    if sparse and vector.get(SPARSE_VECTOR_NAME) is not None:
+        return {"": vector[""], SPARSE_VECTOR_NAME: vector[SPARSE_VECTOR_NAME]}
+    return vector[""]
+
+
+def migrate_collection(bot_id: str, dry_run: bool = False, delete_source: bool = False) -> int:
+    """Copy one bot's collection into its shared collection; returns points copied"""
+    target = shared_collection_name(bot_id, env.QDRANT_SHARED_COLLECTION_PREFIX, env.QDRANT_SHARED_COLLECTIONS)
+    source_count = qdrant_client.count(bot_id, exact=True).count
+    print(f"🚚 {bot_id}: {source_count} points -> '{target}'")
+    if dry_run:
+        return 0
+
+    shared = ensure_shared_collection_sync(target)
+    source_size = target_from_info(bot_id, qdrant_client.get_collection(bot_id)).vector_size
+    if source_size != shared.vector_size:
+        # Vectors cannot be converted; the bot's documents have to be re-ingested
+        print(f"   ❌ {source_size}-d vectors do not fit '{target}' ({shared.vector_size}-d), skipping")
+        return 0
+    copied = 0
+    offset = None
+    while True:
+        points, offset = qdrant_client.scroll(
+            collection_name=bot_id,
+            limit=SCROLL_PAGE_SIZE,
+            offset=offset,
+            with_payload=True,
+            with_vectors=True,
+        )
+        if points:
+            qdrant_client.upsert(
+                collection_name=target,
+                points=[
+                    PointStruct(
+                        id=point.id,
+                        vector=_vectors(point.vector, shared.sparse),
+                        payload={**(point.payload or {}), TENANT_KEY: bot_id},
+                    )
+                    for point in points
+                ],
+                wait=True,
+            )
+            copied += len(points)
+        if offset is None:
+            break
+
+    target_count = qdrant_client.count(target, count_filter=tenant_filter(bot_id), exact=True).count
+    if target_count < source_count:
+        print(f"   ❌ Only {target_count}/{source_count} points present in '{target}', keeping the source")
+        return copied
+    print(f"   ✅ Copied {copied} points ({target_count} stored for this bot)")
+    if delete_source:
+        qdrant_client.delete_collection(bot_id)
+        print(f"   🗑️ Deleted collection '{bot_id}'")
+    return copied
+
+
+async def main(args):
+    names = [c.name for c in qdrant_client.get_collections().collections]
+    names = [n for n in names if not is_shared_collection(n, env.QDRANT_SHARED_COLLECTION_PREFIX)]
+    if args.bot:
+        names = [n for n in names if n in set(args.bot)]
+
+    await prisma.connect()
+    try:
+        bots = await prisma.bot.find_many(where={"id": {"in": names}})
+    finally:
+        await prisma.disconnect()
+    bot_ids = {bot.id for bot in bots}
+    skipped = [n for n in names if n not in bot_ids]
+    if skipped:
+        print(f"⏭️ Skipping {len(skipped)} collections that are not bots: {', '.join(skipped[:10])}")
+
+    total = 0
+    for bot_id in sorted(bot_ids):
+        total += await asyncio.to_thread(migrate_collection, bot_id, args.dry_run, args.delete_source)
+    print(f"🏁 Migrated {len(bot_ids)} bots, {total} points")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bot", action="append", help="only migrate these bot IDs")
+    parser.add_argument("--dry-run", action="store_true")
+    parser.add_argument("--delete-source", action="store_true", help="drop each per-bot collection once copied")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,74 @@
+"""
+Move the chunk text of already ingested points into the chunk store.
+
+New points skip the "text" payload once CHUNK_TEXT_IN_QDRANT=false; this
+tool does the same for points stored earlier. Texts are written to the
+store first and only then removed from Qdrant, so searches never see a
+point without text. Re-running it is safe.
+
+Usage:
+    python -m consumer.vector.offload_chunk_text <bot_id> [<bot_id> ...]
+"""
+
+import argparse
+import asyncio
+from collections import defaultdict
+
+from consumer.consumer_env import env
+from consumer.vector.qdrantdb import qdrant_client
+from consumer.vector.vector import SCROLL_PAGE_SIZE
+from src.vector.chunk_store import ChunkStore
+from src.vector.tenancy import locate_bot
+
+
+async def offload_bot(chunk_store: ChunkStore, bot_id: str) -> int:
+    """Offload one bot's texts; returns how many points were slimmed"""
+    location = locate_bot(bot_id, env.QDRANT_TENANCY, env.QDRANT_SHARED_COLLECTION_PREFIX, env.QDRANT_SHARED_COLLECTIONS)
+    moved = 0
+    offset = None
+    while True:
+        points, offset = await asyncio.to_thread(
+            qdrant_client.scroll,
+            collection_name=location.collection_name,
+            scroll_filter=location.query_filter,
+            limit=SCROLL_PAGE_SIZE,
+            offset=offset,
+            with_payload=["text", "doc_id"],
+            with_vectors=False,
+        )
+        by_doc: dict[str, list[tuple[str, str]]] = defaultdict(list)
+        for point in points:
+            if point.payload.get("text") is not None:
+                by_doc[point.payload.get("doc_id")].append((str(point.id), point.payload["text"]))
+        for doc_id, items in by_doc.items():
+            await chunk_store.put_many(doc_id, items)
+        ids = [point_id for items in by_doc.values() for point_id, _ in items]
+        if ids:
+            await asyncio.to_thread(
+                qdrant_client.delete_payload,
+                collection_name=location.collection_name,
+                keys=["text"],
+                points=ids,
+                wait=True,
+            )
+            moved += len(ids)
+        if offset is None:
+            return moved
+
+
+async def main(args):
+    if env.CHUNK_TEXT_IN_QDRANT:
+        print("⚠️ CHUNK_TEXT_IN_QDRANT is true: new documents will still store text in Qdrant")
+    chunk_store = ChunkStore(env.CHUNK_STORE_PATH)
+    try:
+        for bot_id in args.bots:
+            moved = await offload_bot(chunk_store, bot_id)
+            print(f"📦 {bot_id}: moved {moved} chunk texts to {env.CHUNK_STORE_PATH}")
+    finally:
+        chunk_store.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("bots", nargs="+")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,159 @@
+"""
+Linear-time recursive text splitter working on index spans.
+
+Same greedy packing as the original split_text_recursive: split on the
+first separator present, pack pieces (each keeping its trailing separator)
+into chunks of at most chunk_size characters, recurse with the remaining
+separators into pieces that are still too large, fall back to fixed
+windows (character counts, or the measure's units when one is given), then prefix each chunk with the last chunk_overlap
+characters of the previous one.
+
+Every level of recursion only scans its own span with str.find, so the
+total work is O(len(text) * len(separators)) and no intermediate strings
+are built; chunk strings are sliced once at the end. Chunks are exact
+slices of the source text (the old splitter could append a separator that
+was not in the text and dropped repeated separators).
+"""
+
+DEFAULT_SEPARATORS = ["\n\n", "\n", ". ", " ", ""]
+
+
+def _char_length(text: str, start: int, end: int) -> int:
+    return end - start
+
+
+def _window_end(text: str, start: int, end: int, limit: int, measure, guess: int) -> int:
+    """Furthest position <= end with measure(start, position) <= limit (at least one character)"""
+    low, high = start + 1, min(end, start + max(1, guess))
+    # Grow the guess until it no longer fits, then binary-search below it
+    while high < end and measure(text, start, high) <= limit:
+        low, high = high, min(end, start + (high - start) * 2)
+    if measure(text, start, high) <= limit:
+        return high
+    high -= 1
+    while low < high:
+        middle = (low + high + 1) // 2
+        if measure(text, start, middle) <= limit:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _measured_windows(
+    text: str, start: int, end: int, chunk_size: int, chunk_overlap: int, measure, chars_per_unit: int
+) -> list[tuple[int, int]]:
+    """Fixed windows sized by measure (e.g. tokens) instead of an estimated character count"""
+    spans = []
+    pos = start
+    while pos < end:
+        window_end = _window_end(text, pos, end, chunk_size, measure, chunk_size * chars_per_unit)
+        spans.append((pos, window_end))
+        if window_end >= end:
+            break
+        pos = max(pos + 1, window_end - chunk_overlap * chars_per_unit)
+    return spans
+
+
+def _split_spans(
+    text: str,
+    start: int,
+    end: int,
+    separators: list[str],
+    chunk_size: int,
+    chunk_overlap: int,
+    measure=_char_length,
+    chars_per_unit: int = 1,
+) -> list[tuple[int, int]]:
+    if start >= end:
+        return []
+
+    for i, separator in enumerate(separators):
+        if separator == "":
+            if measure is not _char_length:
+                return _measured_windows(text, start, end, chunk_size, chunk_overlap, measure, chars_per_unit)
+            # Last separator - fixed character windows
+            window = chunk_size * chars_per_unit
+            step = max(1, window - chunk_overlap * chars_per_unit)
+            return [(pos, min(pos + window, end)) for pos in range(start, end, step)]
+
+        if text.find(separator, start, end) == -1:
+            continue
+
+        result = []
+        remaining = separators[i + 1:]
+        chunk_start = chunk_end = pos = start
+        chunk_len = 0
+        while pos < end:
+            found = text.find(separator, pos, end)
+            piece_end = end if found == -1 else found + len(separator)
+            piece_len = measure(text, pos, piece_end)
+
+            if chunk_len + piece_len <= chunk_size:
+                chunk_end = piece_end
+                chunk_len += piece_len
+            else:
+                if chunk_end > chunk_start:
+                    result.append((chunk_start, chunk_end))
+                if piece_len > chunk_size:
+                    # Single piece larger than chunk_size - split it further
+                    result.extend(_split_spans(
+                        text, pos, piece_end, remaining, chunk_size, chunk_overlap, measure, chars_per_unit
+                    ))
+                    chunk_start = chunk_end = piece_end
+                    chunk_len = 0
+                else:
+                    chunk_start, chunk_end = pos, piece_end
+                    chunk_len = piece_len
+            pos = piece_end
+
+        if chunk_end > chunk_start:
+            result.append((chunk_start, chunk_end))
+        return result
+
+    return [(start, end)]
+
+
+def split_text_spans(
+    text: str,
+    chunk_size: int,
+    chunk_overlap: int = 0,
+    separators: list[str] | None = None,
+    measure=_char_length,
+    chars_per_unit: int = 1,
+) -> list[tuple[int, int]]:
+    """Return (start, end) spans of the chunks before overlap is applied.
+    measure(text, start, end) sizes a span (characters by default);
+    chars_per_unit converts that unit to characters for the window fallback.
+    """
+    if separators is None:
+        separators = DEFAULT_SEPARATORS
+    spans = _split_spans(text, 0, len(text), separators, chunk_size, chunk_overlap, measure, chars_per_unit)
+    # Whitespace-only pieces carry nothing worth embedding
+    return [(start, end) for start, end in spans if not text[start:end].isspace()]
+
+
+def join_spans(text: str, spans: list[tuple[int, int]], chunk_overlap: int) -> list[str]:
+    """Slice chunk strings, prefixing each with up to chunk_overlap chars of the previous span"""
+    chunks = []
+    for k, (start, end) in enumerate(spans):
+        if k == 0 or chunk_overlap <= 0:
+            chunks.append(text[start:end])
+            continue
+        prev_start, prev_end = spans[k - 1]
+        overlap_start = max(prev_start, prev_end - chunk_overlap)
+        if prev_end == start:
+            chunks.append(text[overlap_start:end])
+        else:
+            chunks.append(text[overlap_start:prev_end] + text[start:end])
+    return chunks
+
+
+def split_text(
+    text: str,
+    chunk_size: int,
+    chunk_overlap: int = 0,
+    separators: list[str] | None = None,
+) -> list[str]:
+    """Split text into chunks, each prefixed with the tail of the previous chunk"""
+    return join_spans(text, split_text_spans(text, chunk_size, chunk_overlap, separators), chunk_overlap)
@@ -0,0 +1,180 @@
+"""
+Pluggable chunking strategies, selectable per bot (Bot.chunkingStrategy).
+
+A splitter instance is created per document and fed its pages in order,
+so a strategy may carry state across pages (e.g. the current section).
+split_page() returns chunk dicts with at least "text"; any other keys
+(such as "section") are stored in the point payload.
+
+    recursive  character-budgeted recursive splitter (the original behaviour)
+    tokens     same recursion, but chunks are budgeted in embedding tokens
+    sentences  packs whole sentences up to the character budget
+    sections   detects headings and never lets a chunk span two sections
+"""
+
+import re
+from src.llm.embeddings import count_tokens
+from consumer.vector.splitter import join_spans, split_text, split_text_spans
+
+CHUNK_SIZE = 1000
+CHUNK_OVERLAP = 200
+TOKEN_CHUNK_SIZE = 256
+TOKEN_CHUNK_OVERLAP = 32
+# Rough characters per token, used to turn token budgets into character overlaps
+CHARS_PER_TOKEN = 4
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_NUMBERED_HEADING = re.compile(r"^(\d+(\.\d+)*\.?|[IVXLC]+\.|chapter\s+\d+|section\s+\d+)\s+\S", re.IGNORECASE)
+
+
+class Splitter:
+    """Base class for chunking strategies"""
+
+    name = ""
+
+    def split_page(self, doc) -> list[dict]:
+        raise NotImplementedError
+
+
+class RecursiveSplitter(Splitter):
+    name = "recursive"
+
+    def __init__(self, chunk_size: int = CHUNK_SIZE, chunk_overlap: int = CHUNK_OVERLAP):
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+
+    def split_page(self, doc) -> list[dict]:
+        return [{"text": text} for text in split_text(doc.page_content, self.chunk_size, self.chunk_overlap)]
+
+
+class TokenSplitter(Splitter):
+    """Recursive splitting with chunk sizes measured in embedding tokens"""
+
+    name = "tokens"
+
+    def __init__(self, max_tokens: int = TOKEN_CHUNK_SIZE, overlap_tokens: int = TOKEN_CHUNK_OVERLAP):
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+
+    @staticmethod
+    def _measure(text: str, start: int, end: int) -> int:
+        return count_tokens(text[start:end])
+
+    def split_page(self, doc) -> list[dict]:
+        text = doc.page_content
+        spans = split_text_spans(
+            text, self.max_tokens, self.overlap_tokens,
+            measure=self._measure, chars_per_unit=CHARS_PER_TOKEN,
+        )
+        return [{"text": chunk} for chunk in join_spans(text, spans, self.overlap_tokens * CHARS_PER_TOKEN)]
+
+
+class SentenceSplitter(Splitter):
+    """Packs whole sentences; the last sentence of a chunk starts the next one"""
+
+    name = "sentences"
+
+    def __init__(self, chunk_size: int = CHUNK_SIZE, overlap_sentences: int = 1):
+        self.chunk_size = chunk_size
+        self.overlap_sentences = overlap_sentences
+
+    @staticmethod
+    def _sentence_spans(text: str) -> list[tuple[int, int]]:
+        spans = []
+        start = 0
+        for match in _SENTENCE_END.finditer(text):
+            spans.append((start, match.start()))
+            start = match.end()
+        if start < len(text):
+            spans.append((start, len(text)))
+        return [(s, e) for s, e in spans if e > s]
+
+    def split_page(self, doc) -> list[dict]:
+        text = doc.page_content
+        chunks = []
+        current: list[tuple[int, int]] = []
+        for start, end in self._sentence_spans(text):
+            if end - start > self.chunk_size:
+                # A single over-long sentence falls back to the recursive splitter
+                if current:
+                    chunks.append(text[current[0][0]:current[-1][1]])
+                    current = []
+                chunks.extend(split_text(text[start:end], self.chunk_size, 0))
+                continue
+            if current and end - current[0][0] > self.chunk_size:
+                chunks.append(text[current[0][0]:current[-1][1]])
+                carried = current[-self.overlap_sentences:] if self.overlap_sentences else []
+                # Drop the carried sentences if they would not leave room for this one
+                current = carried if carried and end - carried[0][0] <= self.chunk_size else []
+            current.append((start, end))
+        if current:
+            chunks.append(text[current[0][0]:current[-1][1]])
+        return [{"text": chunk} for chunk in chunks if chunk.strip()]
+
+
+class SectionSplitter(Splitter):
+    """
+    Splits at detected headings and prefixes every chunk with its section
+    title. The current section carries over page breaks, so a section that
+    continues on the next page keeps its heading.
+    """
+
+    name = "sections"
+
+    def __init__(self, chunk_size: int = CHUNK_SIZE, chunk_overlap: int = CHUNK_OVERLAP):
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.section: str | None = None
+
+    @staticmethod
+    def is_heading(line: str) -> bool:
+        line = line.strip()
+        if not line or len(line) > 80 or line.endswith((".", ",", ";", ":")):
+            return False
+        if _NUMBERED_HEADING.match(line):
+            return True
+        letters = [c for c in line if c.isalpha()]
+        if len(letters) >= 3 and all(c.isupper() for c in letters):
+            return True
+        words = line.split()
+        return 1 <= len(words) <= 8 and all(w[0].isupper() or not w[0].isalpha() for w in words)
+
+    def _emit(self, body: str) -> list[dict]:
+        if not body.strip():
+            return []
+        prefix = f"{self.section}\n" if self.section else ""
+        budget = max(1, self.chunk_size - len(prefix))
+        return [
+            {"text": prefix + text, "section": self.section}
+            for text in split_text(body, budget, min(self.chunk_overlap, budget // 2))
+        ]
+
+    def split_page(self, doc) -> list[dict]:
+        chunks = []
+        body: list[str] = []
+        for line in doc.page_content.splitlines(keepends=True):
+            if self.is_heading(line):
+                chunks.extend(self._emit("".join(body)))
+                body = []
+                self.section = line.strip()
+            else:
+                body.append(line)
+        chunks.extend(self._emit("".join(body)))
+        return chunks
+
+
+SPLITTERS: dict[str, type[Splitter]] = {
+    RecursiveSplitter.name: RecursiveSplitter,
+    TokenSplitter.name: TokenSplitter,
+    SentenceSplitter.name: SentenceSplitter,
+    SectionSplitter.name: SectionSplitter,
+}
+
+
+def get_splitter(name: str | None) -> Splitter:
+    """New splitter instance for one document; unknown names fall back to recursive"""
+    splitter_cls = SPLITTERS.get(name or RecursiveSplitter.name)
+    if splitter_cls is None:
+        print(f"⚠️ Unknown chunking strategy '{name}', using '{RecursiveSplitter.name}'")
+        splitter_cls = RecursiveSplitter
+    return splitter_cls()
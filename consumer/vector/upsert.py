@@ -0,0 +1,145 @@
+"""
+Concurrent Qdrant upsert engine.
+
+Points are packed into batches capped by estimated request size, several
+batches are kept in flight at once, and failed batches (only those) are
+retried after the first pass. With UPSERT_WAIT=false batches are sent
+without waiting for indexing and a single wait=True request at the end
+acts as a consistency barrier.
+"""
+
+import asyncio
+import json
+import time
+from qdrant_client.models import PointStruct
+from consumer.vector.qdrantdb import qdrant_client
+from consumer.consumer_env import env
+from consumer.limits import upsert_slots
+
+# Rough bytes per float in a REST/JSON request body
+BYTES_PER_FLOAT = 10
+
+
+def estimate_point_bytes(point: PointStruct) -> int:
+    """Approximate the serialized size of a point"""
+    vectors = point.vector.values() if isinstance(point.vector, dict) else [point.vector]
+    floats = 0
+    for vector in vectors:
+        if isinstance(vector, list):
+            floats += len(vector)
+        else:
+            # Sparse vector: indices + values
+            floats += 2 * len(getattr(vector, "indices", []) or [])
+    payload = json.dumps(point.payload or {}, ensure_ascii=False, default=str)
+    return floats * BYTES_PER_FLOAT + len(payload.encode("utf-8"))
+
+
+class UpsertEngine:
+    """Upsert points into one collection with bounded parallelism"""
+
+    def __init__(
+        self,
+        collection_name: str,
+        max_in_flight: int = env.UPSERT_MAX_IN_FLIGHT,
+        max_batch_bytes: int = env.UPSERT_MAX_BATCH_BYTES,
+        max_batch_points: int = env.UPSERT_MAX_BATCH_POINTS,
+        wait: bool = env.UPSERT_WAIT,
+        max_retries: int = env.UPSERT_MAX_RETRIES,
+    ):
+        self.collection_name = collection_name
+        self.max_batch_bytes = max_batch_bytes
+        self.max_batch_points = max_batch_points
+        self.wait = wait
+        self.max_retries = max_retries
+        self._in_flight = asyncio.Semaphore(max(1, max_in_flight))
+        self._tasks: set[asyncio.Task] = set()
+        self._failed: list[tuple[list[PointStruct], Exception]] = []
+        self._last_batch: list[PointStruct] | None = None
+        self.batches_sent = 0
+        self.points_sent = 0
+        self.first_stored_at: float | None = None
+
+    def _make_batches(self, points: list[PointStruct]) -> list[list[PointStruct]]:
+        """Pack points into batches by estimated bytes and point count"""
+        batches = []
+        batch = []
+        batch_bytes = 0
+        for point in points:
+            size = estimate_point_bytes(point)
+            if batch and (batch_bytes + size > self.max_batch_bytes or len(batch) >= self.max_batch_points):
+                batches.append(batch)
+                batch = []
+                batch_bytes = 0
+            batch.append(point)
+            batch_bytes += size
+        if batch:
+            batches.append(batch)
+        return batches
+
+    async def _upsert(self, batch: list[PointStruct], wait: bool):
+        async with upsert_slots:
+            # Use asyncio.to_thread for synchronous Qdrant client
+            await asyncio.to_thread(
+                qdrant_client.upsert,
+                collection_name=self.collection_name,
+                points=batch,
+                wait=wait,
+            )
+
+    async def _send(self, batch: list[PointStruct]):
+        try:
+            await self._upsert(batch, self.wait)
+            self.batches_sent += 1
+            self.points_sent += len(batch)
+            self._last_batch = batch
+            if self.first_stored_at is None:
+                self.first_stored_at = time.perf_counter()
+        except Exception as e:
+            print(f"⚠️ Upsert of {len(batch)} points failed (will retry): {e}")
+            self._failed.append((batch, e))
+        finally:
+            self._in_flight.release()
+
+    async def submit(self, points: list[PointStruct]):
+        """Queue points for upsert; blocks only while max_in_flight batches are pending"""
+        for batch in self._make_batches(points):
+            await self._in_flight.acquire()
+            task = asyncio.create_task(self._send(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def close(self):
+        """Wait for all batches, retry the failed ones, then apply the consistency barrier"""
+        if self._tasks:
+            await asyncio.gather(*list(self._tasks))
+
+        for attempt in range(1, self.max_retries + 1):
+            if not self._failed:
+                break
+            failed, self._failed = self._failed, []
+            await asyncio.sleep(min(2 ** attempt, 30))
+            print(f"🔁 Retrying {len(failed)} failed upsert batches (attempt {attempt}/{self.max_retries})")
+            for batch, _ in failed:
+                await self._in_flight.acquire()
+                task = asyncio.create_task(self._send(batch))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            await asyncio.gather(*list(self._tasks))
+
+        if self._failed:
+            _, error = self._failed[0]
+            lost = sum(len(batch) for batch, _ in self._failed)
+            raise Exception(f"Failed to upsert {lost} points to '{self.collection_name}': {error}") from error
+
+        if not self.wait and self._last_batch is not None:
+            # Updates are applied in order, so waiting on one final
+            # (idempotent) re-upsert waits for everything sent before it
+            await self._upsert(self._last_batch, wait=True)
+
+        print(f"   💾 Upserted {self.points_sent} points in {self.batches_sent} batches to '{self.collection_name}'")
+
+    async def abort(self):
+        """Cancel every pending batch"""
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*list(self._tasks), return_exceptions=True)
@@ -1,26 +1,221 @@
 import asyncio
-from qdrant_client.models import Distance, VectorParams
-from consumer.vector.qdrantdb import qdrant_client, collection_exists
+import threading
+from dataclasses import dataclass
+from qdrant_client.models import (
+    FieldCondition,
+    Filter,
+    KeywordIndexParams,
+    KeywordIndexType,
+    MatchValue,
+    Modifier,
+    PointIdsList,
+    SparseVectorParams,
+)
+from consumer.consumer_env import env
+from consumer.vector.qdrantdb import qdrant_client
+from src.llm.sparse import SPARSE_VECTOR_NAME
+from src.vector.profiles import CollectionProfile, get_profile
+from src.vector.tenancy import (
+    SHARED_HNSW_CONFIG,
+    TENANT_INDEX_SCHEMA,
+    TENANT_KEY,
+    locate_bot,
+    tenant_filter,
+)
 
-VECTOR_SIZE = 1536  # example: OpenAI text-embedding-3-small
+VECTOR_SIZE = 1536  # text-embedding-3-small; profiles may reduce it
+SCROLL_PAGE_SIZE = 1000
 
-def _ensure_collection_sync(bot_id: str):
+# Payload keys that ingestion diffs and deletes filter on. Filter-only
+# indexes: no extra HNSW links are built for their values.
+PAYLOAD_INDEXES = {
+    "doc_id": KeywordIndexParams(type=KeywordIndexType.KEYWORD, enable_hnsw=False),
+    "user_id": KeywordIndexParams(type=KeywordIndexType.KEYWORD, enable_hnsw=False),
+}
+
+
+@dataclass
+class VectorTarget:
+    """Where a bot's chunks are stored and which vectors the collection has"""
+    collection_name: str
+    sparse: bool = False
+    tenant: str | None = None  # bot_id payload value in shared collections
+    vector_size: int = VECTOR_SIZE  # embeddings are requested at this size
+
+
+# Shared collection -> its target; probed/created once per process
+_shared_collections: dict[str, VectorTarget] = {}
+# Serialises probe-and-create per collection between concurrently processed documents
+_collection_locks: dict[str, threading.Lock] = {}
+
+
+def _collection_lock(collection_name: str) -> threading.Lock:
+    return _collection_locks.setdefault(collection_name, threading.Lock())
+
+
+def _collection_info(collection_name: str):
+    """Collection info, or None if it does not exist"""
+    try:
+        return qdrant_client.get_collection(collection_name)
+    except Exception:
+        return None
+
+
+def _sparse_vectors_config():
+    # BM25 term weights; Qdrant applies IDF from its own document counts
+    if not env.HYBRID_SPARSE_ENABLED:
+        return None
+    return {SPARSE_VECTOR_NAME: SparseVectorParams(modifier=Modifier.IDF)}
+
+
+def target_from_info(collection_name: str, info, tenant: str | None = None) -> VectorTarget:
+    # Collections created before hybrid search have no sparse vector;
+    # they keep working dense-only until rebuilt
+    sparse = SPARSE_VECTOR_NAME in (info.config.params.sparse_vectors or {})
+    vectors = info.config.params.vectors
+    size = vectors.size if hasattr(vectors, "size") else vectors[""].size
+    return VectorTarget(collection_name, sparse=sparse, tenant=tenant, vector_size=size)
+
+
+def _ensure_payload_indexes(collection_name: str, payload_schema: dict | None, tenant: bool = False):
+    """Create the payload indexes a collection is missing (older collections have none)"""
+    indexes = dict(PAYLOAD_INDEXES)
+    if tenant:
+        indexes[TENANT_KEY] = TENANT_INDEX_SCHEMA
+    for field_name, field_schema in indexes.items():
+        if field_name not in (payload_schema or {}):
+            qdrant_client.create_payload_index(
+                collection_name=collection_name,
+                field_name=field_name,
+                field_schema=field_schema,
+                wait=True,
+            )
+
+
+def _create_collection(collection_name: str, profile: CollectionProfile, hnsw_config=None, tenant: bool = False) -> bool:
+    """Create a collection; False if another consumer created it first"""
+    try:
+        qdrant_client.create_collection(
+            collection_name=collection_name,
+            vectors_config=profile.vectors_config(),
+            sparse_vectors_config=_sparse_vectors_config(),
+            quantization_config=profile.quantization_config(),
+            hnsw_config=hnsw_config or profile.hnsw_config(),
+        )
+    except Exception:
+        # "Already exists" is success; the caller reads the winner's config
+        if not qdrant_client.collection_exists(collection_name):
+            raise
+        return False
+    # Indexed before the first point arrives, so nothing has to be re-indexed
+    _ensure_payload_indexes(collection_name, None, tenant=tenant)
+    return True
+
+
+def ensure_shared_collection_sync(collection_name: str) -> VectorTarget:
+    """Create a shared multi-tenant collection (global VECTOR_PROFILE) if needed"""
+    if collection_name in _shared_collections:
+        return _shared_collections[collection_name]
+    with _collection_lock(collection_name):
+        if collection_name in _shared_collections:
+            return _shared_collections[collection_name]
+        info = _collection_info(collection_name)
+        if info is None:
+            profile = get_profile(env.VECTOR_PROFILE)
+            print(f"📦 Creating shared collection '{collection_name}' (profile: {profile.name})...")
+            # Per-tenant graphs, built with the profile's ef_construct
+            if _create_collection(
+                collection_name,
+                profile,
+                SHARED_HNSW_CONFIG.model_copy(update={"ef_construct": profile.hnsw_ef_construct}),
+                tenant=True,
+            ):
+                target = VectorTarget(collection_name, sparse=env.HYBRID_SPARSE_ENABLED, vector_size=profile.dimensions)
+            else:
+                info = qdrant_client.get_collection(collection_name)
+        if info is not None:
+            target = target_from_info(collection_name, info)
+            # Repairs a collection created without the tenant or filter indexes
+            _ensure_payload_indexes(collection_name, info.payload_schema, tenant=True)
+        _shared_collections[collection_name] = target
+        return target
+
+
+def _ensure_collection_sync(bot_id: str, profile_name: str | None = None) -> VectorTarget:
     """Synchronous helper for ensuring collection exists based on bot_id"""
-    # Use bot_id directly as collection name (UUID)
-    if collection_exists(bot_id):
-        print(f"✅ Collection '{bot_id}' already exists")
-        return
-    
-    print(f"📦 Creating new collection '{bot_id}'...")
-    qdrant_client.create_collection(
-        collection_name=bot_id,
-        vectors_config=VectorParams(
-            size=VECTOR_SIZE,
-            distance=Distance.COSINE,
-        ),
+    location = locate_bot(
+        bot_id,
+        env.QDRANT_TENANCY,
+        env.QDRANT_SHARED_COLLECTION_PREFIX,
+        env.QDRANT_SHARED_COLLECTIONS,
     )
-    print(f"✅ Collection '{bot_id}' created successfully")
+    if location.tenant is not None:
+        shared = ensure_shared_collection_sync(location.collection_name)
+        return VectorTarget(
+            shared.collection_name,
+            sparse=shared.sparse,
+            tenant=location.tenant,
+            vector_size=shared.vector_size,
+        )
+
+    # Use bot_id directly as collection name (UUID)
+    with _collection_lock(bot_id):
+        info = _collection_info(bot_id)
+        if info is None:
+            profile = get_profile(profile_name or env.VECTOR_PROFILE)
+            print(f"📦 Creating new collection '{bot_id}' (profile: {profile.name})...")
+            if _create_collection(bot_id, profile):
+                print(f"✅ Collection '{bot_id}' created successfully")
+                return VectorTarget(bot_id, sparse=env.HYBRID_SPARSE_ENABLED, vector_size=profile.dimensions)
+            info = qdrant_client.get_collection(bot_id)
+
+        # The collection keeps the profile it was created with
+        target = target_from_info(bot_id, info)
+        _ensure_payload_indexes(bot_id, info.payload_schema)
+        print(f"✅ Collection '{bot_id}' already exists (sparse: {target.sparse}, {target.vector_size} dims)")
+        return target
 
-async def ensure_collection(bot_id: str):
+async def ensure_collection(bot_id: str, profile_name: str | None = None) -> VectorTarget:
     """Async wrapper for ensuring collection exists based on bot_id"""
-    await asyncio.to_thread(_ensure_collection_sync, bot_id)
+    return await asyncio.to_thread(_ensure_collection_sync, bot_id, profile_name)
+
+
+def _fetch_doc_point_ids_sync(collection_name: str, doc_id: str, tenant: str | None = None) -> set[str]:
+    """Synchronous helper for listing the point IDs stored for a document"""
+    doc_condition = FieldCondition(key="doc_id", match=MatchValue(value=doc_id))
+    # In a shared collection the tenant condition narrows the scan to one bot
+    scroll_filter = tenant_filter(tenant, doc_condition) if tenant is not None else Filter(must=[doc_condition])
+    ids = set()
+    offset = None
+    while True:
+        points, offset = qdrant_client.scroll(
+            collection_name=collection_name,
+            scroll_filter=scroll_filter,
+            limit=SCROLL_PAGE_SIZE,
+            offset=offset,
+            with_payload=False,
+            with_vectors=False,
+        )
+        ids.update(str(point.id) for point in points)
+        if offset is None:
+            return ids
+
+
+async def fetch_doc_point_ids(collection_name: str, doc_id: str, tenant: str | None = None) -> set[str]:
+    """Async wrapper for listing the point IDs stored for a document"""
+    return await asyncio.to_thread(_fetch_doc_point_ids_sync, collection_name, doc_id, tenant)
+
+
+def _delete_points_sync(collection_name: str, point_ids: list[str]):
+    """Synchronous helper for deleting points by ID in batches"""
+    for i in range(0, len(point_ids), SCROLL_PAGE_SIZE):
+        qdrant_client.delete(
+            collection_name=collection_name,
+            points_selector=PointIdsList(points=point_ids[i:i + SCROLL_PAGE_SIZE]),
+        )
+
+
+async def delete_points(collection_name: str, point_ids: list[str]):
+    """Async wrapper for deleting points by ID"""
+    if point_ids:
+        await asyncio.to_thread(_delete_points_sync, collection_name, point_ids)
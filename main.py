@@ -11,6 +11,13 @@ from src.sockets.ws_chats import socket_app
 from src.routes.documenation import router as documentation_router
 from src.routes.testing import router as testing_router
 from src.routes.chats import router as chats_router
+from src.routes.metrics import router as metrics_router
+from src.llm.llm import openai_client
+from src.vector.client import close_async_qdrant_client
+from src.vector.retrieve import query_cache
+from src.services.config_cache import start_invalidation_listener, stop_invalidation_listener
+from src.services.message_journal import message_journal
+from src.producer.rabbit_mq import publisher
 app = FastAPI()
 
 app.add_middleware(
@@ -24,9 +31,19 @@ app.add_middleware(
 @app.on_event("startup")
 async def startup():
     await prisma.connect()
+    await start_invalidation_listener()
+    message_journal.start()
 
 @app.on_event("shutdown")
 async def shutdown():
+    # Drain queued chat messages while the DB connection is still up
+    await message_journal.stop()
+    await stop_invalidation_listener()
+    await publisher.close()
+    await close_async_qdrant_client()
+    await openai_client.close()
+    if query_cache is not None:
+        await query_cache.close()
     await prisma.disconnect()
     
 #sockets
@@ -38,4 +55,5 @@ app.include_router(api_key_router)
 app.include_router(documentation_router)
 app.include_router(testing_router)
 app.include_router(chats_router)
+app.include_router(metrics_router)
 app.mount("/", socket_app)
\ No newline at end of file
@@ -0,0 +1,4 @@
+-- AlterTable
+ALTER TABLE "Bot" ADD COLUMN     "answerCacheEnabled" BOOLEAN NOT NULL DEFAULT false,
+ADD COLUMN     "answerCacheThreshold" DOUBLE PRECISION,
+ADD COLUMN     "knowledgeVersion" INTEGER NOT NULL DEFAULT 0;
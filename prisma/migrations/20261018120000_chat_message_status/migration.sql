@@ -0,0 +1,5 @@
+-- CreateEnum
+CREATE TYPE "ChatMessageStatus" AS ENUM ('complete', 'failed');
+
+-- AlterTable
+ALTER TABLE "ChatMessage" ADD COLUMN     "status" "ChatMessageStatus" NOT NULL DEFAULT 'complete';
@@ -0,0 +1,2 @@
+-- AlterEnum
+ALTER TYPE "ChatMessageStatus" ADD VALUE 'truncated';
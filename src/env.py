@@ -12,9 +12,89 @@ class Env(BaseSettings):
     AWS_SECRET_ACCESS_KEY: str
     RABBIT_MQ_URL: str
     RABBIT_MQ_API_KEY: str
+    RABBIT_MQ_CHANNEL_POOL_SIZE: int = 4
     OPENAI_API_KEY:str
     QDRANT_DB_CLUSTER_URL:str
     QDRANT_DB_API_KEY:str
+
+    # Embeddings (OPENAI_BASE_URL points at a proxy or a local fake server)
+    OPENAI_BASE_URL: str | None = None
+    EMBEDDING_MODEL: str = "text-embedding-3-small"
+    EMBEDDING_RPM: int = 0  # 0 = unlimited
+    EMBEDDING_TPM: int = 0  # 0 = unlimited
+    EMBEDDING_MAX_IN_FLIGHT: int = 8
+    EMBEDDING_MAX_RETRIES: int = 3
+
+    # Shared OpenAI HTTP client (pooled keep-alive connections, HTTP/2 when h2 is installed)
+    OPENAI_HTTP2: bool = True
+    OPENAI_MAX_CONNECTIONS: int = 100
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    OPENAI_KEEPALIVE_EXPIRY: float = 60.0
+    OPENAI_TIMEOUT: float = 60.0
+    OPENAI_CONNECT_TIMEOUT: float = 5.0
+    OPENAI_MAX_RETRIES: int = 2  # chat completions; embeddings retry in the scheduler
+
+    # Retrieval
+    QDRANT_PREFER_GRPC: bool = True
+    QDRANT_SEARCH_TIMEOUT: int = 10
+    RETRIEVAL_TOP_K: int = 5
+    RETRIEVAL_SCORE_THRESHOLD: float | None = None
+    # Dense + BM25 prefetch fused with RRF (collections with a sparse vector only)
+    RETRIEVAL_HYBRID: bool = True
+    RETRIEVAL_PREFETCH_LIMIT: int = 20
+    # Post-retrieval: over-fetch, dedupe, rerank (none | mmr | cross-encoder), pack
+    RETRIEVAL_CANDIDATES: int = 20
+    RERANK_MODE: str = "mmr"
+    RERANK_MODEL: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    MMR_LAMBDA: float = 0.7
+    CONTEXT_TOKEN_BUDGET: int = 1500
+    # Quantized collections: candidates rescored per result (None = per-kind default)
+    RETRIEVAL_QUANTIZATION_OVERSAMPLING: float | None = None
+    RETRIEVAL_HNSW_EF: int | None = None
+    # Texts of points stored without a "text" payload (consumer CHUNK_TEXT_IN_QDRANT=false)
+    CHUNK_STORE_PATH: str = ".cache/chunks.sqlite3"
+
+    # Qdrant tenancy: "collection" (one per bot) or "shared" (bots partitioned
+    # by an is_tenant payload index across QDRANT_SHARED_COLLECTIONS collections)
+    QDRANT_TENANCY: str = "collection"
+    QDRANT_SHARED_COLLECTION_PREFIX: str = "filemind_shared"
+    QDRANT_SHARED_COLLECTIONS: int = 1
+
+    # Query-embedding cache (Redis URL shares hits across API workers)
+    QUERY_CACHE_ENABLED: bool = True
+    QUERY_CACHE_MAX_ITEMS: int = 10_000
+    QUERY_CACHE_TTL_SECONDS: int = 3600
+    QUERY_CACHE_REDIS_URL: str | None = None
+
+    # Semantic answer cache (opt-in per bot via Bot.answerCacheEnabled)
+    ANSWER_CACHE_ENABLED: bool = True
+    ANSWER_CACHE_THRESHOLD: float = 0.95
+    ANSWER_CACHE_MAX_ENTRIES_PER_BOT: int = 500
+    ANSWER_CACHE_MAX_BOTS: int = 1000
+    ANSWER_CACHE_TTL_SECONDS: int = 86400
+
+    # Stream replies as assistant_delta events (clients can override per message)
+    CHAT_STREAMING: bool = True
+
+    # Conversation memory: recent turns within a token budget + rolling summary
+    CHAT_HISTORY_TOKEN_BUDGET: int = 2000
+    CHAT_HISTORY_MAX_SESSIONS: int = 5000
+    CHAT_HISTORY_IDLE_TTL_SECONDS: int = 3600
+    CHAT_HISTORY_LOAD_LIMIT: int = 200
+    CHAT_HISTORY_SUMMARY_ENABLED: bool = True
+    CHAT_HISTORY_SUMMARY_TRIGGER_TOKENS: int = 1500
+
+    # Bot / API-key read-through cache; Redis pub/sub spreads invalidations
+    CONFIG_CACHE_TTL_SECONDS: int = 60
+    CONFIG_CACHE_MAX_ITEMS: int = 10_000
+    CACHE_INVALIDATION_REDIS_URL: str | None = None
+
+    # Write-behind chat message journal (flushes on size or time)
+    MESSAGE_JOURNAL_MAX_ROWS: int = 200
+    MESSAGE_JOURNAL_FLUSH_SECONDS: float = 0.5
+    # Flushes a failing row is retried in before it is dropped
+    MESSAGE_JOURNAL_MAX_ATTEMPTS: int = 5
+
     class Config:
         env_file = "../.env"
         case_sensitive = True
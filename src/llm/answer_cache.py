@@ -0,0 +1,116 @@
+"""
+Per-bot semantic answer cache.
+
+Answers are stored with the embedding of the question that produced them.
+A new question whose embedding has cosine similarity >= threshold with a
+stored one gets the stored answer without retrieval or an LLM call.
+
+Every entry set is tied to a bot fingerprint (bot.updatedAt plus its
+knowledgeVersion, which the consumer bumps after ingesting a document).
+When the fingerprint changes - new documents, a new system prompt - the
+bot's entries are dropped, on every worker, at the next lookup.
+"""
+
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+class _BotAnswers:
+    def __init__(self, fingerprint: str):
+        self.fingerprint = fingerprint
+        self.questions: list[str] = []
+        self.answers: list[str] = []
+        self.expires_at: list[float] = []
+        self.vectors: list[np.ndarray] = []
+        self._matrix: np.ndarray | None = None
+
+    def matrix(self) -> np.ndarray:
+        if self._matrix is None or len(self._matrix) != len(self.vectors):
+            self._matrix = np.vstack(self.vectors)
+        return self._matrix
+
+    def drop_oldest(self, count: int):
+        del self.questions[:count], self.answers[:count], self.expires_at[:count], self.vectors[:count]
+        self._matrix = None
+
+
+def _unit(vector: list[float]) -> np.ndarray:
+    array = np.asarray(vector, dtype=np.float32)
+    norm = np.linalg.norm(array)
+    return array / norm if norm else array
+
+
+class SemanticAnswerCache:
+    """In-memory nearest-question cache of LLM answers, bounded per bot"""
+
+    def __init__(self, max_entries_per_bot: int = 500, max_bots: int = 1000, ttl_seconds: float = 86400):
+        self.max_entries_per_bot = max_entries_per_bot
+        self.max_bots = max_bots
+        self.ttl_seconds = ttl_seconds
+        self._bots: OrderedDict[str, _BotAnswers] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def _entries(self, bot_id: str, fingerprint: str) -> _BotAnswers | None:
+        entries = self._bots.get(bot_id)
+        if entries is None:
+            return None
+        if entries.fingerprint != fingerprint:
+            # Documents or prompt changed since these answers were produced
+            del self._bots[bot_id]
+            self.invalidations += 1
+            return None
+        self._bots.move_to_end(bot_id)
+        return entries
+
+    def lookup(self, bot_id: str, fingerprint: str, vector: list[float], threshold: float) -> tuple[str, float] | None:
+        """(answer, similarity) of the closest fresh question above threshold"""
+        entries = self._entries(bot_id, fingerprint)
+        if entries is None or not entries.vectors:
+            self.misses += 1
+            return None
+
+        scores = entries.matrix() @ _unit(vector)
+        now = time.monotonic()
+        for index in np.argsort(scores)[::-1]:
+            score = float(scores[index])
+            if score < threshold:
+                break
+            if entries.expires_at[index] >= now:
+                self.hits += 1
+                return entries.answers[index], score
+        self.misses += 1
+        return None
+
+    def store(self, bot_id: str, fingerprint: str, question: str, vector: list[float], answer: str):
+        entries = self._entries(bot_id, fingerprint)
+        if entries is None:
+            entries = self._bots[bot_id] = _BotAnswers(fingerprint)
+            while len(self._bots) > self.max_bots:
+                self._bots.popitem(last=False)
+
+        entries.questions.append(question)
+        entries.answers.append(answer)
+        entries.expires_at.append(time.monotonic() + self.ttl_seconds)
+        entries.vectors.append(_unit(vector))
+        overflow = len(entries.vectors) - self.max_entries_per_bot
+        if overflow > 0:
+            entries.drop_oldest(overflow)
+
+    def invalidate(self, bot_id: str):
+        if self._bots.pop(bot_id, None) is not None:
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "invalidations": self.invalidations,
+            "bots": len(self._bots),
+            "entries": sum(len(entries.vectors) for entries in self._bots.values()),
+        }
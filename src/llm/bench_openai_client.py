@@ -0,0 +1,93 @@
+"""
+Per-request overhead of a fresh AsyncOpenAI client vs the shared pooled one.
+
+Starts the fake OpenAI server in-process and sends the same embedding
+request through both, sequentially and with some concurrency:
+
+    fresh   AsyncOpenAI(...) built (and closed) for every request - the old llm_api_call
+    shared  one create_openai_client(...) client reused for every request
+
+The fake server speaks plain HTTP/1.1, so this isolates client construction
+and connection setup; against api.openai.com the fresh client also pays a
+TLS handshake per request, which this local number does not include.
+
+Usage:
+    python -m src.llm.bench_openai_client --requests 500 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from openai import AsyncOpenAI
+
+from src.llm.fake_openai import FakeOpenAIServer
+from src.llm.openai_client import create_openai_client
+
+
+async def _fresh_request(base_url: str, _client):
+    client = AsyncOpenAI(api_key="bench", base_url=base_url, max_retries=0)
+    try:
+        await client.embeddings.create(model="text-embedding-3-small", input=["hello world"])
+    finally:
+        await client.close()
+
+
+async def _shared_request(base_url: str, client):
+    await client.embeddings.create(model="text-embedding-3-small", input=["hello world"])
+
+
+async def _run(request, base_url: str, client, total: int, concurrency: int) -> list[float]:
+    latencies: list[float] = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            start = time.perf_counter()
+            await request(base_url, client)
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one() for _ in range(total)))
+    return latencies
+
+
+async def main(args):
+    server = FakeOpenAIServer(dimensions=args.dimensions)
+    srv = await server.start("127.0.0.1", args.port)
+    base_url = f"http://127.0.0.1:{args.port}/v1"
+    shared = create_openai_client(api_key="bench", base_url=base_url, max_retries=0)
+
+    try:
+        results = {}
+        for name, request in (("fresh", _fresh_request), ("shared", _shared_request)):
+            for concurrency in (1, args.concurrency):
+                await _run(request, base_url, shared, 5, 1)  # warm up
+                connections_before = server.connections
+                start = time.perf_counter()
+                latencies = await _run(request, base_url, shared, args.requests, concurrency)
+                elapsed = time.perf_counter() - start
+                ordered = sorted(latencies)
+                results[(name, concurrency)] = statistics.mean(latencies)
+                print(
+                    f"⏱️ {name:>6} x{concurrency:<3}: mean {statistics.mean(latencies) * 1000:.2f} ms | "
+                    f"p99 {ordered[int(0.99 * (len(ordered) - 1))] * 1000:.2f} ms | "
+                    f"{len(latencies) / elapsed:.0f} req/s | "
+                    f"{server.connections - connections_before} new connections"
+                )
+        for concurrency in (1, args.concurrency):
+            saved = results[("fresh", concurrency)] - results[("shared", concurrency)]
+            print(f"📉 x{concurrency}: shared client saves {saved * 1000:.2f} ms per request")
+    finally:
+        await shared.close()
+        srv.close()
+        await srv.wait_closed()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--port", type=int, default=8098)
+    parser.add_argument("--dimensions", type=int, default=1536)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,177 @@
+"""
+Content-addressed embedding cache.
+
+Vectors are keyed by sha256(model, normalized text) and kept in two tiers:
+an in-memory LRU and a local SQLite file (float32 blobs). The same chunk
+uploaded to many bots, or re-uploaded, is embedded only once.
+"""
+
+import asyncio
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+
+_WHITESPACE = re.compile(r"\s+")
+
+# SQLite's default limit on host parameters is 999
+_SQL_BATCH = 500
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace so trivially reformatted chunks share a key"""
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def model_key(model: str, dimensions: int | None = None) -> str:
+    """Cache namespace for a model at a given output size"""
+    return model if dimensions is None else f"{model}@{dimensions}"
+
+
+def cache_key(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\0{normalize_text(text)}".encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Two-tier (LRU memory + SQLite) cache of embedding vectors"""
+
+    def __init__(self, path: str | None = None, memory_items: int = 20_000):
+        self.path = path
+        self.memory_items = memory_items
+        self._memory: OrderedDict[str, list[float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            # WAL lets several consumer processes on one host share the file
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+            self._db.commit()
+
+    # --- memory tier -------------------------------------------------------
+
+    def _remember(self, key: str, vector: list[float]):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last=False)
+
+    # --- disk tier ---------------------------------------------------------
+
+    def _read_disk(self, keys: list[str]) -> dict[str, list[float]]:
+        found = {}
+        if self._db is None or not keys:
+            return found
+        with self._lock:
+            for i in range(0, len(keys), _SQL_BATCH):
+                batch = keys[i:i + _SQL_BATCH]
+                rows = self._db.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({','.join('?' * len(batch))})",
+                    batch,
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = array("f", blob).tolist()
+        return found
+
+    def _write_disk(self, items: list[tuple[str, list[float]]]):
+        if self._db is None or not items:
+            return
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, array("f", vector).tobytes()) for key, vector in items],
+            )
+            self._db.commit()
+
+    # --- public API --------------------------------------------------------
+
+    async def get_many(self, model: str, texts: list[str]) -> list[list[float] | None]:
+        """Cached vector per text, or None on a miss"""
+        keys = [cache_key(model, text) for text in texts]
+        results: list[list[float] | None] = [None] * len(texts)
+        disk_lookup = []
+        for i, key in enumerate(keys):
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                results[i] = vector
+                self.memory_hits += 1
+            else:
+                disk_lookup.append(i)
+
+        if disk_lookup:
+            found = await asyncio.to_thread(self._read_disk, list({keys[i] for i in disk_lookup}))
+            for i in disk_lookup:
+                vector = found.get(keys[i])
+                if vector is not None:
+                    self._remember(keys[i], vector)
+                    results[i] = vector
+                    self.disk_hits += 1
+                else:
+                    self.misses += 1
+        return results
+
+    async def put_many(self, model: str, texts: list[str], vectors: list[list[float]]):
+        items = [(cache_key(model, text), vector) for text, vector in zip(texts, vectors)]
+        for key, vector in items:
+            self._remember(key, vector)
+        await asyncio.to_thread(self._write_disk, items)
+
+    def stats(self) -> dict:
+        hits = self.memory_hits + self.disk_hits
+        total = hits + self.misses
+        return {
+            "hits": hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / total, 4) if total else 0.0,
+            "memory_items": len(self._memory),
+        }
+
+    def close(self):
+        if self._db is not None:
+            with self._lock:
+                self._db.close()
+            self._db = None
+
+
+async def embed_with_cache(
+    cache: EmbeddingCache | None,
+    scheduler,
+    texts: list[str],
+    dimensions: int | None = None,
+) -> list[list[float]]:
+    """
+    Embed texts through scheduler, serving what we can from cache and
+    embedding each distinct missing text only once.
+    """
+    if cache is None:
+        return await scheduler.embed(texts, dimensions)
+
+    model = model_key(scheduler.model, dimensions)
+    vectors = await cache.get_many(model, texts)
+    missing: dict[str, list[int]] = {}
+    for i, vector in enumerate(vectors):
+        if vector is None:
+            missing.setdefault(normalize_text(texts[i]), []).append(i)
+
+    if missing:
+        to_embed = [texts[indices[0]] for indices in missing.values()]
+        embedded = await scheduler.embed(to_embed, dimensions)
+        for indices, vector in zip(missing.values(), embedded):
+            for i in indices:
+                vectors[i] = vector
+        await cache.put_many(model, to_embed, embedded)
+    return vectors
@@ -0,0 +1,164 @@
+"""
+Token-aware embedding scheduler shared by ingestion and query paths.
+
+Inputs are packed into requests by real token count (tiktoken when it is
+installed, a chars/4 estimate otherwise), several requests run at once,
+RPM/TPM budgets are respected with a sliding one-minute window, and a
+request that fails with 429/5xx is retried on its own with backoff.
+
+This module does not read env: callers pass the client and limits, so the
+consumer (consumer_env) and the API (src.env) can both use it.
+"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from openai import (
+    AsyncOpenAI,
+    APIConnectionError,
+    APIStatusError,
+    APITimeoutError,
+    RateLimitError,
+)
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:  # tiktoken not installed or encoding unavailable
+    _encoding = None
+
+# OpenAI's per-request limits for the embeddings endpoint
+MAX_INPUTS_PER_REQUEST = 2048
+MAX_TOKENS_PER_REQUEST = 300_000
+
+
+def count_tokens(text: str) -> int:
+    """Number of tokens in text for the text-embedding-3 models"""
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
+class RateBudget:
+    """Sliding one-minute window over requests and tokens (0 = unlimited)"""
+
+    def __init__(self, rpm: int = 0, tpm: int = 0):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._events: deque[tuple[float, int]] = deque()
+        self._tokens = 0
+        self._lock = asyncio.Lock()
+
+    def _expire(self, now: float):
+        while self._events and now - self._events[0][0] >= 60:
+            _, tokens = self._events.popleft()
+            self._tokens -= tokens
+
+    async def acquire(self, tokens: int):
+        if not self.rpm and not self.tpm:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._expire(now)
+                rpm_ok = not self.rpm or len(self._events) < self.rpm
+                # A single request larger than the TPM budget is let through on an empty window
+                tpm_ok = not self.tpm or self._tokens + tokens <= self.tpm or not self._events
+                if rpm_ok and tpm_ok:
+                    self._events.append((now, tokens))
+                    self._tokens += tokens
+                    return
+                await asyncio.sleep(max(0.05, 60 - (now - self._events[0][0])))
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, (RateLimitError, APIConnectionError, APITimeoutError)):
+        return True
+    return isinstance(error, APIStatusError) and error.status_code >= 500
+
+
+def _retry_after(error: Exception) -> float | None:
+    response = getattr(error, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+class EmbeddingScheduler:
+    """Embed many texts with token-packed, concurrent, rate-limited requests"""
+
+    def __init__(
+        self,
+        client: AsyncOpenAI,
+        model: str = "text-embedding-3-small",
+        max_tokens_per_request: int = MAX_TOKENS_PER_REQUEST,
+        max_inputs_per_request: int = MAX_INPUTS_PER_REQUEST,
+        max_in_flight: int = 4,
+        rpm: int = 0,
+        tpm: int = 0,
+        max_retries: int = 5,
+    ):
+        self.client = client
+        self.model = model
+        self.max_tokens_per_request = max_tokens_per_request
+        self.max_inputs_per_request = min(max_inputs_per_request, MAX_INPUTS_PER_REQUEST)
+        self.max_retries = max_retries
+        self.budget = RateBudget(rpm, tpm)
+        self._in_flight = asyncio.Semaphore(max(1, max_in_flight))
+
+    def pack(self, texts: list[str]) -> list[tuple[list[int], int]]:
+        """Group text indices into requests under the token/input ceilings
+        Returns: [(indices, token_count), ...]
+        """
+        batches = []
+        indices = []
+        tokens = 0
+        for i, text in enumerate(texts):
+            n = count_tokens(text)
+            if indices and (tokens + n > self.max_tokens_per_request or len(indices) >= self.max_inputs_per_request):
+                batches.append((indices, tokens))
+                indices = []
+                tokens = 0
+            indices.append(i)
+            tokens += n
+        if indices:
+            batches.append((indices, tokens))
+        return batches
+
+    async def _request(self, inputs: list[str], tokens: int, dimensions: int | None = None) -> list[list[float]]:
+        # Reduced-size text-embedding-3 vectors (None = the model's native size)
+        extra = {"dimensions": dimensions} if dimensions is not None else {}
+        attempt = 0
+        while True:
+            await self.budget.acquire(tokens)
+            try:
+                async with self._in_flight:
+                    response = await self.client.embeddings.create(model=self.model, input=inputs, **extra)
+                return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+            except Exception as e:
+                attempt += 1
+                if not _is_retryable(e) or attempt > self.max_retries:
+                    raise
+                delay = _retry_after(e) or min(2 ** attempt, 30) * (0.5 + random.random())
+                print(f"⚠️ Embedding request ({len(inputs)} inputs) failed, retry {attempt}/{self.max_retries} in {delay:.1f}s: {e}")
+                await asyncio.sleep(delay)
+
+    async def embed(self, texts: list[str], dimensions: int | None = None) -> list[list[float]]:
+        """Return one vector per text, in input order"""
+        if not texts:
+            return []
+        batches = self.pack(texts)
+        if len(batches) > 1:
+            print(f"      Embedding {len(texts)} texts in {len(batches)} requests...")
+        results = await asyncio.gather(*(
+            self._request([texts[i] for i in indices], tokens, dimensions)
+            for indices, tokens in batches
+        ))
+        vectors: list[list[float]] = [None] * len(texts)
+        for (indices, _), batch_vectors in zip(batches, results):
+            for i, vector in zip(indices, batch_vectors):
+                vectors[i] = vector
+        return vectors
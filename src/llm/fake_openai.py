@@ -0,0 +1,122 @@
+"""
+Local fake of the OpenAI embeddings endpoint for load and retry testing.
+
+Vectors are deterministic per input text. A fraction of requests can be
+failed with 429 or 500 to exercise retry paths.
+
+Usage:
+    python -m src.llm.fake_openai --port 8099 --fail-rate 0.1 --latency-ms 50
+
+then point the app at it with OPENAI_BASE_URL=http://127.0.0.1:8099/v1
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import json
+import random
+import struct
+
+
+def fake_embedding(text: str, dimensions: int) -> list[float]:
+    """Deterministic unit vector for text"""
+    rng = random.Random(hashlib.sha256(text.encode("utf-8")).digest())
+    vector = [rng.uniform(-1, 1) for _ in range(dimensions)]
+    norm = sum(v * v for v in vector) ** 0.5 or 1.0
+    return [v / norm for v in vector]
+
+
+class FakeOpenAIServer:
+    """Minimal HTTP/1.1 keep-alive server speaking the embeddings API"""
+
+    def __init__(self, fail_rate: float = 0.0, latency_ms: int = 0, dimensions: int = 1536):
+        self.fail_rate = fail_rate
+        self.latency_ms = latency_ms
+        self.dimensions = dimensions
+        self.requests = 0
+        self.failures = 0
+        self.connections = 0
+
+    def _embeddings(self, body: dict) -> dict:
+        inputs = body.get("input", [])
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        dimensions = body.get("dimensions") or self.dimensions
+        data = []
+        for i, text in enumerate(inputs):
+            vector = fake_embedding(str(text), dimensions)
+            if body.get("encoding_format") == "base64":
+                vector = base64.b64encode(struct.pack(f"<{len(vector)}f", *vector)).decode()
+            data.append({"object": "embedding", "index": i, "embedding": vector})
+        tokens = sum(len(str(text)) // 4 + 1 for text in inputs)
+        return {
+            "object": "list",
+            "data": data,
+            "model": body.get("model", "text-embedding-3-small"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    def route(self, method: str, path: str, body: dict) -> tuple[int, dict, dict]:
+        """Return (status, headers, json body) for one request"""
+        self.requests += 1
+        if self.fail_rate and random.random() < self.fail_rate:
+            self.failures += 1
+            status = random.choice([429, 500])
+            error = {"error": {"message": "injected failure", "type": "fake", "code": str(status)}}
+            return status, {"retry-after": "0.1"}, error
+        if method == "POST" and path.endswith("/embeddings"):
+            return 200, {}, self._embeddings(body)
+        return 404, {}, {"error": {"message": f"no route for {method} {path}", "type": "fake"}}
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.connections += 1
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, path, _ = request_line.decode().split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, value = line.decode().split(":", 1)
+                    headers[name.strip().lower()] = value.strip()
+                raw = await reader.readexactly(int(headers.get("content-length", 0)))
+                body = json.loads(raw) if raw else {}
+
+                if self.latency_ms:
+                    await asyncio.sleep(self.latency_ms / 1000)
+                status, extra_headers, payload = self.route(method, path, body)
+                data = json.dumps(payload).encode()
+                head = [f"HTTP/1.1 {status} FAKE", "content-type: application/json", f"content-length: {len(data)}"]
+                head += [f"{k}: {v}" for k, v in extra_headers.items()]
+                writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + data)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionResetError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8099) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle, host, port)
+
+
+async def _main(args):
+    server = FakeOpenAIServer(args.fail_rate, args.latency_ms, args.dimensions)
+    srv = await server.start(args.host, args.port)
+    print(f"🧪 Fake OpenAI listening on http://{args.host}:{args.port}/v1")
+    async with srv:
+        await srv.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--latency-ms", type=int, default=0)
+    parser.add_argument("--dimensions", type=int, default=1536)
+    asyncio.run(_main(parser.parse_args()))
@@ -0,0 +1,132 @@
+"""
+In-process conversation memory for chat sessions.
+
+Each session keeps its recent turns (with token counts) and an optional
+rolling summary. The prompt gets the summary plus the most recent turns
+that fit a token budget; older turns are folded into the summary by a
+summarizer callback (or simply dropped without one), so memory and prompt
+size stay bounded however long the conversation runs.
+
+Sessions are loaded once (start_chat / resume_chat, or the first message
+a worker sees) and then appended to; idle sessions are evicted LRU.
+"""
+
+import time
+from collections import OrderedDict
+
+from src.llm.embeddings import count_tokens
+
+
+class SessionHistory:
+    def __init__(self, turns: list[dict] | None = None, summary: str | None = None):
+        self.turns: list[dict] = []
+        self.summary = summary
+        self.compacting = False
+        self.touched_at = time.monotonic()
+        for turn in turns or []:
+            self.append(turn["role"], turn["content"])
+
+    def append(self, role: str, content: str):
+        self.turns.append({"role": role, "content": content, "tokens": count_tokens(content)})
+        self.touched_at = time.monotonic()
+
+    def _window_start(self, token_budget: int) -> int:
+        """Index of the oldest user turn from which the rest fits the budget"""
+        used = 0
+        start = len(self.turns)
+        while start > 0 and used + self.turns[start - 1]["tokens"] <= token_budget:
+            start -= 1
+            used += self.turns[start]["tokens"]
+        # Never open the window with an answer whose question was cut off
+        while start < len(self.turns) and self.turns[start]["role"] != "user":
+            start += 1
+        return start
+
+    def window(self, token_budget: int) -> list[dict]:
+        """Most recent turns fitting token_budget, as chat messages"""
+        return [
+            {"role": turn["role"], "content": turn["content"]}
+            for turn in self.turns[self._window_start(token_budget):]
+        ]
+
+    def overflow(self, token_budget: int) -> list[dict]:
+        """Turns that no longer fit the window"""
+        return self.turns[:self._window_start(token_budget)]
+
+
+class SessionHistoryStore:
+    """LRU of SessionHistory by session id, with rolling summarisation"""
+
+    def __init__(
+        self,
+        token_budget: int = 2000,
+        max_sessions: int = 5000,
+        idle_ttl_seconds: float = 3600,
+        summary_trigger_tokens: int = 1500,
+        summarizer=None,
+    ):
+        self.token_budget = token_budget
+        self.max_sessions = max_sessions
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.summary_trigger_tokens = summary_trigger_tokens
+        # async summarizer(previous_summary, turns) -> new summary
+        self.summarizer = summarizer
+        self._sessions: OrderedDict[str, SessionHistory] = OrderedDict()
+        self.loads = 0
+        self.hits = 0
+        self.summaries = 0
+
+    def get(self, session_id: str) -> SessionHistory | None:
+        history = self._sessions.get(session_id)
+        if history is None:
+            return None
+        if time.monotonic() - history.touched_at > self.idle_ttl_seconds:
+            del self._sessions[session_id]
+            return None
+        self._sessions.move_to_end(session_id)
+        self.hits += 1
+        return history
+
+    def put(self, session_id: str, history: SessionHistory):
+        self._sessions[session_id] = history
+        self._sessions.move_to_end(session_id)
+        self.loads += 1
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+
+    def drop(self, session_id: str):
+        self._sessions.pop(session_id, None)
+
+    async def compact(self, session_id: str):
+        """Fold turns that left the window into the summary (or drop them)"""
+        history = self._sessions.get(session_id)
+        if history is None or history.compacting:
+            return
+        overflow = history.overflow(self.token_budget)
+        if not overflow:
+            return
+        if self.summarizer is None:
+            del history.turns[:len(overflow)]
+            return
+        if sum(turn["tokens"] for turn in overflow) < self.summary_trigger_tokens:
+            return
+
+        history.compacting = True
+        try:
+            history.summary = await self.summarizer(history.summary, overflow)
+            # Turns appended meanwhile are at the end, so the prefix is unchanged
+            del history.turns[:len(overflow)]
+            self.summaries += 1
+        except Exception as e:
+            # Keep the turns; the next message retries
+            print(f"⚠️ Summarising session {session_id} failed: {e}")
+        finally:
+            history.compacting = False
+
+    def stats(self) -> dict:
+        return {
+            "sessions": len(self._sessions),
+            "loads": self.loads,
+            "hits": self.hits,
+            "summaries": self.summaries,
+        }
@@ -1,22 +1,29 @@
 from fastapi import HTTPException
-from openai import AsyncOpenAI
 from src.env import env
+from src.llm.openai_client import create_openai_client
 
-async def llm_api_call(system_prompt: str, bot_prompt: str, user_prompt: str, context: list[dict]) -> dict:
-    """
-    Make an API call to OpenAI's API with system and user prompts.
-    
-    Args:
-        system_prompt: The system prompt to guide the model's behavior
-        bot_prompt: Bot-specific instructions
-        user_prompt: The user's input/query
-        context: Document context for the query
-        
-    Returns:
-        dict: The API response
-    """
-    client = AsyncOpenAI(api_key=env.OPENAI_API_KEY)
-    
+# One client per worker, closed in main.py's shutdown hook
+openai_client = create_openai_client(
+    api_key=env.OPENAI_API_KEY,
+    base_url=env.OPENAI_BASE_URL,
+    http2=env.OPENAI_HTTP2,
+    max_connections=env.OPENAI_MAX_CONNECTIONS,
+    max_keepalive_connections=env.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+    keepalive_expiry=env.OPENAI_KEEPALIVE_EXPIRY,
+    timeout=env.OPENAI_TIMEOUT,
+    connect_timeout=env.OPENAI_CONNECT_TIMEOUT,
+    max_retries=env.OPENAI_MAX_RETRIES,
+)
+
+def build_messages(
+    system_prompt: str,
+    bot_prompt: str,
+    user_prompt: str,
+    context: list[dict],
+    history: list[dict] | None = None,
+    summary: str | None = None,
+) -> list[dict]:
+    """Role-based messages for a RAG question, after any earlier turns"""
     # --- Build structured system prompt ---
     context_block = "\n\n".join(
         f"[Source: {chunk.get('file_name', 'unknown')}, Page: {chunk.get('page', 'N/A')}]\n{chunk.get('text', '')}"
@@ -31,23 +38,98 @@ async def llm_api_call(system_prompt: str, bot_prompt: str, user_prompt: str, co
         f"Use ONLY the following excerpts to answer the user's question.\n\n"
         f"{context_block}"
     )
+    if summary:
+        final_prompt += f"\n\n## Earlier in this conversation\n{summary}"
+
+    return [
+        {"role": "system", "content": final_prompt},
+        *(history or []),
+        {"role": "user", "content": user_prompt}
+    ]
 
+
+async def llm_api_call(
+    system_prompt: str,
+    bot_prompt: str,
+    user_prompt: str,
+    context: list[dict],
+    history: list[dict] | None = None,
+    summary: str | None = None,
+) -> dict:
+    """
+    Make an API call to OpenAI's API with system and user prompts.
+    
+    Args:
+        system_prompt: The system prompt to guide the model's behavior
+        bot_prompt: Bot-specific instructions
+        user_prompt: The user's input/query
+        context: Document context for the query
+        history: Earlier turns of the conversation (oldest first)
+        summary: Summary of turns older than history
+        
+    Returns:
+        dict: The API response
+    """
     try:
         # Use proper role-based message structure
-        response = await client.chat.completions.create(
+        response = await openai_client.chat.completions.create(
             model="gpt-5-nano",
-            messages=[
-                {"role": "system", "content": final_prompt},
-                {"role": "user", "content": user_prompt}
-            ]
+            messages=build_messages(system_prompt, bot_prompt, user_prompt, context, history, summary),
         )
         
         # Convert response to dict format
-        data = response.model_dump()
-        print(f"dataishere{data}")
-        return data
+        return response.model_dump()
     except Exception as e:
         print(f"errorishere{e}")
         raise HTTPException(status_code=500, detail=str(e))
-    
-    
\ No newline at end of file
+
+
+async def llm_stream_call(
+    system_prompt: str,
+    bot_prompt: str,
+    user_prompt: str,
+    context: list[dict],
+    history: list[dict] | None = None,
+    summary: str | None = None,
+):
+    """
+    Same request as llm_api_call, streamed.
+
+    Yields:
+        str: content deltas as the model produces them
+    """
+    stream = await openai_client.chat.completions.create(
+        model="gpt-5-nano",
+        messages=build_messages(system_prompt, bot_prompt, user_prompt, context, history, summary),
+        stream=True,
+    )
+    async with stream:
+        async for chunk in stream:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                yield delta
+
+
+async def llm_summarize(previous_summary: str | None, turns: list[dict]) -> str:
+    """Fold turns into a running conversation summary"""
+    transcript = "\n".join(f"{turn['role']}: {turn['content']}" for turn in turns)
+    response = await openai_client.chat.completions.create(
+        model="gpt-5-nano",
+        messages=[
+            {
+                "role": "system",
+                "content": (
+                    "Summarise this conversation between a user and a document assistant "
+                    "in at most 150 words. Keep names, numbers, documents and open questions "
+                    "the user may refer back to."
+                ),
+            },
+            {
+                "role": "user",
+                "content": f"Summary so far:\n{previous_summary or '(none)'}\n\nNew turns:\n{transcript}",
+            },
+        ],
+    )
+    return response.choices[0].message.content or previous_summary or ""
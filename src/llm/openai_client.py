@@ -0,0 +1,54 @@
+"""
+Long-lived AsyncOpenAI clients on a tuned, shared httpx pool.
+
+One client per process is created at import time by its owner
+(src/llm/llm.py for the API, consumer/vector/insert.py for the consumer)
+and closed on shutdown. Connections are kept alive between requests, so
+a chat message no longer pays client construction plus a TLS handshake.
+
+HTTP/2 is used when the h2 package is installed; several requests then
+share one connection. Like embeddings.py this module does not read env.
+"""
+
+import httpx
+from openai import AsyncOpenAI
+
+try:
+    import h2  # noqa: F401  (httpx needs it for http2=True)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+def create_openai_client(
+    api_key: str,
+    base_url: str | None = None,
+    http2: bool = True,
+    max_connections: int = 100,
+    max_keepalive_connections: int = 20,
+    keepalive_expiry: float = 60.0,
+    timeout: float = 60.0,
+    connect_timeout: float = 5.0,
+    max_retries: int = 2,
+) -> AsyncOpenAI:
+    """AsyncOpenAI client backed by a pooled, keep-alive httpx.AsyncClient"""
+    if http2 and not HTTP2_AVAILABLE:
+        print("⚠️ h2 is not installed, OpenAI client falls back to HTTP/1.1")
+        http2 = False
+
+    http_client = httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        ),
+        timeout=httpx.Timeout(timeout, connect=connect_timeout),
+    )
+    return AsyncOpenAI(
+        api_key=api_key,
+        base_url=base_url,
+        max_retries=max_retries,
+        timeout=httpx.Timeout(timeout, connect=connect_timeout),
+        http_client=http_client,
+    )
@@ -0,0 +1,182 @@
+"""
+Query-embedding cache for the chat path.
+
+Questions are keyed by sha256(model, normalized question) and kept in a
+bounded in-memory LRU with a TTL. An optional Redis backend lets several
+API workers share hits: a local miss falls through to Redis before going
+to OpenAI, and fresh embeddings are written to both tiers.
+
+Concurrent misses for the same question share one embedding request.
+"""
+
+import asyncio
+import hashlib
+import re
+import time
+from array import array
+from collections import OrderedDict
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # redis is only needed for the shared backend
+    aioredis = None
+
+_WHITESPACE = re.compile(r"\s+")
+_TRAILING_PUNCTUATION = re.compile(r"[\s?!.]+$")
+
+REDIS_KEY_PREFIX = "filemind:qemb:"
+
+
+def normalize_question(text: str) -> str:
+    """Case, whitespace and trailing ?!. do not change what is being asked"""
+    text = _WHITESPACE.sub(" ", text).strip().lower()
+    return _TRAILING_PUNCTUATION.sub("", text)
+
+
+def question_key(model: str, text: str) -> str:
+    return hashlib.sha256(f"{model}\0{normalize_question(text)}".encode("utf-8")).hexdigest()
+
+
+class QueryEmbeddingCache:
+    """LRU + TTL cache of question embeddings, optionally backed by Redis"""
+
+    def __init__(
+        self,
+        max_items: int = 10_000,
+        ttl_seconds: float = 3600,
+        redis_url: str | None = None,
+    ):
+        self.max_items = max_items
+        self.ttl_seconds = ttl_seconds
+        self._memory: OrderedDict[str, tuple[float, list[float]]] = OrderedDict()
+        self._pending: dict[str, asyncio.Future] = {}
+        self._redis = None
+        self.memory_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.shared_errors = 0
+
+        if redis_url:
+            if aioredis is None:
+                print("⚠️ QUERY_CACHE_REDIS_URL is set but redis is not installed, using memory only")
+            else:
+                self._redis = aioredis.from_url(redis_url)
+
+    # --- memory tier -------------------------------------------------------
+
+    def _get_local(self, key: str) -> list[float] | None:
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        expires_at, vector = entry
+        if expires_at < time.monotonic():
+            del self._memory[key]
+            self.expirations += 1
+            return None
+        self._memory.move_to_end(key)
+        return vector
+
+    def _put_local(self, key: str, vector: list[float]):
+        self._memory[key] = (time.monotonic() + self.ttl_seconds, vector)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    # --- shared tier -------------------------------------------------------
+
+    async def _get_shared(self, key: str) -> list[float] | None:
+        if self._redis is None:
+            return None
+        try:
+            blob = await self._redis.get(REDIS_KEY_PREFIX + key)
+        except Exception as e:
+            # The shared tier is an optimisation; never fail a chat over it
+            self.shared_errors += 1
+            print(f"⚠️ Query cache Redis read failed: {e}")
+            return None
+        return array("f", blob).tolist() if blob else None
+
+    async def _put_shared(self, key: str, vector: list[float]):
+        if self._redis is None:
+            return
+        try:
+            await self._redis.set(
+                REDIS_KEY_PREFIX + key,
+                array("f", vector).tobytes(),
+                ex=max(1, int(self.ttl_seconds)),
+            )
+        except Exception as e:
+            self.shared_errors += 1
+            print(f"⚠️ Query cache Redis write failed: {e}")
+
+    # --- public API --------------------------------------------------------
+
+    async def get_or_embed(self, model: str, text: str, embed) -> list[float]:
+        """Cached vector for text, or await embed(text) once and cache it"""
+        key = question_key(model, text)
+
+        vector = self._get_local(key)
+        if vector is not None:
+            self.memory_hits += 1
+            return vector
+
+        pending = self._pending.get(key)
+        if pending is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled():
+                    raise
+                # The chat that was embedding this question went away; do it ourselves
+                return await embed(text)
+
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            vector = await self._get_shared(key)
+            if vector is not None:
+                self.shared_hits += 1
+            else:
+                self.misses += 1
+                vector = await embed(text)
+                await self._put_shared(key, vector)
+            self._put_local(key, vector)
+            future.set_result(vector)
+            return vector
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so a failure nobody else awaited is not logged
+            future.exception()
+            raise
+        finally:
+            del self._pending[key]
+
+    def stats(self) -> dict:
+        hits = self.memory_hits + self.shared_hits
+        total = hits + self.misses + self.coalesced
+        return {
+            "hits": hits,
+            "memory_hits": self.memory_hits,
+            "shared_hits": self.shared_hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+            "hit_rate": round((hits + self.coalesced) / total, 4) if total else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "shared_errors": self.shared_errors,
+            "items": len(self._memory),
+            "shared_backend": self._redis is not None,
+        }
+
+    async def close(self):
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
@@ -0,0 +1,93 @@
+"""
+Local BM25-style sparse vectors for hybrid retrieval.
+
+Terms are hashed into a 32-bit index space, so no vocabulary has to be
+stored or shared between the consumer (documents) and the API (queries).
+Documents carry BM25 term-frequency weights; queries carry 1.0 per term.
+The IDF part of BM25 is applied by Qdrant (the sparse vector is created
+with Modifier.IDF), since only the collection knows document frequencies.
+
+Identifiers such as part numbers, error codes and clause IDs (AB-1234,
+ERR_042, 7.3.1) are kept whole and also split into their parts, so both
+"AB-1234" and "1234" match.
+
+Tokens are Unicode words (casefolded, NFKC-normalised), so accented and
+non-Latin text is indexed too. Scripts written without spaces (Chinese,
+Japanese, Thai) are indexed as overlapping character bigrams.
+"""
+
+import hashlib
+import re
+import unicodedata
+from collections import Counter
+
+from qdrant_client.models import SparseVector
+
+SPARSE_VECTOR_NAME = "bm25"
+
+# BM25 parameters; AVG_DOC_TOKENS approximates a 1000-char chunk
+BM25_K1 = 1.2
+BM25_B = 0.75
+AVG_DOC_TOKENS = 180
+
+_TOKEN = re.compile(r"[^\W_]+(?:[-_./:#][^\W_]+)*")
+_PART = re.compile(r"[^\W_]+")
+# Han, kana and Thai: no spaces between words
+_UNSEGMENTED = re.compile(r"[\u0e00-\u0e7f\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+")
+
+_STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have how i if in into is it its "
+    "of on or that the their there these this to was what when where which who "
+    "why will with you your".split()
+)
+
+
+def _bigrams(run: str) -> list[str]:
+    return [run] if len(run) == 1 else [run[i:i + 2] for i in range(len(run) - 1)]
+
+
+def tokenize(text: str) -> list[str]:
+    tokens = []
+    for match in _TOKEN.finditer(unicodedata.normalize("NFKC", text).casefold()):
+        token = match.group()
+        if _UNSEGMENTED.search(token):
+            for run in _UNSEGMENTED.findall(token):
+                tokens.extend(_bigrams(run))
+            tokens.extend(p for p in _PART.findall(_UNSEGMENTED.sub(" ", token)) if p not in _STOPWORDS)
+            continue
+        parts = _PART.findall(token)
+        if len(parts) > 1:
+            # Compound identifier: keep it whole and index its parts too
+            tokens.append(token)
+            tokens.extend(parts)
+        elif token not in _STOPWORDS:
+            tokens.append(token)
+    return tokens
+
+
+def _term_index(term: str) -> int:
+    return int.from_bytes(hashlib.blake2b(term.encode("utf-8"), digest_size=4).digest(), "little")
+
+
+def _to_sparse(weights: dict[int, float]) -> SparseVector:
+    indices = sorted(weights)
+    return SparseVector(indices=indices, values=[weights[i] for i in indices])
+
+
+def document_sparse_vector(text: str) -> SparseVector:
+    """BM25 term-frequency weights of a chunk (IDF is applied by Qdrant)"""
+    tokens = tokenize(text)
+    if not tokens:
+        return SparseVector(indices=[], values=[])
+    length_norm = BM25_K1 * (1 - BM25_B + BM25_B * len(tokens) / AVG_DOC_TOKENS)
+    weights: dict[int, float] = {}
+    for term, tf in Counter(tokens).items():
+        index = _term_index(term)
+        # Hash collisions just add up
+        weights[index] = weights.get(index, 0.0) + tf * (BM25_K1 + 1) / (tf + length_norm)
+    return _to_sparse(weights)
+
+
+def query_sparse_vector(text: str) -> SparseVector:
+    """One unit weight per distinct query term"""
+    return _to_sparse({_term_index(term): 1.0 for term in set(tokenize(text))})
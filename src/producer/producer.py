@@ -1,34 +1,24 @@
-import json
-import aio_pika
-from src.producer.rabbit_mq import get_connection
+from src.producer.rabbit_mq import publisher
 
 QUEUE = "document_process_queue"
 
-async def publish_document_job(document_id: str, bot_id: str, user_id: str):
-    connection = await get_connection()
-    channel = await connection.channel()
-
-    # Declare durable queue
-    await channel.declare_queue(
-        QUEUE,
-        durable=True
-    )
 
-    payload = {
+def _job(document_id: str, bot_id: str, user_id: str) -> dict:
+    return {
         "document_id": document_id,
         "bot_id": bot_id,
         "user_id": user_id
     }
 
-    message = aio_pika.Message(
-            body=json.dumps(payload).encode(),
-            delivery_mode=aio_pika.DeliveryMode.PERSISTENT
-        )
-
-    await channel.default_exchange.publish(
-        message,
-        routing_key=QUEUE
-    )
 
-    await connection.close()
+async def publish_document_job(document_id: str, bot_id: str, user_id: str):
+    payload = _job(document_id, bot_id, user_id)
+    await publisher.publish(QUEUE, payload)
     print("📨 Job published:", payload)
+
+
+async def publish_document_jobs(jobs: list[tuple[str, str, str]]):
+    """Publish (document_id, bot_id, user_id) jobs in one confirmed batch"""
+    payloads = [_job(*job) for job in jobs]
+    await publisher.publish_many(QUEUE, payloads)
+    print(f"📨 {len(payloads)} jobs published")
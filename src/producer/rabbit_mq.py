@@ -1,9 +1,76 @@
+import asyncio
+import json
 import aio_pika
-import os
+from aio_pika.pool import Pool
 from src.env import env
 
 RABBIT_MQ_URL = env.RABBIT_MQ_URL
 
-async def get_connection():
-    connection = await aio_pika.connect_robust(RABBIT_MQ_URL)
-    return connection
+
+class Publisher:
+    """
+    App-scoped publisher: one robust connection, a pool of channels in
+    publisher-confirm mode, and each queue declared once per process.
+    publish() returns once the broker has confirmed the message.
+    """
+
+    def __init__(self, url: str, channel_pool_size: int = 4):
+        self.url = url
+        self.channel_pool_size = channel_pool_size
+        self._connection: aio_pika.abc.AbstractRobustConnection | None = None
+        self._channels: Pool | None = None
+        self._declared: set[str] = set()
+        self._lock = asyncio.Lock()
+
+    async def _get_channel(self) -> aio_pika.abc.AbstractChannel:
+        return await self._connection.channel(publisher_confirms=True)
+
+    async def _ensure_started(self):
+        if self._channels is not None:
+            return
+        async with self._lock:
+            if self._channels is None:
+                self._connection = await aio_pika.connect_robust(self.url)
+                self._channels = Pool(self._get_channel, max_size=self.channel_pool_size)
+                print(f"🐇 Publisher connected ({self.channel_pool_size} channels)")
+
+    async def _ensure_queue(self, channel, queue: str):
+        if queue in self._declared:
+            return
+        # Robust channels re-declare it after a reconnect
+        await channel.declare_queue(queue, durable=True)
+        self._declared.add(queue)
+
+    @staticmethod
+    def _message(payload: dict) -> aio_pika.Message:
+        return aio_pika.Message(
+            body=json.dumps(payload).encode(),
+            delivery_mode=aio_pika.DeliveryMode.PERSISTENT,
+        )
+
+    async def publish(self, queue: str, payload: dict):
+        await self.publish_many(queue, [payload])
+
+    async def publish_many(self, queue: str, payloads: list[dict]):
+        """Publish on one channel, waiting for all confirms together"""
+        if not payloads:
+            return
+        await self._ensure_started()
+        async with self._channels.acquire() as channel:
+            await self._ensure_queue(channel, queue)
+            await asyncio.gather(*(
+                channel.default_exchange.publish(self._message(payload), routing_key=queue)
+                for payload in payloads
+            ))
+
+    async def close(self):
+        if self._channels is not None:
+            await self._channels.close()
+            self._channels = None
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+        self._declared.clear()
+
+
+publisher = Publisher(RABBIT_MQ_URL, channel_pool_size=env.RABBIT_MQ_CHANNEL_POOL_SIZE)
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from src.db import prisma
 from src.deps.auth import get_current_user
+from src.services.config_cache import invalidate_api_key
 from src.utils.api_key import generate_api_key, hash_api_key
 
 router = APIRouter(tags=["api-keys"])
@@ -72,6 +73,7 @@ async def revoke_api_key(
             raise HTTPException(status_code=403)
 
         await prisma.apikey.delete(where={"id": api_key_id})
+        await invalidate_api_key(key.keyHash)
 
         return {"success": True}
     except Exception as e:
@@ -2,6 +2,8 @@ from fastapi import APIRouter, Depends, HTTPException
 from src.db import prisma
 from src.schemas.bots import BotCreateRequest, BotUpdateRequest
 from src.deps.auth import get_current_user
+from src.services.answers import answer_cache
+from src.services.config_cache import invalidate_bot
 
 router = APIRouter(prefix="/bots", tags=["bots"])
 
@@ -17,6 +19,10 @@ async def create_bot(
             "name": data.name,
             "description": data.description,
             "systemPrompt": data.systemPrompt,
+            "chunkingStrategy": data.chunkingStrategy,
+            "vectorProfile": data.vectorProfile,
+            "answerCacheEnabled": data.answerCacheEnabled,
+            "answerCacheThreshold": data.answerCacheThreshold,
             "userId": user.id,
         }
     )
@@ -53,6 +59,9 @@ async def update_bot(
         where={"id": bot_id},
         data=data.dict(exclude_unset=True),
     )
+    await invalidate_bot(bot_id)
+    # Other workers notice the new updatedAt on their next lookup
+    answer_cache.invalidate(bot_id)
 
     return updated
 
@@ -68,5 +77,7 @@ async def delete_bot(
         raise HTTPException(status_code=404, detail="Bot not found")
 
     await prisma.bot.delete(where={"id": bot_id})
+    await invalidate_bot(bot_id)
+    answer_cache.invalidate(bot_id)
 
     return {"success": True}
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from src.db import prisma
 from src.deps.auth import get_current_user
+from src.services.message_journal import message_journal
 
 router = APIRouter(prefix="/chats", tags=["chats"])
 
@@ -15,6 +16,8 @@ async def list_chat_sessions(
     if not bot or bot.userId != user.id:
         raise HTTPException(status_code=404, detail="Bot not found")
 
+    # Last-message previews should include queued messages
+    await message_journal.flush()
     sessions = await prisma.chatsession.find_many(
         where={"botId": bot_id},
         include={
@@ -60,6 +63,8 @@ async def get_chat_messages(
     if session.bot.userId != user.id:
         raise HTTPException(status_code=403, detail="Forbidden")
 
+    # Messages still queued in the write-behind journal must be in the table first
+    await message_journal.flush_session(session_id)
     messages = await prisma.chatmessage.find_many(
         where={"sessionId": session_id},
         order={"createdAt": "asc"},
@@ -70,6 +75,7 @@ async def get_chat_messages(
             "id": m.id,
             "role": m.role,
             "content": m.content,
+            "status": m.status,
             "createdAt": m.createdAt.isoformat(),
         }
         for m in messages
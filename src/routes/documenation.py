@@ -1,14 +1,34 @@
 from fastapi import APIRouter, Depends, HTTPException
-from src.producer.producer import publish_document_job
+from src.producer.producer import publish_document_job, publish_document_jobs
 from src.db import prisma
 from src.deps.auth import get_current_user
-from src.schemas.documentation import CreateUploadUrlRequest
-from src.utils.s3 import generate_presigned_upload_url
+from src.schemas.documentation import (
+    BulkCompleteUploadRequest,
+    BulkCreateUploadUrlRequest,
+    CreateUploadUrlRequest,
+)
+from src.utils.s3 import generate_presigned_upload_url, generate_presigned_upload_urls
 import uuid
 import os
 
 router = APIRouter(tags=["documents"])
 
+MAX_FILE_SIZE = 50 * 1024 * 1024
+
+
+def validate_upload(payload: CreateUploadUrlRequest) -> str | None:
+    """Reason the file is rejected, or None (PDF only, size limit)"""
+    if payload.fileSize > MAX_FILE_SIZE:
+        return "File too large"
+
+    ext = os.path.splitext(payload.fileName)[1].lower()
+    if ext != ".pdf":
+        return "Only PDF files are supported"
+
+    if payload.fileType != "application/pdf":
+        return "Invalid file type"
+    return None
+
 
 @router.post("/bots/{bot_id}/documents/upload-url")
 async def create_upload_url(
@@ -23,15 +43,9 @@ async def create_upload_url(
 
     # 2️⃣ Validate file (PDF only)
     print(f"payloadishere { payload }")
-    if payload.fileSize > 50 * 1024 * 1024:
-        raise HTTPException(status_code=400, detail="File too large")
-
-    ext = os.path.splitext(payload.fileName)[1].lower()
-    if ext != ".pdf":
-        raise HTTPException(status_code=400, detail="Only PDF files are supported")
-
-    if payload.fileType != "application/pdf":
-        raise HTTPException(status_code=400, detail="Invalid file type")
+    error = validate_upload(payload)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
 
     # 3️⃣ Create document record
     document_id = str(uuid.uuid4())
@@ -98,4 +112,107 @@ async def complete_document_upload(
         "success": True,
         "documentId": document_id,
         "status": "queued",
-    }
\ No newline at end of file
+    }
+
+
+@router.post("/bots/{bot_id}/documents/upload-urls")
+async def create_upload_urls(
+    bot_id: str,
+    payload: BulkCreateUploadUrlRequest,
+    user=Depends(get_current_user),
+):
+    """
+    Batch version of create_upload_url: one create_many for all valid
+    files, presigned together. Returns one result per file, in order.
+    """
+    # 1️⃣ Verify bot ownership
+    bot = await prisma.bot.find_unique(where={"id": bot_id})
+    if not bot or bot.userId != user.id:
+        raise HTTPException(status_code=404, detail="Bot not found")
+
+    # 2️⃣ Validate every file; rejected ones get an error result
+    results = []
+    rows = []
+    for file in payload.files:
+        error = validate_upload(file)
+        if error:
+            results.append({"fileName": file.fileName, "error": error})
+            continue
+        document_id = str(uuid.uuid4())
+        s3_key = f"documents/{bot_id}/{document_id}.pdf"
+        rows.append({
+            "id": document_id,
+            "botId": bot_id,
+            "fileName": file.fileName,
+            "fileType": file.fileType,
+            "fileSize": file.fileSize,
+            "storageUrl": s3_key,
+            "status": "queued",
+        })
+        results.append({"fileName": file.fileName, "documentId": document_id, "s3Key": s3_key})
+
+    # 3️⃣ Create all document records in one statement
+    if rows:
+        await prisma.document.create_many(data=rows)
+
+    # 4️⃣ Presign in bulk
+    upload_urls = iter(generate_presigned_upload_urls([row["storageUrl"] for row in rows]))
+    for result in results:
+        if "documentId" in result:
+            result["uploadUrl"] = next(upload_urls)
+
+    return {
+        "created": len(rows),
+        "failed": len(results) - len(rows),
+        "files": results,
+    }
+
+
+@router.post("/documents/complete")
+async def complete_document_uploads(
+    payload: BulkCompleteUploadRequest,
+    user=Depends(get_current_user),
+):
+    """
+    Batch version of complete_document_upload: one read, one status
+    update and one publish burst. Returns one result per document id.
+    """
+    document_ids = list(dict.fromkeys(payload.documentIds))
+
+    # 1️⃣ Fetch all documents
+    documents = await prisma.document.find_many(
+        where={"id": {"in": document_ids}},
+        include={"bot": True},
+    )
+    by_id = {document.id: document for document in documents}
+
+    # 2️⃣ Ownership and double-enqueue checks per document
+    results = []
+    jobs = []
+    for document_id in document_ids:
+        document = by_id.get(document_id)
+        if not document:
+            results.append({"documentId": document_id, "error": "Document not found"})
+        elif document.bot.userId != user.id:
+            results.append({"documentId": document_id, "error": "Forbidden"})
+        elif document.status in ("processing", "ready"):
+            results.append({"documentId": document_id, "error": "Document already queued or processed"})
+        else:
+            jobs.append((document_id, document.bot.id, user.id))
+            results.append({"documentId": document_id, "status": "queued"})
+
+    if jobs:
+        # 3️⃣ Update status → queued
+        await prisma.document.update_many(
+            where={"id": {"in": [job[0] for job in jobs]}},
+            data={"status": "queued"},
+        )
+
+        # 4️⃣ Push all jobs to the queue in one confirmed burst
+        await publish_document_jobs(jobs)
+
+    return {
+        "queued": len(jobs),
+        "failed": len(results) - len(jobs),
+        "documents": results,
+    }
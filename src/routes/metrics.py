@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends
+from src.deps.auth import get_current_user
+from src.services.answers import answer_cache, context_stats, reply_stats, ttft_stats
+from src.services.config_cache import api_key_cache, bot_cache
+from src.services.history import session_histories
+from src.services.message_journal import message_journal
+from src.vector.retrieve import query_cache
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("/cache")
+async def cache_metrics(user=Depends(get_current_user)):
+    """Hit rates of this worker's chat-path caches."""
+    return {
+        "query_embeddings": query_cache.stats() if query_cache is not None else None,
+        "answers": answer_cache.stats(),
+        "bots": bot_cache.stats(),
+        "api_keys": api_key_cache.stats(),
+    }
+
+
+@router.get("/chat")
+async def chat_metrics(user=Depends(get_current_user)):
+    """Time to first token and full-reply latency on this worker."""
+    return {
+        "time_to_first_token": ttft_stats.summary(),
+        "reply": reply_stats.summary(),
+        "context": context_stats.stats(),
+        "history": session_histories.stats(),
+        "message_journal": message_journal.stats(),
+    }
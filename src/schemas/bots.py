@@ -1,9 +1,18 @@
+from typing import Literal
 from pydantic import BaseModel, Field
 
+ChunkingStrategy = Literal["recursive", "tokens", "sentences", "sections"]
+# See src/vector/profiles.py; applied when the bot's collection is created
+VectorProfile = Literal["default", "scalar", "binary", "compact"]
+
 class BotCreateRequest(BaseModel):
     name: str = Field(min_length=2, max_length=100)
     description: str | None = None
     systemPrompt: str | None = None
+    chunkingStrategy: ChunkingStrategy | None = None
+    vectorProfile: VectorProfile | None = None
+    answerCacheEnabled: bool = False
+    answerCacheThreshold: float | None = Field(default=None, ge=0.5, le=1.0)
 
 
 class BotUpdateRequest(BaseModel):
@@ -11,3 +20,7 @@ class BotUpdateRequest(BaseModel):
     description: str | None = None
     systemPrompt: str | None = None
     isActive: bool | None = None
+    chunkingStrategy: ChunkingStrategy | None = None
+    vectorProfile: VectorProfile | None = None
+    answerCacheEnabled: bool | None = None
+    answerCacheThreshold: float | None = Field(default=None, ge=0.5, le=1.0)
@@ -1,7 +1,18 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+# Largest batch accepted by the bulk upload endpoints
+MAX_BATCH_FILES = 500
 
 
 class CreateUploadUrlRequest(BaseModel):
     fileName: str
     fileType: str
     fileSize: int
+
+
+class BulkCreateUploadUrlRequest(BaseModel):
+    files: list[CreateUploadUrlRequest] = Field(min_length=1, max_length=MAX_BATCH_FILES)
+
+
+class BulkCompleteUploadRequest(BaseModel):
+    documentIds: list[str] = Field(min_length=1, max_length=MAX_BATCH_FILES)
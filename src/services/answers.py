@@ -0,0 +1,161 @@
+import time
+
+from src.env import env
+from src.llm.answer_cache import SemanticAnswerCache
+from src.llm.llm import llm_api_call, llm_stream_call
+from src.llm.prompt.system_prompt import system_prompt
+from src.utils.latency import LatencyStats
+from src.vector.context import ContextStats, CrossEncoderReranker, CrossEncoder, build_context
+from src.vector.retrieve import bot_location, embed_text, query_dimensions, retrieve_relevant_chunks
+
+answer_cache = SemanticAnswerCache(
+    max_entries_per_bot=env.ANSWER_CACHE_MAX_ENTRIES_PER_BOT,
+    max_bots=env.ANSWER_CACHE_MAX_BOTS,
+    ttl_seconds=env.ANSWER_CACHE_TTL_SECONDS,
+)
+
+# Question received -> first token available (streamed) / full reply (not streamed)
+ttft_stats = LatencyStats()
+reply_stats = LatencyStats()
+# Prompt tokens saved by dedupe/rerank/packing
+context_stats = ContextStats()
+
+if env.RERANK_MODE == "cross-encoder" and CrossEncoder is None:
+    print("⚠️ RERANK_MODE=cross-encoder but sentence-transformers is not installed, using MMR")
+cross_encoder = (
+    CrossEncoderReranker(env.RERANK_MODEL)
+    if env.RERANK_MODE == "cross-encoder" and CrossEncoder is not None
+    else None
+)
+
+
+def bot_fingerprint(bot, vector_size: int) -> str:
+    """Changes whenever the bot is edited, finishes ingesting a document or changes embedding size"""
+    return f"{bot.updatedAt.isoformat()}:{bot.knowledgeVersion}:{vector_size}"
+
+
+def _uses_answer_cache(bot) -> bool:
+    return env.ANSWER_CACHE_ENABLED and bot.answerCacheEnabled
+
+
+async def _cached_answer(bot, question: str, standalone: bool) -> tuple[list[float], str | None]:
+    """Embed the question once; return it with a cached answer, if any"""
+    # At the size of the bot's collection (reduced-dimension profiles)
+    dimensions = await query_dimensions(bot_location(bot.id).collection_name)
+    query_vector = await embed_text(question, dimensions)
+    # A follow-up ("and the second one?") depends on earlier turns, so only
+    # questions asked without history may reuse someone else's answer
+    if not standalone or not _uses_answer_cache(bot):
+        return query_vector, None
+
+    threshold = bot.answerCacheThreshold or env.ANSWER_CACHE_THRESHOLD
+    hit = answer_cache.lookup(bot.id, bot_fingerprint(bot, len(query_vector)), query_vector, threshold)
+    if hit is None:
+        return query_vector, None
+    answer, score = hit
+    print(f"💾 Answer cache hit for bot {bot.id} (similarity {score:.3f})")
+    return query_vector, answer
+
+
+async def _retrieve_context(bot, question: str, query_vector: list[float]) -> list[dict]:
+    """Over-fetch candidates, then dedupe, rerank and pack them to the token budget"""
+    location = bot_location(bot.id)
+    candidates = await retrieve_relevant_chunks(
+        collection_name=location.collection_name,
+        question=question,
+        top_k=max(env.RETRIEVAL_CANDIDATES, env.RETRIEVAL_TOP_K),
+        query_vector=query_vector,
+        query_filter=location.query_filter,
+    )
+    context, report = await build_context(
+        question,
+        candidates,
+        top_k=env.RETRIEVAL_TOP_K,
+        token_budget=env.CONTEXT_TOKEN_BUDGET,
+        rerank=env.RERANK_MODE,
+        mmr_lambda=env.MMR_LAMBDA,
+        cross_encoder=cross_encoder,
+    )
+    context_stats.record(report["tokens_before"], report["tokens_after"])
+    print(
+        f"✂️ Context for bot {bot.id}: {report['chunks']}/{report['candidates']} chunks, "
+        f"{report['tokens_after']} tokens ({report['tokens_saved']} saved)"
+    )
+    return context
+
+
+def _remember_answer(bot, question: str, query_vector: list[float], reply: str | None, standalone: bool):
+    if reply and standalone and _uses_answer_cache(bot):
+        answer_cache.store(bot.id, bot_fingerprint(bot, len(query_vector)), question, query_vector, reply)
+
+
+async def answer_question(
+    bot,
+    question: str,
+    history: list[dict] | None = None,
+    summary: str | None = None,
+) -> str | None:
+    """
+    Retrieve context and ask the LLM, or return a cached answer to a
+    near-identical question when the bot has the answer cache enabled.
+    history/summary are the earlier turns of the conversation.
+    """
+    started = time.perf_counter()
+    standalone = not history and not summary
+    query_vector, cached = await _cached_answer(bot, question, standalone)
+    if cached is not None:
+        reply_stats.record(time.perf_counter() - started)
+        return cached
+
+    context = await _retrieve_context(bot, question, query_vector)
+    response = await llm_api_call(
+        system_prompt=system_prompt,
+        bot_prompt=bot.systemPrompt,
+        context=context,
+        user_prompt=question,
+        history=history,
+        summary=summary,
+    )
+    reply = response.get("choices", [{}])[0].get("message", {}).get("content")
+
+    reply_stats.record(time.perf_counter() - started)
+    _remember_answer(bot, question, query_vector, reply, standalone)
+    return reply
+
+
+async def stream_answer(
+    bot,
+    question: str,
+    history: list[dict] | None = None,
+    summary: str | None = None,
+):
+    """
+    Streaming answer_question: yields content deltas as the LLM produces
+    them (a cached answer is yielded whole).
+    """
+    started = time.perf_counter()
+    standalone = not history and not summary
+    query_vector, cached = await _cached_answer(bot, question, standalone)
+    if cached is not None:
+        ttft_stats.record(time.perf_counter() - started)
+        yield cached
+        return
+
+    context = await _retrieve_context(bot, question, query_vector)
+
+    parts = []
+    async for delta in llm_stream_call(
+        system_prompt=system_prompt,
+        bot_prompt=bot.systemPrompt,
+        context=context,
+        user_prompt=question,
+        history=history,
+        summary=summary,
+    ):
+        if not parts:
+            ttft_stats.record(time.perf_counter() - started)
+        parts.append(delta)
+        yield delta
+
+    reply_stats.record(time.perf_counter() - started)
+    _remember_answer(bot, question, query_vector, "".join(parts), standalone)
@@ -0,0 +1,116 @@
+"""
+Read-through cache of Bot rows and API-key rows for the socket hot path.
+
+Entries expire after CONFIG_CACHE_TTL_SECONDS. update_bot, delete_bot and
+revoke_api_key invalidate them explicitly; with CACHE_INVALIDATION_REDIS_URL
+set, invalidations are also published so every API worker drops its copy.
+"""
+
+import asyncio
+import json
+
+from src.db import prisma
+from src.env import env
+from src.utils.ttl_cache import TTLCache
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # only needed for cross-worker invalidation
+    aioredis = None
+
+INVALIDATION_CHANNEL = "filemind:config-invalidate"
+
+bot_cache = TTLCache(env.CONFIG_CACHE_TTL_SECONDS, env.CONFIG_CACHE_MAX_ITEMS)
+# keyed by keyHash, which is what connect() looks keys up by
+api_key_cache = TTLCache(env.CONFIG_CACHE_TTL_SECONDS, env.CONFIG_CACHE_MAX_ITEMS)
+
+_redis = None
+_listener: asyncio.Task | None = None
+
+
+async def get_bot(bot_id: str):
+    bot = bot_cache.get(bot_id)
+    if bot is None:
+        bot = await prisma.bot.find_unique(where={"id": bot_id})
+        if bot is not None:
+            bot_cache.set(bot_id, bot)
+    return bot
+
+
+async def get_api_key(key_hash: str):
+    api_key = api_key_cache.get(key_hash)
+    if api_key is None:
+        api_key = await prisma.apikey.find_unique(where={"keyHash": key_hash})
+        if api_key is not None:
+            api_key_cache.set(key_hash, api_key)
+    return api_key
+
+
+def _drop(kind: str, key: str):
+    (bot_cache if kind == "bot" else api_key_cache).pop(key)
+
+
+async def _publish(kind: str, key: str):
+    if _redis is None:
+        return
+    try:
+        await _redis.publish(INVALIDATION_CHANNEL, json.dumps({"kind": kind, "key": key}))
+    except Exception as e:
+        # Other workers still expire the entry after the TTL
+        print(f"⚠️ Publishing cache invalidation failed: {e}")
+
+
+async def invalidate_bot(bot_id: str):
+    _drop("bot", bot_id)
+    await _publish("bot", bot_id)
+
+
+async def invalidate_api_key(key_hash: str):
+    _drop("api_key", key_hash)
+    await _publish("api_key", key_hash)
+
+
+async def _listen(pubsub):
+    while True:
+        try:
+            async for message in pubsub.listen():
+                if message.get("type") != "message":
+                    continue
+                try:
+                    event = json.loads(message["data"])
+                    _drop(event["kind"], event["key"])
+                except (ValueError, KeyError, TypeError) as e:
+                    print(f"⚠️ Ignoring bad cache invalidation message: {e}")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            # Invalidations may have been missed while disconnected
+            print(f"⚠️ Cache invalidation listener error, retrying: {e}")
+            bot_cache.clear()
+            api_key_cache.clear()
+            await asyncio.sleep(1)
+
+
+async def start_invalidation_listener():
+    """Subscribe to invalidations from other workers (no-op without Redis)"""
+    global _redis, _listener
+    if not env.CACHE_INVALIDATION_REDIS_URL:
+        return
+    if aioredis is None:
+        print("⚠️ CACHE_INVALIDATION_REDIS_URL is set but redis is not installed")
+        return
+    _redis = aioredis.from_url(env.CACHE_INVALIDATION_REDIS_URL)
+    pubsub = _redis.pubsub()
+    await pubsub.subscribe(INVALIDATION_CHANNEL)
+    _listener = asyncio.create_task(_listen(pubsub))
+    print("📡 Listening for config cache invalidations")
+
+
+async def stop_invalidation_listener():
+    global _redis, _listener
+    if _listener is not None:
+        _listener.cancel()
+        _listener = None
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
@@ -0,0 +1,74 @@
+import asyncio
+
+from src.db import prisma
+from src.env import env
+from src.llm.history import SessionHistory, SessionHistoryStore
+from src.llm.llm import llm_summarize
+from src.services.message_journal import message_journal
+
+session_histories = SessionHistoryStore(
+    token_budget=env.CHAT_HISTORY_TOKEN_BUDGET,
+    max_sessions=env.CHAT_HISTORY_MAX_SESSIONS,
+    idle_ttl_seconds=env.CHAT_HISTORY_IDLE_TTL_SECONDS,
+    summary_trigger_tokens=env.CHAT_HISTORY_SUMMARY_TRIGGER_TOKENS,
+    summarizer=llm_summarize if env.CHAT_HISTORY_SUMMARY_ENABLED else None,
+)
+
+# Strong references to background summarisation tasks
+_compactions: set[asyncio.Task] = set()
+
+
+async def load_history(session_id: str, exclude_id: str | None = None) -> SessionHistory:
+    """
+    Session history from memory, read from Postgres once if this worker has not seen it.
+    exclude_id is the question being answered, which is already journaled but is not a past turn.
+    """
+    history = session_histories.get(session_id)
+    if history is not None:
+        return history
+
+    await message_journal.flush_session(session_id)
+    where = {"sessionId": session_id, "role": {"in": ["user", "assistant"]}}
+    if exclude_id:
+        where["id"] = {"not": exclude_id}
+    # Latest messages only; anything older would not fit the window anyway
+    messages = await prisma.chatmessage.find_many(
+        where=where,
+        order={"createdAt": "desc"},
+        take=env.CHAT_HISTORY_LOAD_LIMIT,
+    )
+    turns = []
+    for m in reversed(messages):
+        if m.status != "complete":
+            # record_turn skips failed replies, so their question is dropped here as well
+            if turns and turns[-1]["role"] == "user":
+                turns.pop()
+            continue
+        turns.append({"role": m.role, "content": m.content})
+    history = SessionHistory(turns)
+    session_histories.put(session_id, history)
+    # A long resumed session is summarised right away
+    _schedule_compaction(session_id)
+    return history
+
+
+def start_history(session_id: str):
+    """A new session has no turns yet - nothing to read"""
+    session_histories.put(session_id, SessionHistory())
+
+
+def conversation_context(history: SessionHistory) -> tuple[list[dict], str | None]:
+    """(recent turns within the token budget, summary of older ones)"""
+    return history.window(session_histories.token_budget), history.summary
+
+
+def record_turn(session_id: str, history: SessionHistory, question: str, reply: str):
+    history.append("user", question)
+    history.append("assistant", reply)
+    _schedule_compaction(session_id)
+
+
+def _schedule_compaction(session_id: str):
+    task = asyncio.create_task(session_histories.compact(session_id))
+    _compactions.add(task)
+    task.add_done_callback(_compactions.discard)
@@ -0,0 +1,165 @@
+"""
+Write-behind journal for chat messages.
+
+user_message enqueues its rows here instead of inserting them on the reply
+path. A background task writes them with create_many once
+MESSAGE_JOURNAL_MAX_ROWS are pending or MESSAGE_JOURNAL_FLUSH_SECONDS have
+passed. Readers of a session (get_chat_messages, history loading) flush
+first, and shutdown drains the queue.
+
+Row ids and createdAt are assigned at enqueue time, so ordering is kept
+and a retried batch is skipped instead of duplicated. A failed batch is
+retried row by row: rows the database rejects (e.g. their session was
+deleted) are dropped, and a row that keeps failing otherwise is dropped
+after MESSAGE_JOURNAL_MAX_ATTEMPTS flushes, so one bad row never blocks
+the rows queued after it.
+"""
+
+import asyncio
+import uuid
+from datetime import datetime, timezone
+
+from generated.prisma import errors as prisma_errors
+from src.db import prisma
+from src.env import env
+
+SHUTDOWN_FLUSH_ATTEMPTS = 3
+
+
+class MessageJournal:
+    def __init__(self, max_rows: int = 200, flush_seconds: float = 0.5, max_attempts: int = 5):
+        self.max_rows = max_rows
+        self.flush_seconds = flush_seconds
+        self.max_attempts = max_attempts
+        self._pending: list[dict] = []
+        # row id -> failed single-row writes so far
+        self._attempts: dict[str, int] = {}
+        self._wake = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._stopping = False
+        self.batches = 0
+        self.rows = 0
+        self.failures = 0
+        self.dropped = 0
+
+    def add(self, session_id: str, role: str, content: str, status: str = "complete") -> str:
+        """Queue one ChatMessage row; returns its id"""
+        message_id = str(uuid.uuid4())
+        self._pending.append({
+            "id": message_id,
+            "sessionId": session_id,
+            "role": role,
+            # Postgres text cannot store NUL bytes
+            "content": content.replace("\x00", ""),
+            "status": status,
+            "createdAt": datetime.now(timezone.utc),
+        })
+        if len(self._pending) >= self.max_rows:
+            self._wake.set()
+        return message_id
+
+    def has_pending(self, session_id: str | None = None) -> bool:
+        if session_id is None:
+            return bool(self._pending)
+        return any(row["sessionId"] == session_id for row in self._pending)
+
+    async def flush(self):
+        """Write everything queued so far"""
+        async with self._flush_lock:
+            while self._pending:
+                batch = self._pending[:self.max_rows]
+                del self._pending[:len(batch)]
+                try:
+                    await prisma.chatmessage.create_many(data=batch, skip_duplicates=True)
+                except Exception as e:
+                    self.failures += 1
+                    print(f"⚠️ Message journal batch of {len(batch)} rows failed, writing them one by one: {e}")
+                    await self._write_rows(batch)
+                    continue
+                self.batches += 1
+                self.rows += len(batch)
+
+    async def _write_rows(self, rows: list[dict]):
+        """Write a failed batch row by row so a bad row cannot hold back the others"""
+        for i, row in enumerate(rows):
+            try:
+                await prisma.chatmessage.create_many(data=[row], skip_duplicates=True)
+            except prisma_errors.DataError as e:
+                # Rejected by the database; retrying cannot help
+                self._drop(row, e)
+                continue
+            except Exception as e:
+                attempts = self._attempts.get(row["id"], 0) + 1
+                if attempts >= self.max_attempts:
+                    self._drop(row, e)
+                    continue
+                self._attempts[row["id"]] = attempts
+                # Most likely the database is unreachable: keep this row and the rest, in order
+                self._pending[:0] = rows[i:]
+                raise
+            self._attempts.pop(row["id"], None)
+            self.rows += 1
+
+    def _drop(self, row: dict, error: Exception):
+        self._attempts.pop(row["id"], None)
+        self.dropped += 1
+        print(f"❌ Dropping chat message {row['id']} of session {row['sessionId']}: {error}")
+
+    async def flush_session(self, session_id: str):
+        """Make a session's messages visible to a database read"""
+        if self.has_pending(session_id):
+            await self.flush()
+
+    async def _run(self):
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"⚠️ Message journal flush failed ({len(self._pending)} rows pending), retrying: {e}")
+
+    def start(self):
+        if self._task is None:
+            self._stopping = False
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flusher and write whatever is still queued"""
+        self._stopping = True
+        self._wake.set()
+        if self._task is not None:
+            await self._task
+            self._task = None
+        for attempt in range(1, SHUTDOWN_FLUSH_ATTEMPTS + 1):
+            try:
+                await self.flush()
+                break
+            except Exception as e:
+                print(f"⚠️ Final message journal flush failed (attempt {attempt}): {e}")
+                if attempt == SHUTDOWN_FLUSH_ATTEMPTS:
+                    print(f"❌ {len(self._pending)} chat messages were not persisted")
+                    return
+                await asyncio.sleep(attempt)
+        print(f"📝 Message journal drained ({self.rows} rows in {self.batches} batches)")
+
+    def stats(self) -> dict:
+        return {
+            "pending": len(self._pending),
+            "rows": self.rows,
+            "batches": self.batches,
+            "failures": self.failures,
+            "dropped": self.dropped,
+            "rows_per_batch": round(self.rows / self.batches, 1) if self.batches else 0.0,
+        }
+
+
+message_journal = MessageJournal(
+    max_rows=env.MESSAGE_JOURNAL_MAX_ROWS,
+    flush_seconds=env.MESSAGE_JOURNAL_FLUSH_SECONDS,
+    max_attempts=env.MESSAGE_JOURNAL_MAX_ATTEMPTS,
+)
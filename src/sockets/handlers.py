@@ -1,9 +1,11 @@
 from src.sockets.ws_chats import sio
 from src.db import prisma
+from src.services.config_cache import get_api_key, get_bot
 from src.utils.api_key import hash_api_key
-from src.vector.retrieve import retrieve_relevant_chunks
-from src.llm.llm import llm_api_call
-from src.llm.prompt.system_prompt import system_prompt
+from src.env import env
+from src.services.answers import answer_question, stream_answer
+from src.services.history import conversation_context, load_history, record_turn, start_history
+from src.services.message_journal import message_journal
 
 
 @sio.event
@@ -18,9 +20,7 @@ async def connect(sid, environ, auth):
 
     hashed = hash_api_key(api_key)
 
-    api_key_obj = await prisma.apikey.find_unique(
-        where={"keyHash": hashed}
-    )
+    api_key_obj = await get_api_key(hashed)
 
     if not api_key_obj or not api_key_obj.isActive:
         return False
@@ -28,7 +28,7 @@ async def connect(sid, environ, auth):
     if api_key_obj.botId != bot_id:
         return False
 
-    bot = await prisma.bot.find_unique(where={"id": bot_id})
+    bot = await get_bot(bot_id)
     if not bot or not bot.isActive:
         return False
 
@@ -61,9 +61,7 @@ async def start_chat(sid, data):
         )
 
         # 2️⃣ Fetch bot to get system prompt
-        bot = await prisma.bot.find_unique(
-            where={"id": session["botId"]}
-        )
+        bot = await get_bot(session["botId"])
 
         # 3️⃣ Insert SYSTEM message FIRST
         if bot and bot.systemPrompt:
@@ -75,18 +73,21 @@ async def start_chat(sid, data):
                 }
             )
 
-        # 4️⃣ Join room (session == room)
+        # 4️⃣ Empty conversation memory for the new session
+        start_history(chat_session.id)
+
+        # 5️⃣ Join room (session == room)
         room = f"chat:{chat_session.id}"
         await sio.enter_room(sid, room)
 
-        # 5️⃣ Save session context
+        # 6️⃣ Save session context
         await sio.save_session(sid, {
             **session,
             "sessionId": chat_session.id,
             "room": room,
         })
 
-        # 6️⃣ Notify client
+        # 7️⃣ Notify client
         await sio.emit(
             "chat_started",
             {"sessionId": chat_session.id},
@@ -124,6 +125,9 @@ async def resume_chat(sid, data):
     if old_room:
         await sio.leave_room(sid, old_room)
 
+    # Load conversation memory once for this session
+    await load_history(chat_session.id)
+
     # Join new room
     room = f"chat:{chat_session.id}"
     await sio.enter_room(sid, room)
@@ -153,50 +157,40 @@ async def user_message(sid, data):
     if not message:
         return
 
-    # Store user message in DB
-    await prisma.chatmessage.create(
-        data={
-            "sessionId": session["sessionId"],
-            "role": "user",
-            "content": message,
-        }
-    )
+    # Queue user message for the DB (written in batches, off the reply path)
+    message_id = message_journal.add(session["sessionId"], "user", message)
 
-    # Retrieve relevant document chunks from vector store
+    # Retrieve relevant document chunks and call the LLM (or hit the answer cache)
+    stream = data.get("stream", env.CHAT_STREAMING)
+    parts = []
+    status = "complete"
     try:
-        context = await retrieve_relevant_chunks(
-            collection_name=bot_id,
-            question=message,
-        )
-
-        # Get bot for its system prompt
-        bot = await prisma.bot.find_unique(where={"id": bot_id})
-        bot_data = bot.model_dump()
-
-        # Call the LLM
-        response = await llm_api_call(
-            system_prompt=system_prompt,
-            bot_prompt=bot_data["systemPrompt"],
-            context=context,
-            user_prompt=message,
-        )
-
-        reply = response.get("choices", [{}])[0].get("message", {}).get("content", "Sorry, I could not generate a response.")
+        history = await load_history(session["sessionId"], exclude_id=message_id)
+        turns, summary = conversation_context(history)
+        bot = await get_bot(bot_id)
+        if stream:
+            # Forward tokens as they arrive; the full reply follows as assistant_message
+            async for delta in stream_answer(bot, message, turns, summary):
+                parts.append(delta)
+                await sio.emit("assistant_delta", {"content": delta}, to=room)
+            reply = "".join(parts) or "Sorry, I could not generate a response."
+        else:
+            reply = await answer_question(bot, message, turns, summary) or "Sorry, I could not generate a response."
     except Exception as e:
         print(f"LLM error: {e}")
-        reply = "Sorry, I encountered an error processing your question. Please try again."
-
-    # Store assistant message in DB
-    await prisma.chatmessage.create(
-        data={
-            "sessionId": session["sessionId"],
-            "role": "assistant",
-            "content": reply,
-        }
-    )
+        # Keep whatever was already streamed to the room, marked as cut off
+        reply = "".join(parts) or "Sorry, I encountered an error processing your question. Please try again."
+        # Shown and stored, but never fed back to the LLM (load_history skips it)
+        status = "truncated" if parts else "failed"
+    else:
+        record_turn(session["sessionId"], history, message, reply)
+
+    # Queue assistant message for the DB
+    message_journal.add(session["sessionId"], "assistant", reply, status)
 
     await sio.emit("assistant_message", {
         "content": reply,
+        "status": status,
     }, to=room)
 
 
@@ -0,0 +1,23 @@
+from collections import deque
+
+
+class LatencyStats:
+    """Rolling window of latency samples (seconds) with percentile summary"""
+
+    def __init__(self, window: int = 1000):
+        self._samples: deque[float] = deque(maxlen=window)
+        self.count = 0
+
+    def record(self, seconds: float):
+        self._samples.append(seconds)
+        self.count += 1
+
+    def summary(self) -> dict:
+        if not self._samples:
+            return {"count": self.count, "p50_ms": None, "p95_ms": None, "p99_ms": None}
+        ordered = sorted(self._samples)
+
+        def pct(p: float) -> float:
+            return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 1)
+
+        return {"count": self.count, "p50_ms": pct(0.50), "p95_ms": pct(0.95), "p99_ms": pct(0.99)}
@@ -17,20 +17,20 @@ def generate_presigned_upload_url(s3_key: str, expires_in: int = 300):
     Generate a presigned URL for uploading files to S3.
     IMPORTANT: The client MUST include 'Content-Type: application/pdf' header when uploading!
     """
-    print(f"s3accesskeyishere: {env.AWS_ACCESS_KEY_ID}")
-    print(f"s3secretaccesskeyishere: {env.AWS_SECRET_ACCESS_KEY}")
-    print(f"s3regionishere: {env.AWS_REGION}")
-    print(f"s3_keyishere: {s3_key}")
-    print(f"BUCKETishere: {BUCKET}")
-    print(f"expires_inishere: {expires_in}")
-    
-    return s3.generate_presigned_url(
-        ClientMethod="put_object",
-        Params={
-            "Bucket": BUCKET,
-            "Key": s3_key,
-            "ContentType": "application/pdf",  # Enforce PDF content type
-        },
-        ExpiresIn=expires_in,
-    )
+    return generate_presigned_upload_urls([s3_key], expires_in)[0]
 
+
+def generate_presigned_upload_urls(s3_keys: list[str], expires_in: int = 300) -> list[str]:
+    """Presign many uploads at once (signing is local, no S3 round trip)"""
+    return [
+        s3.generate_presigned_url(
+            ClientMethod="put_object",
+            Params={
+                "Bucket": BUCKET,
+                "Key": s3_key,
+                "ContentType": "application/pdf",  # Enforce PDF content type
+            },
+            ExpiresIn=expires_in,
+        )
+        for s3_key in s3_keys
+    ]
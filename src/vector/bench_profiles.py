@@ -0,0 +1,177 @@
+"""
+Recall vs latency vs RAM of the collection profiles in src/vector/profiles.py.
+
+The same vectors are loaded into one collection per profile (truncated and
+re-normalised for reduced-dimension profiles, which is what the
+text-embedding-3 `dimensions` parameter returns) and searched the way
+retrieve.py searches them. recall@k is measured against exact float32
+search at full size.
+
+RAM is reported twice: an estimate from the profile (vectors and quantized
+copies kept in RAM plus HNSW links) and, against a dedicated server, the
+change in Qdrant's allocated memory.
+
+Usage:
+    python -m src.vector.bench_profiles --qdrant-url http://localhost:6333 --points 50000
+    python -m src.vector.bench_profiles --from-collection <bot_id>     # real embeddings of a bot
+    python -m src.vector.bench_profiles --qdrant-url :memory: --points 2000  # smoke test
+"""
+
+import argparse
+import time
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.models import PointStruct, SearchParams
+
+from src.vector.bench_tenancy import qdrant_memory
+from src.vector.profiles import PROFILES, CollectionProfile, search_params
+
+PREFIX = "bench_profile"
+UPSERT_BATCH = 512
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    return matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+
+
+def _synthetic(points: int, queries: int, dim: int, seed: int = 7) -> tuple[np.ndarray, np.ndarray]:
+    """Clustered vectors (topics + noise), closer to embeddings than uniform noise"""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(8, points // 200), dim))
+    # Decaying per-dimension scale mimics the front-loaded variance of text-embedding-3
+    scale = 1 / np.sqrt(np.arange(1, dim + 1)) ** 0.5
+
+    def sample(n: int) -> np.ndarray:
+        picks = centers[rng.integers(len(centers), size=n)]
+        return _normalize((picks + 0.6 * rng.normal(size=(n, dim))) * scale)
+
+    return sample(points).astype(np.float32), sample(queries).astype(np.float32)
+
+
+def _from_collection(client: QdrantClient, name: str, queries: int, seed: int = 7) -> tuple[np.ndarray, np.ndarray]:
+    """Real vectors of an existing collection; a random sample is held out as queries"""
+    vectors = []
+    offset = None
+    while True:
+        points, offset = client.scroll(name, limit=1000, offset=offset, with_payload=False, with_vectors=[""])
+        for point in points:
+            vector = point.vector[""] if isinstance(point.vector, dict) else point.vector
+            vectors.append(vector)
+        if offset is None:
+            break
+    matrix = _normalize(np.asarray(vectors, dtype=np.float32))
+    order = np.random.default_rng(seed).permutation(len(matrix))
+    return matrix[order[queries:]], matrix[order[:queries]]
+
+
+def _truncate(matrix: np.ndarray, dimensions: int) -> np.ndarray:
+    return _normalize(matrix[:, :dimensions]).astype(np.float32)
+
+
+def _estimated_ram_mb(profile: CollectionProfile, points: int) -> float:
+    per_point = 0.0
+    if not profile.on_disk:
+        per_point += profile.dimensions * 4
+    if profile.quantization == "scalar":
+        per_point += profile.dimensions
+    elif profile.quantization == "binary":
+        per_point += profile.dimensions / 8
+    # Layer-0 HNSW links: 2m neighbour ids of 4 bytes
+    per_point += (profile.hnsw_m or 16) * 2 * 4
+    return per_point * points / 2**20
+
+
+def _wait_for_index(client: QdrantClient, name: str, timeout: float = 600):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        info = client.get_collection(name)
+        if str(getattr(info.status, "value", info.status)) == "green":
+            return
+        time.sleep(1)
+
+
+def run(client: QdrantClient, args, profile: CollectionProfile, corpus: np.ndarray, queries: np.ndarray, truth: np.ndarray) -> dict:
+    name = f"{PREFIX}_{profile.name}"
+    if client.collection_exists(name):
+        client.delete_collection(name)
+    before = qdrant_memory(args.qdrant_url, args.api_key)
+
+    started = time.perf_counter()
+    client.create_collection(
+        name,
+        vectors_config=profile.vectors_config(),
+        quantization_config=profile.quantization_config(),
+        hnsw_config=profile.hnsw_config(),
+    )
+    vectors = _truncate(corpus, profile.dimensions)
+    for start in range(0, len(vectors), UPSERT_BATCH):
+        client.upsert(
+            name,
+            points=[
+                PointStruct(id=start + i, vector=vector.tolist())
+                for i, vector in enumerate(vectors[start:start + UPSERT_BATCH])
+            ],
+            wait=True,
+        )
+    _wait_for_index(client, name)
+    load = time.perf_counter() - started
+    after = qdrant_memory(args.qdrant_url, args.api_key)
+
+    params = search_params(profile.quantization, args.hnsw_ef) or SearchParams(hnsw_ef=args.hnsw_ef)
+    query_vectors = _truncate(queries, profile.dimensions)
+    latencies = []
+    recall = 0.0
+    for query, expected in zip(query_vectors, truth):
+        start = time.perf_counter()
+        points = client.query_points(name, query=query.tolist(), limit=args.top_k, search_params=params).points
+        latencies.append(time.perf_counter() - start)
+        recall += len({p.id for p in points} & set(expected.tolist())) / args.top_k
+
+    client.delete_collection(name)
+    return {
+        "profile": profile.name,
+        "recall": recall / len(query_vectors),
+        "p50_ms": float(np.percentile(latencies, 50)) * 1000,
+        "p99_ms": float(np.percentile(latencies, 99)) * 1000,
+        "load_s": load,
+        "ram_est_mb": _estimated_ram_mb(profile, len(corpus)),
+        "ram_mb": (after["memory_allocated_bytes"] - before["memory_allocated_bytes"]) / 2**20
+        if "memory_allocated_bytes" in after and "memory_allocated_bytes" in before
+        else None,
+    }
+
+
+def main(args):
+    client = QdrantClient(location=":memory:") if args.qdrant_url == ":memory:" else QdrantClient(url=args.qdrant_url, api_key=args.api_key, timeout=300)
+    if args.from_collection:
+        corpus, queries = _from_collection(client, args.from_collection, args.queries)
+    else:
+        corpus, queries = _synthetic(args.points, args.queries, args.dim)
+    # Exact float32 top-k at full size is the reference every profile is scored against
+    truth = np.argsort(-(queries @ corpus.T), axis=1)[:, :args.top_k]
+
+    names = args.profiles.split(",") if args.profiles else list(PROFILES)
+    print(f"📊 {len(corpus)} points, {corpus.shape[1]} dims, {len(queries)} queries, recall@{args.top_k} vs exact search")
+    for name in names:
+        result = run(client, args, PROFILES[name], corpus, queries, truth)
+        measured = f"{result['ram_mb']:.0f} MB" if result["ram_mb"] is not None else "n/a"
+        print(
+            f"   {result['profile']:>8}: recall {result['recall']:.3f} | p50 {result['p50_ms']:.2f} ms | "
+            f"p99 {result['p99_ms']:.2f} ms | RAM est {result['ram_est_mb']:.0f} MB, measured {measured} | "
+            f"load {result['load_s']:.1f}s"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--qdrant-url", default="http://localhost:6333")
+    parser.add_argument("--api-key", default=None)
+    parser.add_argument("--from-collection", default=None, help="benchmark on the vectors of an existing collection")
+    parser.add_argument("--points", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--hnsw-ef", type=int, default=None)
+    parser.add_argument("--profiles", default=None, help=f"comma-separated subset of {', '.join(PROFILES)}")
+    main(parser.parse_args())
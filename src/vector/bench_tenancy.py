@@ -0,0 +1,167 @@
+"""
+Per-bot collections vs shared multi-tenant collections.
+
+For each bot count, both layouts are loaded with the same synthetic points
+and queried for random bots:
+
+    collection  one collection per bot (QDRANT_TENANCY=collection)
+    shared      one collection, is_tenant bot_id index, per-tenant HNSW (QDRANT_TENANCY=shared)
+
+Reports setup time, Qdrant memory (from its /metrics endpoint, so point it
+at a dedicated instance) and query p50/p99. Everything created is deleted
+afterwards.
+
+Usage:
+    python -m src.vector.bench_tenancy --qdrant-url http://localhost:6333 --bots 1000,10000
+    python -m src.vector.bench_tenancy --qdrant-url :memory: --bots 200    # smoke test, no memory numbers
+"""
+
+import argparse
+import random
+import re
+import time
+import uuid
+
+import httpx
+from qdrant_client import QdrantClient
+from qdrant_client.models import Distance, PointStruct, VectorParams
+
+from src.vector.tenancy import SHARED_HNSW_CONFIG, TENANT_INDEX_SCHEMA, TENANT_KEY, tenant_filter
+
+PREFIX = "bench_tenancy"
+UPSERT_BATCH = 1000
+_MEMORY_METRIC = re.compile(r"^(memory_allocated_bytes|memory_resident_bytes)\s+([0-9.e+]+)$", re.M)
+
+
+def _random_vector(size: int) -> list[float]:
+    vector = [random.uniform(-1, 1) for _ in range(size)]
+    norm = sum(v * v for v in vector) ** 0.5 or 1.0
+    return [v / norm for v in vector]
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def qdrant_memory(url: str, api_key: str | None) -> dict[str, float]:
+    """Qdrant's allocated/resident bytes, or {} when unavailable"""
+    if url == ":memory:":
+        return {}
+    try:
+        response = httpx.get(f"{url.rstrip('/')}/metrics", headers={"api-key": api_key} if api_key else None, timeout=10)
+        response.raise_for_status()
+    except httpx.HTTPError:
+        return {}
+    return {name: float(value) for name, value in _MEMORY_METRIC.findall(response.text)}
+
+
+def _points(bot: str, count: int, dim: int, tenant: bool) -> list[PointStruct]:
+    return [
+        PointStruct(
+            id=str(uuid.uuid4()),
+            vector=_random_vector(dim),
+            payload={"text": f"chunk {i} of {bot}", **({TENANT_KEY: bot} if tenant else {})},
+        )
+        for i in range(count)
+    ]
+
+
+def _load_collections(client: QdrantClient, bots: list[str], per_bot: int, dim: int):
+    for bot in bots:
+        name = f"{PREFIX}_{bot}"
+        client.create_collection(name, vectors_config=VectorParams(size=dim, distance=Distance.COSINE))
+        client.upsert(name, points=_points(bot, per_bot, dim, tenant=False), wait=True)
+
+
+def _load_shared(client: QdrantClient, bots: list[str], per_bot: int, dim: int):
+    client.create_collection(
+        PREFIX,
+        vectors_config=VectorParams(size=dim, distance=Distance.COSINE),
+        hnsw_config=SHARED_HNSW_CONFIG,
+    )
+    client.create_payload_index(PREFIX, field_name=TENANT_KEY, field_schema=TENANT_INDEX_SCHEMA, wait=True)
+    batch: list[PointStruct] = []
+    for bot in bots:
+        batch.extend(_points(bot, per_bot, dim, tenant=True))
+        if len(batch) >= UPSERT_BATCH:
+            client.upsert(PREFIX, points=batch, wait=True)
+            batch = []
+    if batch:
+        client.upsert(PREFIX, points=batch, wait=True)
+
+
+def _query(client: QdrantClient, layout: str, bot: str, vector: list[float], top_k: int):
+    if layout == "collection":
+        return client.query_points(f"{PREFIX}_{bot}", query=vector, limit=top_k).points
+    return client.query_points(PREFIX, query=vector, query_filter=tenant_filter(bot), limit=top_k).points
+
+
+def _cleanup(client: QdrantClient):
+    for collection in client.get_collections().collections:
+        if collection.name == PREFIX or collection.name.startswith(f"{PREFIX}_"):
+            client.delete_collection(collection.name)
+
+
+def run(client: QdrantClient, args, layout: str, bot_count: int) -> dict:
+    bots = [uuid.uuid4().hex for _ in range(bot_count)]
+    before = qdrant_memory(args.qdrant_url, args.api_key)
+
+    started = time.perf_counter()
+    loader = _load_collections if layout == "collection" else _load_shared
+    loader(client, bots, args.points_per_bot, args.dim)
+    setup = time.perf_counter() - started
+    # Let background optimizers settle before sampling memory
+    time.sleep(args.settle_seconds)
+    after = qdrant_memory(args.qdrant_url, args.api_key)
+
+    latencies = []
+    for _ in range(args.queries):
+        bot = random.choice(bots)
+        start = time.perf_counter()
+        hits = _query(client, layout, bot, _random_vector(args.dim), args.top_k)
+        latencies.append(time.perf_counter() - start)
+        assert all(hit.payload["text"].endswith(bot) for hit in hits), "cross-tenant hit"
+
+    _cleanup(client)
+    return {
+        "layout": layout,
+        "bots": bot_count,
+        "setup_s": setup,
+        "memory_mb": {
+            name: (after[name] - before.get(name, 0.0)) / 2**20 for name in after
+        },
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+    }
+
+
+def main(args):
+    client = QdrantClient(location=":memory:") if args.qdrant_url == ":memory:" else QdrantClient(url=args.qdrant_url, api_key=args.api_key, timeout=300)
+    _cleanup(client)
+    print(f"📊 {args.points_per_bot} points/bot, {args.dim} dims, {args.queries} queries per run")
+    try:
+        for bot_count in (int(n) for n in args.bots.split(",")):
+            for layout in ("collection", "shared"):
+                result = run(client, args, layout, bot_count)
+                memory = " | ".join(f"{name} +{mb:.0f} MB" for name, mb in result["memory_mb"].items()) or "memory n/a"
+                print(
+                    f"   {result['layout']:>10} {result['bots']:>6} bots: setup {result['setup_s']:.1f}s | "
+                    f"{memory} | p50 {result['p50_ms']:.2f} ms | p99 {result['p99_ms']:.2f} ms"
+                )
+    finally:
+        _cleanup(client)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--qdrant-url", default="http://localhost:6333")
+    parser.add_argument("--api-key", default=None)
+    parser.add_argument("--bots", default="1000,10000", help="comma-separated bot counts")
+    parser.add_argument("--points-per-bot", type=int, default=50)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--settle-seconds", type=float, default=5.0)
+    main(parser.parse_args())
@@ -0,0 +1,101 @@
+"""
+Chunk text kept outside Qdrant.
+
+With CHUNK_TEXT_IN_QDRANT=false the consumer writes each chunk's text here,
+keyed by its Qdrant point ID, and stores points without the "text"
+payload. After a search the API fetches the texts of all hits in one
+query. Texts are zlib-compressed in a SQLite file (WAL), so the consumer
+and the API must see the same CHUNK_STORE_PATH (same host or volume).
+
+Point IDs are derived from the chunk content (ChunkIdAssigner), so an ID
+always maps to the same text and rewrites are no-ops.
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+import zlib
+
+# SQLite's default limit on host parameters is 999
+_SQL_BATCH = 500
+
+
+class ChunkStore:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS chunks ("
+            "id TEXT PRIMARY KEY, doc_id TEXT NOT NULL, text BLOB NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS chunks_doc_id ON chunks (doc_id)")
+        self._db.commit()
+        self.hits = 0
+        self.misses = 0
+
+    def _put_sync(self, doc_id: str, items: list[tuple[str, str]]):
+        with self._lock:
+            self._db.executemany(
+                "INSERT OR IGNORE INTO chunks (id, doc_id, text) VALUES (?, ?, ?)",
+                [(point_id, doc_id, zlib.compress(text.encode("utf-8"))) for point_id, text in items],
+            )
+            self._db.commit()
+
+    def _get_sync(self, ids: list[str]) -> dict[str, str]:
+        found = {}
+        with self._lock:
+            for i in range(0, len(ids), _SQL_BATCH):
+                batch = ids[i:i + _SQL_BATCH]
+                rows = self._db.execute(
+                    f"SELECT id, text FROM chunks WHERE id IN ({','.join('?' * len(batch))})",
+                    batch,
+                ).fetchall()
+                for point_id, blob in rows:
+                    found[point_id] = zlib.decompress(blob).decode("utf-8")
+        return found
+
+    def _delete_sync(self, ids: list[str]):
+        with self._lock:
+            for i in range(0, len(ids), _SQL_BATCH):
+                batch = ids[i:i + _SQL_BATCH]
+                self._db.execute(f"DELETE FROM chunks WHERE id IN ({','.join('?' * len(batch))})", batch)
+            self._db.commit()
+
+    def _delete_document_sync(self, doc_id: str):
+        with self._lock:
+            self._db.execute("DELETE FROM chunks WHERE doc_id = ?", (doc_id,))
+            self._db.commit()
+
+    async def put_many(self, doc_id: str, items: list[tuple[str, str]]):
+        """Store (point_id, text) pairs of one document"""
+        if items:
+            await asyncio.to_thread(self._put_sync, doc_id, items)
+
+    async def get_many(self, ids: list[str]) -> dict[str, str]:
+        """point_id -> text for the IDs that are stored"""
+        if not ids:
+            return {}
+        found = await asyncio.to_thread(self._get_sync, list(set(ids)))
+        self.hits += len(found)
+        self.misses += len(set(ids)) - len(found)
+        return found
+
+    async def delete_many(self, ids: list[str]):
+        if ids:
+            await asyncio.to_thread(self._delete_sync, ids)
+
+    async def delete_document(self, doc_id: str):
+        await asyncio.to_thread(self._delete_document_sync, doc_id)
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
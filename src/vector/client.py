@@ -1,4 +1,4 @@
-from qdrant_client import QdrantClient
+from qdrant_client import AsyncQdrantClient, QdrantClient
 import os
 from src.env import env
 
@@ -8,3 +8,30 @@ qdrant_client = QdrantClient(
     timeout=120,  # 2 minutes timeout for large batch operations
 )
 
+# Async client for the chat path. Created lazily so its connection pool
+# (a multiplexed gRPC channel when QDRANT_PREFER_GRPC is set) binds to the
+# running event loop; closed on app shutdown.
+_async_qdrant_client: AsyncQdrantClient | None = None
+
+
+def get_async_qdrant_client() -> AsyncQdrantClient:
+    global _async_qdrant_client
+    if _async_qdrant_client is None:
+        _async_qdrant_client = AsyncQdrantClient(
+            url=env.QDRANT_DB_CLUSTER_URL,
+            api_key=env.QDRANT_DB_API_KEY,
+            prefer_grpc=env.QDRANT_PREFER_GRPC,
+            timeout=env.QDRANT_SEARCH_TIMEOUT,
+            grpc_options={
+                "grpc.keepalive_time_ms": 30_000,
+                "grpc.keepalive_permit_without_calls": 1,
+            },
+        )
+    return _async_qdrant_client
+
+
+async def close_async_qdrant_client():
+    global _async_qdrant_client
+    if _async_qdrant_client is not None:
+        await _async_qdrant_client.close()
+        _async_qdrant_client = None
@@ -0,0 +1,226 @@
+"""
+Post-retrieval stage: turn over-fetched candidates into a compact context.
+
+1. dedupe   - consecutive chunks of a document (which share the splitter's
+              overlap) are stitched together, near-duplicates are dropped
+2. rerank   - "mmr" trades relevance against redundancy using term overlap;
+              "cross-encoder" scores (question, chunk) pairs with a small CPU
+              model (sentence-transformers, optional); "none" keeps Qdrant's order
+3. pack     - chunks are added in rank order until the token budget is used
+
+Every request reports how many prompt tokens it saved compared with sending
+the top_k raw results.
+"""
+
+import asyncio
+
+from src.llm.embeddings import count_tokens
+from src.llm.sparse import tokenize
+
+try:
+    from sentence_transformers import CrossEncoder
+except ImportError:  # cross-encoder reranking is optional
+    CrossEncoder = None
+
+# Chunks whose term sets overlap this much are treated as duplicates
+DUPLICATE_JACCARD = 0.85
+# Shortest shared tail/head for two chunks to count as overlapping
+MIN_STITCH_CHARS = 20
+
+
+def _terms(chunk: dict) -> set[str]:
+    if "_terms" not in chunk:
+        chunk["_terms"] = set(tokenize(chunk.get("text") or ""))
+    return chunk["_terms"]
+
+
+def _jaccard(a: set[str], b: set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _stitch(first: str, second: str) -> str | None:
+    """first + second without their shared overlap, or None if they do not overlap"""
+    head = second[:MIN_STITCH_CHARS]
+    if len(head) < MIN_STITCH_CHARS:
+        return None
+    start = first.rfind(head)
+    while start != -1:
+        if second.startswith(first[start:]):
+            return first + second[len(first) - start:]
+        start = first.rfind(head, 0, start)
+    return None
+
+
+def dedupe_chunks(chunks: list[dict]) -> list[dict]:
+    """Stitch consecutive chunks of the same document and drop near-duplicates"""
+    by_position = {
+        (chunk.get("doc_id"), chunk.get("chunk_index")): chunk
+        for chunk in chunks
+        if chunk.get("doc_id") is not None and chunk.get("chunk_index") is not None
+    }
+    # Chunks already part of an earlier (higher-ranked) result
+    absorbed: set[int] = set()
+    result = []
+    for chunk in chunks:
+        if id(chunk) in absorbed:
+            continue
+        absorbed.add(id(chunk))
+        merged = dict(chunk)
+        merged.pop("_terms", None)
+        index = chunk.get("chunk_index")
+        # Walk backward (index - 1, - 2, ...) and then forward through retrieved neighbours,
+        # so a lower-ranked neighbour is stitched into this chunk instead of repeating it later
+        for step in (-1, 1):
+            position = index
+            while position is not None:
+                neighbour = by_position.get((chunk.get("doc_id"), position + step))
+                if neighbour is None or id(neighbour) in absorbed:
+                    break
+                if step < 0:
+                    stitched = _stitch(neighbour["text"], merged["text"])
+                else:
+                    stitched = _stitch(merged["text"], neighbour["text"])
+                if stitched is None:
+                    break
+                merged["text"] = stitched
+                merged["score"] = max(merged.get("score") or 0, neighbour.get("score") or 0)
+                absorbed.add(id(neighbour))
+                position += step
+
+        if any(_jaccard(_terms(merged), _terms(kept)) >= DUPLICATE_JACCARD for kept in result):
+            continue
+        result.append(merged)
+    return result
+
+
+def mmr(chunks: list[dict], limit: int, lambda_: float = 0.7) -> list[dict]:
+    """
+    Maximal marginal relevance over the retrieval order: relevance is the
+    candidate's rank, redundancy its term overlap with chunks already picked.
+    """
+    if not chunks:
+        return []
+    relevance = {id(chunk): 1 - i / len(chunks) for i, chunk in enumerate(chunks)}
+    remaining = list(chunks)
+    selected: list[dict] = []
+    while remaining and len(selected) < limit:
+        best = max(
+            remaining,
+            key=lambda c: lambda_ * relevance[id(c)]
+            - (1 - lambda_) * max((_jaccard(_terms(c), _terms(s)) for s in selected), default=0.0),
+        )
+        selected.append(best)
+        remaining.remove(best)
+    return selected
+
+
+class CrossEncoderReranker:
+    """Scores (question, chunk) pairs with a small local cross-encoder"""
+
+    def __init__(self, model_name: str):
+        self.model_name = model_name
+        self._model = None
+
+    def _score_sync(self, question: str, texts: list[str]) -> list[float]:
+        if self._model is None:
+            self._model = CrossEncoder(self.model_name, device="cpu")
+        return [float(score) for score in self._model.predict([(question, text) for text in texts])]
+
+    async def rerank(self, question: str, chunks: list[dict], limit: int) -> list[dict]:
+        scores = await asyncio.to_thread(self._score_sync, question, [c["text"] for c in chunks])
+        ranked = sorted(zip(scores, range(len(chunks))), key=lambda pair: pair[0], reverse=True)
+        return [{**chunks[i], "rerank_score": score} for score, i in ranked[:limit]]
+
+
+def _truncate_to_tokens(text: str, token_budget: int) -> str:
+    """Longest prefix of text within token_budget (binary search over its length)"""
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count_tokens(text[:middle]) <= token_budget:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low]
+
+
+def pack_context(chunks: list[dict], token_budget: int) -> tuple[list[dict], int]:
+    """Chunks in order while they fit token_budget; returns (chunks, tokens used)"""
+    packed = []
+    used = 0
+    for chunk in chunks:
+        tokens = count_tokens(chunk["text"])
+        if used + tokens > token_budget:
+            if packed:
+                # A smaller, lower-ranked chunk may still fit
+                continue
+            # Never send an empty context when the best chunk alone is too long
+            text = _truncate_to_tokens(chunk["text"], token_budget)
+            if not text:
+                continue
+            chunk = {**chunk, "text": text}
+            tokens = count_tokens(text)
+        packed.append(chunk)
+        used += tokens
+    return packed, used
+
+
+class ContextStats:
+    """Prompt tokens the post-retrieval stage saved, per worker"""
+
+    def __init__(self):
+        self.requests = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+
+    def record(self, before: int, after: int):
+        self.requests += 1
+        self.tokens_before += before
+        self.tokens_after += after
+
+    def stats(self) -> dict:
+        saved = self.tokens_before - self.tokens_after
+        return {
+            "requests": self.requests,
+            "tokens_before": self.tokens_before,
+            "tokens_after": self.tokens_after,
+            "tokens_saved": saved,
+            "avg_tokens_saved": round(saved / self.requests, 1) if self.requests else 0.0,
+        }
+
+
+def _public(chunk: dict) -> dict:
+    return {key: value for key, value in chunk.items() if not key.startswith("_")}
+
+
+async def build_context(
+    question: str,
+    candidates: list[dict],
+    top_k: int,
+    token_budget: int,
+    rerank: str = "mmr",
+    mmr_lambda: float = 0.7,
+    cross_encoder: CrossEncoderReranker | None = None,
+) -> tuple[list[dict], dict]:
+    """Dedupe, rerank and pack candidates; returns (context chunks, report)"""
+    baseline = sum(count_tokens(c.get("text") or "") for c in candidates[:top_k])
+
+    chunks = dedupe_chunks([c for c in candidates if c.get("text")])
+    if rerank == "cross-encoder" and cross_encoder is not None and chunks:
+        chunks = await cross_encoder.rerank(question, chunks, top_k)
+    elif rerank == "none":
+        chunks = chunks[:top_k]
+    else:
+        chunks = mmr(chunks, top_k, mmr_lambda)
+
+    packed, used = pack_context(chunks, token_budget)
+    report = {
+        "candidates": len(candidates),
+        "chunks": len(packed),
+        "tokens_before": baseline,
+        "tokens_after": used,
+        "tokens_saved": baseline - used,
+    }
+    return [_public(chunk) for chunk in packed], report
@@ -0,0 +1,143 @@
+"""
+Recall@k of dense, sparse (BM25) and hybrid (RRF) retrieval on the fixed
+eval set in src/vector/eval/retrieval_eval.json.
+
+The passages are indexed into a throwaway collection laid out like the
+consumer's (unnamed dense vector + "bm25" sparse vector with IDF), and
+each query is run the way src/vector/retrieve.py:search_points runs it.
+
+Usage:
+    python -m src.vector.eval_retrieval                       # OpenAI embeddings, in-memory Qdrant
+    python -m src.vector.eval_retrieval --embeddings fake     # no API key; dense scores are noise
+    python -m src.vector.eval_retrieval --qdrant-url http://localhost:6333
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import uuid
+
+from qdrant_client import QdrantClient
+from qdrant_client.models import (
+    Distance,
+    Fusion,
+    FusionQuery,
+    Modifier,
+    PointStruct,
+    Prefetch,
+    SparseVectorParams,
+    VectorParams,
+)
+
+from src.llm.fake_openai import fake_embedding
+from src.llm.sparse import SPARSE_VECTOR_NAME, document_sparse_vector, query_sparse_vector
+
+EVAL_SET = os.path.join(os.path.dirname(__file__), "eval", "retrieval_eval.json")
+COLLECTION = "retrieval_eval"
+PREFETCH_LIMIT = 20
+KS = (1, 3, 5)
+_IDENTIFIER = re.compile(r"\b[\w]*\d[\w.-]*\b")
+
+
+async def _embed(texts: list[str], mode: str, model: str) -> list[list[float]]:
+    if mode == "fake":
+        return [fake_embedding(text, 256) for text in texts]
+
+    from src.llm.openai_client import create_openai_client
+
+    client = create_openai_client(api_key=os.environ["OPENAI_API_KEY"], base_url=os.environ.get("OPENAI_BASE_URL"))
+    try:
+        response = await client.embeddings.create(model=model, input=texts)
+        return [item.embedding for item in response.data]
+    finally:
+        await client.close()
+
+
+def _search(client: QdrantClient, mode: str, query: str, vector: list[float], limit: int) -> list[str]:
+    if mode == "dense":
+        points = client.query_points(COLLECTION, query=vector, limit=limit).points
+    elif mode == "sparse":
+        points = client.query_points(
+            COLLECTION, query=query_sparse_vector(query), using=SPARSE_VECTOR_NAME, limit=limit
+        ).points
+    else:
+        points = client.query_points(
+            COLLECTION,
+            prefetch=[
+                Prefetch(query=vector, limit=PREFETCH_LIMIT),
+                Prefetch(query=query_sparse_vector(query), using=SPARSE_VECTOR_NAME, limit=PREFETCH_LIMIT),
+            ],
+            query=FusionQuery(fusion=Fusion.RRF),
+            limit=limit,
+        ).points
+    return [point.payload["passage_id"] for point in points]
+
+
+def _score(results: list[tuple[list[str], list[str]]]) -> dict:
+    scores = {f"recall@{k}": 0.0 for k in KS}
+    mrr = 0.0
+    for ranked, relevant in results:
+        for k in KS:
+            scores[f"recall@{k}"] += len(set(ranked[:k]) & set(relevant)) / len(relevant)
+        rank = next((i + 1 for i, passage in enumerate(ranked) if passage in relevant), None)
+        mrr += 1 / rank if rank else 0.0
+    n = len(results) or 1
+    scores = {name: value / n for name, value in scores.items()}
+    scores["mrr"] = mrr / n
+    return scores
+
+
+async def main(args):
+    with open(EVAL_SET) as f:
+        eval_set = json.load(f)
+    passages = eval_set["passages"]
+    queries = eval_set["queries"]
+
+    passage_vectors = await _embed([p["text"] for p in passages], args.embeddings, args.model)
+    query_vectors = await _embed([q["query"] for q in queries], args.embeddings, args.model)
+
+    client = QdrantClient(location=":memory:") if args.qdrant_url == ":memory:" else QdrantClient(url=args.qdrant_url)
+    if client.collection_exists(COLLECTION):
+        client.delete_collection(COLLECTION)
+    client.create_collection(
+        COLLECTION,
+        vectors_config=VectorParams(size=len(passage_vectors[0]), distance=Distance.COSINE),
+        sparse_vectors_config={SPARSE_VECTOR_NAME: SparseVectorParams(modifier=Modifier.IDF)},
+    )
+    client.upsert(
+        COLLECTION,
+        points=[
+            PointStruct(
+                id=str(uuid.uuid5(uuid.NAMESPACE_URL, passage["id"])),
+                vector={"": vector, SPARSE_VECTOR_NAME: document_sparse_vector(passage["text"])},
+                payload={"passage_id": passage["id"]},
+            )
+            for passage, vector in zip(passages, passage_vectors)
+        ],
+    )
+
+    print(f"📊 {len(passages)} passages, {len(queries)} queries, {args.embeddings} embeddings")
+    try:
+        for mode in ("dense", "sparse", "hybrid"):
+            groups = {"all": [], "identifier": [], "natural": []}
+            for query, vector in zip(queries, query_vectors):
+                ranked = _search(client, mode, query["query"], vector, max(KS))
+                group = "identifier" if _IDENTIFIER.search(query["query"]) else "natural"
+                groups["all"].append((ranked, query["relevant"]))
+                groups[group].append((ranked, query["relevant"]))
+            for group, results in groups.items():
+                scores = _score(results)
+                line = " | ".join(f"{name} {value:.3f}" for name, value in scores.items())
+                print(f"   {mode:>6} {group:<10} ({len(results):>2}): {line}")
+    finally:
+        client.delete_collection(COLLECTION)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--embeddings", choices=["openai", "fake"], default="openai" if os.environ.get("OPENAI_API_KEY") else "fake")
+    parser.add_argument("--model", default="text-embedding-3-small")
+    parser.add_argument("--qdrant-url", default=":memory:")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,122 @@
+"""
+Load test for chat-time vector search.
+
+Runs N concurrent "chats", each issuing a query against a bot's collection,
+and reports p50/p99 latency, throughput and the worst event-loop stall:
+
+    before  the old path - sync QdrantClient.query_points called inside the coroutine
+    after   retrieve-style query through the pooled AsyncQdrantClient
+
+Query vectors are random, so no embedding calls are made.
+
+Usage:
+    python -m src.vector.load_test <collection_name> --chats 200 --rounds 5
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+
+from src.vector.client import close_async_qdrant_client, get_async_qdrant_client, qdrant_client
+from src.vector.retrieve import PAYLOAD_FIELDS
+
+
+def _random_vector(size: int) -> list[float]:
+    vector = [random.uniform(-1, 1) for _ in range(size)]
+    norm = sum(v * v for v in vector) ** 0.5 or 1.0
+    return [v / norm for v in vector]
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def _loop_monitor(stop: asyncio.Event, interval: float = 0.01) -> float:
+    """Largest delay the event loop added to a 10ms sleep"""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+async def _before(collection: str, vector: list[float], top_k: int):
+    # Exactly what retrieve_relevant_chunks used to do
+    return qdrant_client.query_points(collection_name=collection, query=vector)
+
+
+async def _after(collection: str, vector: list[float], top_k: int):
+    return await get_async_qdrant_client().query_points(
+        collection_name=collection,
+        query=vector,
+        limit=top_k,
+        with_payload=PAYLOAD_FIELDS,
+    )
+
+
+async def run(mode: str, collection: str, size: int, chats: int, rounds: int, top_k: int) -> dict:
+    query = _before if mode == "before" else _after
+    latencies: list[float] = []
+
+    async def chat():
+        for _ in range(rounds):
+            vector = _random_vector(size)
+            start = time.perf_counter()
+            await query(collection, vector, top_k)
+            latencies.append(time.perf_counter() - start)
+
+    # Warm up connections outside the measurement
+    await query(collection, _random_vector(size), top_k)
+
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(_loop_monitor(stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(chat() for _ in range(chats)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    worst_stall = await monitor
+
+    return {
+        "mode": mode,
+        "queries": len(latencies),
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "qps": len(latencies) / elapsed,
+        "max_loop_stall_ms": worst_stall * 1000,
+    }
+
+
+async def main(args):
+    info = qdrant_client.get_collection(args.collection)
+    vectors = info.config.params.vectors
+    size = vectors.size if hasattr(vectors, "size") else next(iter(vectors.values())).size
+    print(f"📐 Collection {args.collection}: {info.points_count} points, {size} dims")
+
+    modes = ["before", "after"] if args.mode == "both" else [args.mode]
+    try:
+        for mode in modes:
+            result = await run(mode, args.collection, size, args.chats, args.rounds, args.top_k)
+            print(
+                f"⏱️ {result['mode']:>6}: {result['queries']} queries | "
+                f"p50 {result['p50_ms']:.1f} ms | p99 {result['p99_ms']:.1f} ms | "
+                f"mean {result['mean_ms']:.1f} ms | {result['qps']:.0f} q/s | "
+                f"max loop stall {result['max_loop_stall_ms']:.1f} ms"
+            )
+    finally:
+        await close_async_qdrant_client()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("collection")
+    parser.add_argument("--chats", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--mode", choices=["before", "after", "both"], default="both")
+    asyncio.run(main(parser.parse_args()))
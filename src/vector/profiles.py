@@ -0,0 +1,124 @@
+"""
+Collection profiles: how a bot's vectors are stored in Qdrant.
+
+A profile fixes the embedding size, quantization, where the float32
+originals live and the HNSW graph parameters. It is applied when the
+consumer creates a collection (Bot.vectorProfile, else VECTOR_PROFILE);
+an existing collection keeps its profile until it is rebuilt.
+
+    default   float32 1536-d vectors in RAM (the original layout)
+    scalar    int8 copies in RAM, originals on disk, rescored   (~4x less vector RAM)
+    binary    1-bit copies in RAM, originals on disk, rescored  (~32x less, needs oversampling)
+    compact   768-d embeddings + scalar, originals on disk, m=12 (~8x less)
+
+Reduced sizes use the text-embedding-3 `dimensions` parameter, so queries
+have to be embedded at the collection's size too (src/vector/retrieve.py
+reads it from the collection). Run `python -m src.vector.bench_profiles`
+to compare recall, latency and RAM before picking one.
+
+Env-free: used by the consumer, the API and the benchmark.
+"""
+
+from dataclasses import dataclass
+
+from qdrant_client.models import (
+    BinaryQuantization,
+    BinaryQuantizationConfig,
+    Distance,
+    HnswConfigDiff,
+    QuantizationSearchParams,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+    SearchParams,
+    VectorParams,
+)
+
+# Output size of each model when no `dimensions` is requested
+NATIVE_DIMENSIONS = {
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+    "text-embedding-ada-002": 1536,
+}
+
+# How many extra candidates to score on quantized vectors before rescoring
+OVERSAMPLING = {"scalar": 1.5, "binary": 3.0}
+
+
+@dataclass(frozen=True)
+class CollectionProfile:
+    name: str
+    dimensions: int = 1536
+    quantization: str | None = None  # None | "scalar" | "binary"
+    on_disk: bool = False  # float32 originals on disk (only sensible with quantization)
+    hnsw_m: int | None = None  # None = Qdrant default (16)
+    hnsw_ef_construct: int | None = None  # None = Qdrant default (100)
+
+    def vectors_config(self) -> VectorParams:
+        return VectorParams(size=self.dimensions, distance=Distance.COSINE, on_disk=self.on_disk or None)
+
+    def quantization_config(self):
+        # Quantized copies stay in RAM; that is what searches touch first
+        if self.quantization == "scalar":
+            return ScalarQuantization(
+                scalar=ScalarQuantizationConfig(type=ScalarType.INT8, quantile=0.99, always_ram=True)
+            )
+        if self.quantization == "binary":
+            return BinaryQuantization(binary=BinaryQuantizationConfig(always_ram=True))
+        return None
+
+    def hnsw_config(self) -> HnswConfigDiff | None:
+        if self.hnsw_m is None and self.hnsw_ef_construct is None:
+            return None
+        return HnswConfigDiff(m=self.hnsw_m, ef_construct=self.hnsw_ef_construct)
+
+
+PROFILES = {
+    profile.name: profile
+    for profile in (
+        CollectionProfile("default"),
+        CollectionProfile("scalar", quantization="scalar", on_disk=True),
+        CollectionProfile("binary", quantization="binary", on_disk=True),
+        CollectionProfile("compact", dimensions=768, quantization="scalar", on_disk=True, hnsw_m=12),
+    )
+}
+
+
+def get_profile(name: str | None) -> CollectionProfile:
+    """Profile by name; unknown names fall back to default"""
+    profile = PROFILES.get(name or "default")
+    if profile is None:
+        print(f"⚠️ Unknown vector profile '{name}', using 'default'")
+        profile = PROFILES["default"]
+    return profile
+
+
+def embedding_dimensions(model: str, size: int) -> int | None:
+    """`dimensions` to request from the embeddings API for a collection of this size"""
+    if NATIVE_DIMENSIONS.get(model) == size:
+        return None
+    return size
+
+
+def quantization_kind(quantization_config) -> str | None:
+    """"scalar" / "binary" / None for a collection's quantization_config"""
+    if quantization_config is None:
+        return None
+    if getattr(quantization_config, "scalar", None) is not None:
+        return "scalar"
+    if getattr(quantization_config, "binary", None) is not None:
+        return "binary"
+    return "product"
+
+
+def search_params(quantization: str | None, hnsw_ef: int | None = None, oversampling: float | None = None) -> SearchParams | None:
+    """Query-time params: rescore quantized candidates with the originals"""
+    if quantization is None and hnsw_ef is None:
+        return None
+    return SearchParams(
+        hnsw_ef=hnsw_ef,
+        quantization=QuantizationSearchParams(
+            rescore=True,
+            oversampling=oversampling or OVERSAMPLING.get(quantization, 2.0),
+        ) if quantization is not None else None,
+    )
@@ -1,39 +1,207 @@
-from src.vector.client import qdrant_client
-from openai import AsyncOpenAI
+import time
+from dataclasses import dataclass
+from qdrant_client.models import Filter, Fusion, FusionQuery, Prefetch
+from src.vector.chunk_store import ChunkStore
+from src.vector.client import get_async_qdrant_client
 from src.env import env
+from src.llm.embedding_cache import model_key
+from src.llm.embeddings import EmbeddingScheduler
+from src.llm.llm import openai_client
+from src.llm.query_cache import QueryEmbeddingCache
+from src.llm.sparse import SPARSE_VECTOR_NAME, query_sparse_vector
+from src.vector.profiles import embedding_dimensions, quantization_kind, search_params
+from src.vector.tenancy import BotLocation, locate_bot
 
-openai_client = AsyncOpenAI(api_key=env.OPENAI_API_KEY)
+# Shares one RPM/TPM budget across every chat on this worker
+# (same connection pool as chat completions; retries are handled by the scheduler)
+embedding_scheduler = EmbeddingScheduler(
+    openai_client.with_options(max_retries=0),
+    model=env.EMBEDDING_MODEL,
+    max_in_flight=env.EMBEDDING_MAX_IN_FLIGHT,
+    rpm=env.EMBEDDING_RPM,
+    tpm=env.EMBEDDING_TPM,
+    max_retries=env.EMBEDDING_MAX_RETRIES,
+)
 
 
-async def embed_text(text: str) -> list[float]:
-    response = await openai_client.embeddings.create(
-        model="text-embedding-3-small",
-        input=text
+query_cache = (
+    QueryEmbeddingCache(
+        max_items=env.QUERY_CACHE_MAX_ITEMS,
+        ttl_seconds=env.QUERY_CACHE_TTL_SECONDS,
+        redis_url=env.QUERY_CACHE_REDIS_URL,
     )
-    return response.data[0].embedding
+    if env.QUERY_CACHE_ENABLED
+    else None
+)
+
+
+async def _embed_uncached(text: str, dimensions: int | None = None) -> list[float]:
+    vectors = await embedding_scheduler.embed([text], dimensions)
+    return vectors[0]
+
+
+async def embed_text(text: str, dimensions: int | None = None) -> list[float]:
+    if query_cache is None:
+        return await _embed_uncached(text, dimensions)
+    return await query_cache.get_or_embed(
+        model_key(embedding_scheduler.model, dimensions),
+        text,
+        lambda question: _embed_uncached(question, dimensions),
+    )
+
+
+def bot_location(bot_id: str) -> BotLocation:
+    """Collection (and tenant filter, in shared mode) holding a bot's chunks"""
+    return locate_bot(
+        bot_id,
+        env.QDRANT_TENANCY,
+        env.QDRANT_SHARED_COLLECTION_PREFIX,
+        env.QDRANT_SHARED_COLLECTIONS,
+    )
+
+
+# Opened on first use: only needed once the consumer keeps texts out of Qdrant
+_chunk_store: ChunkStore | None = None
+
+
+async def _stored_texts(point_ids: list[str]) -> dict[str, str]:
+    """Texts of points that were stored without a "text" payload, in one query"""
+    global _chunk_store
+    if _chunk_store is None:
+        _chunk_store = ChunkStore(env.CHUNK_STORE_PATH)
+    texts = await _chunk_store.get_many(point_ids)
+    if len(texts) < len(point_ids):
+        print(f"⚠️ {len(point_ids) - len(texts)} chunk texts missing from {env.CHUNK_STORE_PATH}")
+    return texts
+
+
+# Only the payload fields the prompt needs are sent back by Qdrant
+PAYLOAD_FIELDS = ["text", "file_name", "page", "doc_id", "chunk_index"]
+
+@dataclass
+class CollectionTraits:
+    """What a search needs to know about a collection's layout"""
+    sparse: bool  # collections created before hybrid search stay dense-only until rebuilt
+    vector_size: int  # queries are embedded at this size (see src/vector/profiles.py)
+    quantization: str | None  # quantized collections are searched with rescoring
+
+
+# collection -> (traits, recheck after); rebuilt collections are picked up on expiry
+_collection_traits: dict[str, tuple[CollectionTraits, float]] = {}
+COLLECTION_PROBE_TTL_SECONDS = 300
+
+
+async def collection_traits(collection_name: str) -> CollectionTraits:
+    cached = _collection_traits.get(collection_name)
+    if cached is not None and cached[1] > time.monotonic():
+        return cached[0]
+    info = await get_async_qdrant_client().get_collection(collection_name)
+    vectors = info.config.params.vectors
+    traits = CollectionTraits(
+        sparse=SPARSE_VECTOR_NAME in (info.config.params.sparse_vectors or {}),
+        vector_size=vectors.size if hasattr(vectors, "size") else vectors[""].size,
+        quantization=quantization_kind(info.config.quantization_config),
+    )
+    _collection_traits[collection_name] = (traits, time.monotonic() + COLLECTION_PROBE_TTL_SECONDS)
+    return traits
+
+
+async def query_dimensions(collection_name: str) -> int | None:
+    """`dimensions` to embed questions with for this collection (None = native)"""
+    traits = await collection_traits(collection_name)
+    return embedding_dimensions(embedding_scheduler.model, traits.vector_size)
+
+
+async def search_points(
+    collection_name: str,
+    question: str,
+    query_vector: list[float],
+    limit: int,
+    score_threshold: float | None,
+    with_payload,
+    query_filter: Filter | None = None,
+):
+    """
+    Dense search, or - when the collection has BM25 vectors - dense and
+    sparse prefetch fused with reciprocal rank fusion in one query.
+    query_filter (the tenant in shared collections) applies to every stage.
+    """
+    client = get_async_qdrant_client()
+    traits = await collection_traits(collection_name)
+    params = search_params(traits.quantization, env.RETRIEVAL_HNSW_EF, env.RETRIEVAL_QUANTIZATION_OVERSAMPLING)
+    sparse_query = query_sparse_vector(question) if env.RETRIEVAL_HYBRID else None
+
+    if sparse_query is not None and sparse_query.indices and traits.sparse:
+        prefetch_limit = max(limit, env.RETRIEVAL_PREFETCH_LIMIT)
+        results = await client.query_points(
+            collection_name=collection_name,
+            prefetch=[
+                # score_threshold only makes sense for cosine scores
+                Prefetch(
+                    query=query_vector,
+                    limit=prefetch_limit,
+                    score_threshold=score_threshold,
+                    filter=query_filter,
+                    params=params,
+                ),
+                Prefetch(query=sparse_query, using=SPARSE_VECTOR_NAME, limit=prefetch_limit, filter=query_filter),
+            ],
+            query=FusionQuery(fusion=Fusion.RRF),
+            query_filter=query_filter,
+            limit=limit,
+            with_payload=with_payload,
+        )
+    else:
+        results = await client.query_points(
+            collection_name=collection_name,
+            query=query_vector,
+            query_filter=query_filter,
+            search_params=params,
+            limit=limit,
+            score_threshold=score_threshold,
+            with_payload=with_payload,
+        )
+    return results.points
+
 
 async def retrieve_relevant_chunks(
     collection_name: str,
     question: str,
-    top_k: int = 5
+    top_k: int = env.RETRIEVAL_TOP_K,
+    score_threshold: float | None = env.RETRIEVAL_SCORE_THRESHOLD,
+    payload_fields: list[str] | None = None,
+    query_vector: list[float] | None = None,
+    query_filter: Filter | None = None,
 ):
-    # 1. Embed the question
-    query_vector = await embed_text(question)
+    # 1. Embed the question (unless the caller already did)
+    if query_vector is None:
+        query_vector = await embed_text(question, await query_dimensions(collection_name))
     
-    # 2. Search Qdrant
-    results = qdrant_client.query_points(
-        collection_name=collection_name,
-        query=query_vector,
+    # 2. Search Qdrant (async client - never blocks the event loop)
+    points = await search_points(
+        collection_name,
+        question,
+        query_vector,
+        limit=top_k,
+        score_threshold=score_threshold,
+        with_payload=payload_fields or PAYLOAD_FIELDS,
+        query_filter=query_filter,
     )
 
-    # 3. Extract only relevant data for AI
+    # 3. Fetch the texts Qdrant does not hold, all hits at once
+    without_text = [str(point.id) for point in points if point.payload.get("text") is None]
+    stored = await _stored_texts(without_text) if without_text else {}
+
+    # 4. Extract only relevant data for AI
     relevant_data = []
-    for point in results.points:
+    for point in points:
         relevant_data.append({
-            "text": point.payload.get("text"),
+            "text": point.payload.get("text") or stored.get(str(point.id)),
             "score": point.score,
             "file_name": point.payload.get("file_name"),
-            "page": point.payload.get("page")
+            "page": point.payload.get("page"),
+            "doc_id": point.payload.get("doc_id"),
+            "chunk_index": point.payload.get("chunk_index"),
         })
     
     return relevant_data
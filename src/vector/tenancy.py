@@ -0,0 +1,62 @@
+"""
+Where a bot's chunks live in Qdrant.
+
+"collection" (the default) keeps one collection per bot, named after the
+bot ID. "shared" keeps every bot in QDRANT_SHARED_COLLECTIONS shared
+collections, partitioned by a "bot_id" payload key that is indexed with
+is_tenant=True: Qdrant co-locates each tenant's points and builds a small
+HNSW graph per tenant (payload_m) instead of one global graph (m=0), so
+every search must filter by tenant.
+
+Used by the consumer (writes) and the API (reads); kept free of env so
+both can pass in their own settings.
+"""
+
+import zlib
+from dataclasses import dataclass
+
+from qdrant_client.models import (
+    FieldCondition,
+    Filter,
+    HnswConfigDiff,
+    KeywordIndexParams,
+    KeywordIndexType,
+    MatchValue,
+)
+
+TENANT_KEY = "bot_id"
+
+# Per-tenant graphs only; a search without a tenant filter falls back to a full scan
+SHARED_HNSW_CONFIG = HnswConfigDiff(m=0, payload_m=16)
+TENANT_INDEX_SCHEMA = KeywordIndexParams(type=KeywordIndexType.KEYWORD, is_tenant=True)
+
+
+@dataclass
+class BotLocation:
+    collection_name: str
+    tenant: str | None = None  # set in shared mode
+
+    @property
+    def query_filter(self) -> Filter | None:
+        return tenant_filter(self.tenant) if self.tenant is not None else None
+
+
+def shared_collection_name(bot_id: str, prefix: str, shards: int) -> str:
+    """Stable shared collection for a bot (crc32, so every process agrees)"""
+    if shards <= 1:
+        return prefix
+    return f"{prefix}_{zlib.crc32(bot_id.encode('utf-8')) % shards}"
+
+
+def locate_bot(bot_id: str, mode: str, prefix: str, shards: int) -> BotLocation:
+    if mode == "shared":
+        return BotLocation(shared_collection_name(bot_id, prefix, shards), tenant=bot_id)
+    return BotLocation(bot_id)
+
+
+def tenant_filter(bot_id: str, *conditions: FieldCondition) -> Filter:
+    return Filter(must=[FieldCondition(key=TENANT_KEY, match=MatchValue(value=bot_id)), *conditions])
+
+
+def is_shared_collection(name: str, prefix: str) -> bool:
+    return name == prefix or name.startswith(f"{prefix}_")
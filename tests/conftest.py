@@ -0,0 +1,17 @@
+import os
+
+# src.env and consumer.consumer_env read these at import time
+for name in (
+    "DATABASE_URL",
+    "JWT_SECRET",
+    "AWS_REGION",
+    "AWS_S3_BUCKET",
+    "AWS_ACCESS_KEY_ID",
+    "AWS_SECRET_ACCESS_KEY",
+    "RABBIT_MQ_URL",
+    "RABBIT_MQ_API_KEY",
+    "OPENAI_API_KEY",
+    "QDRANT_DB_CLUSTER_URL",
+    "QDRANT_DB_API_KEY",
+):
+    os.environ.setdefault(name, "test")
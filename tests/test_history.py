@@ -0,0 +1,37 @@
+import asyncio
+
+from src.llm.history import SessionHistory, SessionHistoryStore
+
+
+def _history(*contents: str) -> SessionHistory:
+    roles = ["user", "assistant"]
+    return SessionHistory([{"role": roles[i % 2], "content": c} for i, c in enumerate(contents)])
+
+
+def _budget_for(history: SessionHistory, last_turns: int) -> int:
+    return sum(turn["tokens"] for turn in history.turns[-last_turns:])
+
+
+def test_window_never_starts_with_an_assistant_turn():
+    history = _history("first question", "first answer", "second question", "second answer")
+    # Fits the last three turns: the first answer would lead without its question
+    window = history.window(_budget_for(history, 3))
+    assert [turn["content"] for turn in window] == ["second question", "second answer"]
+    assert [turn["content"] for turn in history.overflow(_budget_for(history, 3))] == [
+        "first question", "first answer",
+    ]
+
+
+def test_window_keeps_whole_turns_when_the_budget_is_even():
+    history = _history("first question", "first answer", "second question", "second answer")
+    window = history.window(_budget_for(history, 4))
+    assert [turn["role"] for turn in window] == ["user", "assistant", "user", "assistant"]
+
+
+def test_compaction_drops_the_orphaned_answer_with_its_question():
+    history = _history("question", "answer", "follow-up")
+    store = SessionHistoryStore(token_budget=_budget_for(history, 2))
+    store.put("s1", history)
+    asyncio.run(store.compact("s1"))
+    assert [turn["content"] for turn in history.turns] == ["follow-up"]
+    assert history.window(store.token_budget)[0]["role"] == "user"
@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+
+from generated.prisma import errors as prisma_errors
+from src.services import message_journal as journal_module
+from src.services.message_journal import MessageJournal
+
+
+class FakeChatMessages:
+    """create_many that rejects some contents and can simulate an outage"""
+
+    def __init__(self, rejected=(), down=False):
+        self.rejected = set(rejected)
+        self.down = down
+        self.stored: list[dict] = []
+
+    async def create_many(self, data, skip_duplicates=False):
+        if self.down:
+            raise ConnectionError("database unreachable")
+        for row in data:
+            if row["content"] in self.rejected:
+                raise prisma_errors.ForeignKeyViolationError(
+                    {"user_facing_error": {"message": "Foreign key constraint failed"}}
+                )
+        self.stored.extend(data)
+        return len(data)
+
+
+@pytest.fixture
+def chat_messages(monkeypatch):
+    fake = FakeChatMessages()
+    monkeypatch.setattr(journal_module.prisma, "chatmessage", fake, raising=False)
+    return fake
+
+
+def test_bad_row_does_not_block_later_rows(chat_messages):
+    chat_messages.rejected = {"bad"}
+    journal = MessageJournal(max_rows=10)
+    for content in ("first", "bad", "second", "third"):
+        journal.add("s1", "user", content)
+
+    asyncio.run(journal.flush())
+
+    assert [row["content"] for row in chat_messages.stored] == ["first", "second", "third"]
+    assert not journal.has_pending("s1")
+    assert journal.stats()["dropped"] == 1
+
+    # Later flushes are not affected either
+    journal.add("s1", "assistant", "fourth")
+    asyncio.run(journal.flush())
+    assert chat_messages.stored[-1]["content"] == "fourth"
+
+
+def test_transient_failures_keep_rows_until_the_attempt_cap(chat_messages):
+    chat_messages.down = True
+    journal = MessageJournal(max_rows=10, max_attempts=3)
+    journal.add("s1", "user", "question")
+    journal.add("s1", "assistant", "answer")
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            asyncio.run(journal.flush())
+        assert journal.stats()["pending"] == 2
+
+    chat_messages.down = False
+    asyncio.run(journal.flush())
+    assert [row["content"] for row in chat_messages.stored] == ["question", "answer"]
+    assert journal.stats()["dropped"] == 0
+
+
+def test_row_failing_every_flush_is_dropped_after_max_attempts(chat_messages):
+    chat_messages.down = True
+    journal = MessageJournal(max_rows=10, max_attempts=2)
+    journal.add("s1", "user", "question")
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(journal.flush())
+    asyncio.run(journal.flush())
+
+    assert not journal.has_pending()
+    assert journal.stats()["dropped"] == 1
+
+
+def test_nul_bytes_are_stripped(chat_messages):
+    journal = MessageJournal()
+    journal.add("s1", "user", "a\x00b")
+    asyncio.run(journal.flush())
+    assert chat_messages.stored[0]["content"] == "ab"
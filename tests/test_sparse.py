@@ -0,0 +1,23 @@
+from src.llm.sparse import document_sparse_vector, query_sparse_vector, tokenize
+
+
+def test_identifiers_are_kept_whole_and_split():
+    assert tokenize("Error AB-1234 in 7.3.1") == ["error", "ab-1234", "ab", "1234", "7.3.1", "7", "3", "1"]
+
+
+def test_accented_and_non_latin_words_are_terms():
+    assert tokenize("Résumé Straße") == ["résumé", "strasse"]
+    assert tokenize("Привет мир") == ["привет", "мир"]
+    assert tokenize("Ελληνικά κείμενα") == ["ελληνικά", "κείμενα"]
+
+
+def test_unsegmented_scripts_use_bigrams():
+    assert tokenize("東京都の天気") == ["東京", "京都", "都の", "の天", "天気"]
+    assert tokenize("型番ABC123") == ["型番", "abc123"]
+
+
+def test_non_latin_query_matches_document():
+    document = document_sparse_vector("Гарантия на устройство составляет два года")
+    query = query_sparse_vector("гарантия устройство")
+    assert set(query.indices) <= set(document.indices)
+    assert query.indices
@@ -0,0 +1,141 @@
+import random
+import re
+import statistics
+import time
+
+import pytest
+
+from consumer.vector.splitter import split_text, split_text_spans
+from consumer.vector.strategies import CHUNK_OVERLAP, CHUNK_SIZE
+
+WORDS = [
+    "the", "policy", "employee", "shall", "section", "manual", "device", "error",
+    "configuration", "warranty", "customer", "must", "within", "days", "of", "a",
+]
+MB = 1024 * 1024
+
+
+def synthetic_text(size_bytes: int, seed: int = 42) -> str:
+    """Deterministic prose-like text with sentences, lines and paragraphs"""
+    rng = random.Random(seed)
+    parts = []
+    total = 0
+    while total < size_bytes:
+        sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(5, 30))) + ". "
+        roll = rng.random()
+        if roll < 0.05:
+            sentence += "\n\n"
+        elif roll < 0.2:
+            sentence += "\n"
+        elif roll < 0.21:
+            # Occasional long token that forces the character-window fallback
+            sentence += "x" * rng.randint(1000, 3000) + " "
+        parts.append(sentence)
+        total += len(sentence)
+    return "".join(parts)[:size_bytes]
+
+
+def legacy_split_text_recursive(text: str, chunk_size: int = CHUNK_SIZE, chunk_overlap: int = CHUNK_OVERLAP) -> list[str]:
+    """The string-concatenating splitter split_text replaced, kept as the reference"""
+    separators = ["\n\n", "\n", ". ", " ", ""]
+
+    def _split(text: str, separators: list[str]) -> list[str]:
+        if not text:
+            return []
+        for i, separator in enumerate(separators):
+            if separator == "":
+                return [text[j:j + chunk_size] for j in range(0, len(text), chunk_size - chunk_overlap)]
+            if separator in text:
+                result = []
+                current_chunk = ""
+                for split in text.split(separator):
+                    split_with_sep = split + separator if split else ""
+                    if len(current_chunk) + len(split_with_sep) <= chunk_size:
+                        current_chunk += split_with_sep
+                    else:
+                        if current_chunk:
+                            result.append(current_chunk)
+                        if len(split_with_sep) > chunk_size:
+                            result.extend(_split(split_with_sep, separators[i + 1:]))
+                            current_chunk = ""
+                        else:
+                            current_chunk = split_with_sep
+                if current_chunk:
+                    result.append(current_chunk)
+                return result
+        return [text]
+
+    chunks = _split(text, separators)
+    if chunk_overlap > 0 and len(chunks) > 1:
+        return [chunks[0]] + [chunks[i - 1][-chunk_overlap:] + chunk for i, chunk in enumerate(chunks) if i > 0]
+    return chunks
+
+
+def well_formed_text(seed: int) -> str:
+    """Paragraphs of sentences where every piece ends with its separator"""
+    rng = random.Random(seed)
+    paragraphs = []
+    for _ in range(rng.randint(5, 40)):
+        sentences = [
+            " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 20))) + ". "
+            for _ in range(rng.randint(1, 12))
+        ]
+        paragraphs.append("".join(sentences) + "\n\n")
+    return "".join(paragraphs)
+
+
+def _words(chunks: list[str]) -> list[list[str]]:
+    return [re.findall(r"\w+", chunk) for chunk in chunks]
+
+
+def test_spans_are_ordered_and_within_budget():
+    text = synthetic_text(200_000)
+    spans = split_text_spans(text, CHUNK_SIZE, CHUNK_OVERLAP)
+    assert all(0 <= start < end <= len(text) for start, end in spans)
+    assert all(start <= next_start for (start, _), (next_start, _) in zip(spans, spans[1:]))
+    assert max(end - start for start, end in spans) <= CHUNK_SIZE
+    chunks = split_text(text, CHUNK_SIZE, CHUNK_OVERLAP)
+    assert max(len(chunk) for chunk in chunks) <= CHUNK_SIZE + CHUNK_OVERLAP
+
+
+def test_matches_legacy_chunk_boundaries_on_well_formed_text():
+    # Same chunks word for word; the legacy splitter only differs in separators
+    # it appended or dropped (and in the overlap those shifted)
+    for seed in range(100):
+        text = well_formed_text(seed)
+        assert _words(split_text(text, CHUNK_SIZE, 0)) == _words(legacy_split_text_recursive(text, CHUNK_SIZE, 0)), seed
+
+
+def test_stays_close_to_legacy_output():
+    for seed in range(300):
+        text = synthetic_text(random.Random(seed).randint(2_000, 60_000), seed=seed)
+        new = split_text(text, CHUNK_SIZE, CHUNK_OVERLAP)
+        old = legacy_split_text_recursive(text)
+        assert 0.9 <= len(new) / len(old) <= 1.1, seed
+        mean_ratio = statistics.mean(map(len, new)) / statistics.mean(map(len, old))
+        assert 0.9 <= mean_ratio <= 1.1, seed
+
+
+def _best_time(text: str, repeat: int = 3) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        split_text(text, CHUNK_SIZE, CHUNK_OVERLAP)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def test_runs_in_linear_time():
+    small = _best_time(synthetic_text(1 * MB))
+    large = _best_time(synthetic_text(16 * MB))
+    # 16x the input: linear is ~16x the time, quadratic ~256x
+    assert large / small < 16 * 3
+
+
+@pytest.mark.parametrize("size_mb", [1, 10, 100])
+def test_benchmark_split_text(benchmark, size_mb):
+    text = synthetic_text(size_mb * MB)
+    rounds = 1 if size_mb >= 100 else 3
+    chunks = benchmark.pedantic(split_text, args=(text, CHUNK_SIZE, CHUNK_OVERLAP), rounds=rounds)
+    benchmark.extra_info["chunks"] = len(chunks)
+    benchmark.extra_info["mb_per_s"] = size_mb / benchmark.stats.stats.min